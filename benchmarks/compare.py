@@ -0,0 +1,77 @@
+# benchmarks/compare.py
+"""
+Compare two benchmarks.run reports and flag regressions.
+
+    python -m benchmarks.compare base.json new.json --threshold 0.10
+
+Exits 1 when any metric moved the wrong way by more than the threshold.
+The direction comes from the metric name: *_per_sec and success_rate are
+better when higher; *_ms, *_us, *_s and attempts_per_call when lower.
+Other metrics are shown but never fail the comparison.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+HIGHER_IS_BETTER = ("_per_sec", "success_rate")
+LOWER_IS_BETTER = ("_ms", "_us", "_s", "attempts_per_call")
+
+
+def direction(metric: str) -> int:
+    """+1 higher is better, -1 lower is better, 0 informational."""
+    if metric.endswith(HIGHER_IS_BETTER):
+        return 1
+    if metric.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float) -> Tuple[List[Dict[str, Any]], bool]:
+    old_results = {r["name"]: r["metrics"] for r in base["results"]}
+    rows: List[Dict[str, Any]] = []
+    regressed = False
+    for result in new["results"]:
+        old = old_results.get(result["name"])
+        if old is None:
+            continue
+        for metric, value in sorted(result["metrics"].items()):
+            before = old.get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(before, (int, float)):
+                continue
+            change: Optional[float] = (value - before) / abs(before) if before else None
+            sign = direction(metric)
+            bad = change is not None and sign != 0 and -sign * change > threshold
+            regressed = regressed or bad
+            rows.append({"name": result["name"], "metric": metric, "base": before, "new": value,
+                         "change": change, "regression": bad})
+    return rows, regressed
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare two Persisto benchmark reports")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change counted as a regression")
+    parser.add_argument("--json", action="store_true", help="print rows as JSON")
+    args = parser.parse_args(argv)
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    rows, regressed = compare(base, new, args.threshold)
+    if args.json:
+        print(json.dumps({"regressed": regressed, "rows": rows}, indent=2))
+    else:
+        for row in rows:
+            change = "n/a" if row["change"] is None else f"{row['change']:+.1%}"
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['name']:<40} {row['metric']:<30} {row['base']:>12.3f} -> {row['new']:>12.3f} {change:>8}{flag}")
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+# benchmarks/run.py
+"""
+SDK benchmark suite, run against benchmarks.server.StandInServer.
+
+    python -m benchmarks.run                      # full suite, JSON to stdout
+    python -m benchmarks.run --quick --out base.json
+    python -m benchmarks.run --only throughput,overhead
+    python -m benchmarks.compare base.json new.json
+    python -m benchmarks.run --only import,coldstart --budgets   # exit 1 over budget
+
+Suites:
+    throughput  save/query calls per second at several concurrency levels
+                (threads; plus asyncio when aiohttp is installed)
+    querymany   one RAG turn (10 sub-queries): sequential query() vs
+                query_many() batched vs query_many() fan-out fallback
+    payload     save latency vs content size (with and without gzip) and
+                query latency vs response size (and with a field projection)
+    faults      success rate, attempts per call and tail latency with
+                injected 503s and 429s, with and without a retry budget
+    overhead    per-call time of Client.query vs a bare requests.Session
+                post to the same zero-latency server, with and without hooks
+    import      wall time of `import persisto` / `from persisto import Client`
+                in a fresh interpreter
+    coldstart   fresh process: import, Client(), first query; with and
+                without warmup()
+
+Output is one JSON document: {"meta": {...}, "results": [{"name",
+"params", "metrics"}]}. Metric names carry their unit (_ms, _us, _s,
+_per_sec) so benchmarks.compare knows which direction is a regression.
+benchmarks/budgets.json holds upper bounds for cold-start metrics.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+import persisto
+from persisto import Client, LatencyHistogram
+from persisto.client import PersistoError
+
+from .server import StandInServer
+
+SUITES = ("throughput", "querymany", "payload", "faults", "overhead", "import", "coldstart")
+BUDGETS = os.path.join(os.path.dirname(__file__), "budgets.json")
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000.0
+
+    return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+
+def _run_threads(calls: int, concurrency: int, fn: Callable[[int], Any]) -> Dict[str, Any]:
+    """Run fn(i) for i in range(calls) on `concurrency` threads; latency and throughput."""
+    latencies: List[float] = []
+    errors = 0
+
+    def timed(i: int) -> None:
+        nonlocal errors
+        t0 = time.perf_counter()
+        try:
+            fn(i)
+        except PersistoError:
+            errors += 1
+        latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed, range(calls)))
+    seconds = time.perf_counter() - t0
+    return {
+        "calls": calls,
+        "errors": errors,
+        "seconds_s": seconds,
+        "calls_per_sec": calls / seconds,
+        **_percentiles(latencies),
+    }
+
+
+# =========================
+# Suites
+# =========================
+
+def bench_throughput(server: StandInServer, quick: bool) -> List[Dict[str, Any]]:
+    server.configure(latency=0.002, result_count=5, result_bytes=200)
+    levels = (1, 8, 32) if quick else (1, 4, 16, 64)
+    results = []
+    for op in ("save", "query"):
+        for concurrency in levels:
+            calls = max(100, concurrency * (10 if quick else 40))
+            with Client(api_key="bench", base_url=server.url, pool_size=concurrency) as c:
+                if op == "save":
+                    def fn(i: int) -> Any:
+                        return c.save(namespace="bench", content=f"memory {i}", metadata={"i": i})
+                else:
+                    def fn(i: int) -> Any:
+                        return c.query(namespace="bench", query=f"query {i}", k=5)
+                metrics = _run_threads(calls, concurrency, fn)
+                metrics["connections_opened"] = c.pool_stats()["connections_opened"]
+            results.append({"name": f"throughput.{op}.threads.c{concurrency}",
+                            "params": {"op": op, "concurrency": concurrency, "latency_s": 0.002},
+                            "metrics": metrics})
+        results.extend(_bench_async(server, op, levels, quick))
+    return results
+
+
+def _bench_async(server: StandInServer, op: str, levels, quick: bool) -> List[Dict[str, Any]]:
+    try:
+        from persisto import AsyncClient
+        import aiohttp  # noqa: F401
+    except ImportError:
+        return []
+
+    async def run(concurrency: int, calls: int) -> Dict[str, Any]:
+        latencies: List[float] = []
+        errors = 0
+        async with AsyncClient(api_key="bench", base_url=server.url, max_concurrency=concurrency) as c:
+            async def one(i: int) -> None:
+                nonlocal errors
+                t0 = time.perf_counter()
+                try:
+                    if op == "save":
+                        await c.save(namespace="bench", content=f"memory {i}", metadata={"i": i})
+                    else:
+                        await c.query(namespace="bench", query=f"query {i}", k=5)
+                except PersistoError:
+                    errors += 1
+                latencies.append(time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(calls)))
+            seconds = time.perf_counter() - t0
+        return {"calls": calls, "errors": errors, "seconds_s": seconds,
+                "calls_per_sec": calls / seconds, **_percentiles(latencies)}
+
+    results = []
+    for concurrency in levels:
+        calls = max(100, concurrency * (10 if quick else 40))
+        results.append({"name": f"throughput.{op}.async.c{concurrency}",
+                        "params": {"op": op, "concurrency": concurrency, "latency_s": 0.002},
+                        "metrics": asyncio.run(run(concurrency, calls))})
+    return results
+
+
+def bench_querymany(server: StandInServer, quick: bool) -> List[Dict[str, Any]]:
+    server.configure(latency=0.005, result_count=5, result_bytes=200)
+    turns = 10 if quick else 40
+    specs = [{"namespace": f"ns{i % 3}", "query": f"sub-question {i}", "k": 5} for i in range(10)]
+    variants = [
+        ("sequential", True, lambda c: [c.query(**spec) for spec in specs]),
+        ("batched", True, lambda c: c.query_many(specs)),
+        ("fanout", False, lambda c: c.query_many(specs, max_workers=8)),
+    ]
+    results = []
+    for label, batch_endpoints, turn in variants:
+        server.configure(batch_endpoints=batch_endpoints)
+        with Client(api_key="bench", base_url=server.url) as c:
+            metrics = _run_threads(turns, 1, lambda i: turn(c))
+        metrics["queries_per_sec"] = metrics.pop("calls_per_sec") * len(specs)
+        results.append({"name": f"querymany.{label}",
+                        "params": {"queries_per_turn": len(specs), "latency_s": 0.005},
+                        "metrics": metrics})
+    server.configure(batch_endpoints=True)
+    return results
+
+
+def bench_payload(server: StandInServer, quick: bool) -> List[Dict[str, Any]]:
+    server.configure(latency=0.0)
+    calls = 20 if quick else 60
+    results = []
+    sizes = (256, 16_384, 262_144) if quick else (256, 4_096, 65_536, 262_144, 1_048_576)
+    for compression in (None, "gzip"):
+        for size in sizes:
+            content = ("persisto memory payload " * (size // 24 + 1))[:size]
+            with Client(api_key="bench", base_url=server.url, compression=compression) as c:
+                metrics = _run_threads(calls, 1, lambda i: c.save(namespace="bench-payload", content=content))
+                sent = c.transfer_stats.snapshot()
+            metrics["mb_per_sec"] = size * calls / metrics["seconds_s"] / 1e6
+            metrics["send_ratio"] = sent["send_ratio"]
+            results.append({"name": f"payload.save.{compression or 'none'}.{size}",
+                            "params": {"content_bytes": size, "compression": compression},
+                            "metrics": metrics})
+    for count in (1, 20, 200):
+        server.configure(result_count=count, result_bytes=1000)
+        with Client(api_key="bench", base_url=server.url) as c:
+            metrics = _run_threads(calls, 1, lambda i: c.query(namespace="bench-payload", query="q", k=count))
+            received = c.transfer_stats.snapshot()
+        metrics["received_wire_bytes_per_call"] = received["received_wire"] / max(1, received["requests"])
+        results.append({"name": f"payload.query.hits{count}",
+                        "params": {"hits": count, "hit_bytes": 1000},
+                        "metrics": metrics})
+    # Same 200 hits, projected to ids and similarities
+    with Client(api_key="bench", base_url=server.url) as c:
+        metrics = _run_threads(calls, 1, lambda i: c.query_hits(
+            namespace="bench-payload", query="q", k=200, fields=("id", "similarity")).ids())
+        received = c.transfer_stats.snapshot()
+    metrics["received_wire_bytes_per_call"] = received["received_wire"] / max(1, received["requests"])
+    results.append({"name": "payload.query.hits200.projected",
+                    "params": {"hits": 200, "hit_bytes": 1000, "fields": ["id", "similarity"]},
+                    "metrics": metrics})
+    server.configure(result_count=5, result_bytes=200)
+    return results
+
+
+def bench_faults(server: StandInServer, quick: bool) -> List[Dict[str, Any]]:
+    calls = 100 if quick else 400
+    results = []
+    scenarios = [
+        ("errors10", {"error_rate": 0.10, "rate_limit_rate": 0.0}),
+        ("ratelimit10", {"error_rate": 0.0, "rate_limit_rate": 0.10, "retry_after": 0}),
+        ("mixed30", {"error_rate": 0.20, "rate_limit_rate": 0.10, "retry_after": 0}),
+    ]
+    for label, faults in scenarios:
+        for budget in (False, True):
+            server.configure(latency=0.001, seed=7, **faults)
+            server.reset_counters()
+            hist = LatencyHistogram()
+            with Client(api_key="bench", base_url=server.url, retries=3, hooks=[hist],
+                        retry_budget=budget, pool_size=16) as c:
+                metrics = _run_threads(calls, 16, lambda i: c.query(namespace="bench", query=f"q{i}"))
+            retries = sum(row["retries"] for row in hist.summary())
+            metrics["success_rate"] = 1.0 - metrics["errors"] / calls
+            metrics["attempts_per_call"] = server.counters.get("requests", 0) / calls
+            metrics["retries"] = retries
+            results.append({"name": f"faults.{label}.{'budget' if budget else 'nobudget'}",
+                            "params": dict(faults, retries=3, retry_budget=budget, concurrency=16),
+                            "metrics": metrics})
+    server.configure(error_rate=0.0, rate_limit_rate=0.0, seed=None)
+    return results
+
+
+def bench_overhead(server: StandInServer, quick: bool) -> List[Dict[str, Any]]:
+    server.configure(latency=0.0, result_count=5, result_bytes=200)
+    calls = 300 if quick else 2000
+    rounds = 3
+    url = f"{server.url}/memory/query"
+    body = json.dumps({"namespace": "bench", "query": "overhead", "k": 5}).encode()
+
+    session = requests.Session()
+    session.headers.update({"Content-Type": "application/json", "Authorization": "Bearer bench"})
+    plain = Client(api_key="bench", base_url=server.url)
+    hooked = Client(api_key="bench", base_url=server.url, hooks=[LatencyHistogram()])
+    variants: Dict[str, Callable[[], Any]] = {
+        "raw_requests": lambda: session.post(url, data=body).json(),
+        "client": lambda: plain.query(namespace="bench", query="overhead", k=5),
+        "client.hooks": lambda: hooked.query(namespace="bench", query="overhead", k=5),
+    }
+    # Interleaved rounds, best of each: background noise hits every variant alike
+    best = {name: float("inf") for name in variants}
+    for _ in range(rounds):
+        for name, fn in variants.items():
+            for _ in range(20):
+                fn()  # warm the pool
+            t0 = time.perf_counter()
+            for _ in range(calls):
+                fn()
+            best[name] = min(best[name], (time.perf_counter() - t0) / calls * 1e6)
+    session.close()
+    plain.close()
+    hooked.close()
+
+    raw_us = best.pop("raw_requests")
+    results = [{"name": "overhead.raw_requests", "params": {"calls": calls, "rounds": rounds},
+                "metrics": {"per_call_us": raw_us}}]
+    for name, us in best.items():
+        results.append({"name": f"overhead.{name}", "params": {"calls": calls, "rounds": rounds},
+                        "metrics": {"per_call_us": us, "overhead_us": us - raw_us}})
+    return results
+
+
+def _fresh_interpreter(code: str, *args: str) -> Dict[str, float]:
+    """Run `code` in a new interpreter (cold imports, no pool); it prints a JSON dict."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])))
+    out = subprocess.run([sys.executable, "-c", code, *args], capture_output=True, text=True, check=True, env=env)
+    return json.loads(out.stdout)
+
+
+_IMPORT_CODE = """
+import json, sys, time
+t = time.perf_counter()
+exec(sys.argv[1])
+print(json.dumps({"ms": (time.perf_counter() - t) * 1000.0}))
+"""
+
+_COLDSTART_CODE = """
+import json, sys, time
+t0 = time.perf_counter()
+from persisto import Client
+t1 = time.perf_counter()
+c = Client(api_key="bench", base_url=sys.argv[1])
+warm = sys.argv[2] == "1"
+if warm:
+    c.warmup()
+t2 = time.perf_counter()
+c.query(namespace="bench", query="cold start", k=5)
+t3 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000.0, "init_ms": (t2 - t1) * 1000.0,
+                  "first_request_ms": (t3 - t2) * 1000.0, "total_ms": (t3 - t0) * 1000.0}))
+"""
+
+
+def bench_import(quick: bool) -> List[Dict[str, Any]]:
+    runs = 5 if quick else 15
+    results = []
+    for label, statement in (("persisto", "import persisto"), ("client", "from persisto import Client")):
+        samples = [_fresh_interpreter(_IMPORT_CODE, statement)["ms"] for _ in range(runs)]
+        results.append({"name": f"import.{label}", "params": {"runs": runs, "statement": statement},
+                        "metrics": {"min_ms": min(samples), "median_ms": statistics.median(samples)}})
+    return results
+
+
+def bench_coldstart(server: StandInServer, quick: bool) -> List[Dict[str, Any]]:
+    """Fresh process: import + Client() (+ warmup) + first query, against a 1ms server."""
+    server.configure(latency=0.001)
+    runs = 5 if quick else 15
+    results = []
+    for warm in (False, True):
+        samples = [_fresh_interpreter(_COLDSTART_CODE, server.url, "1" if warm else "0") for _ in range(runs)]
+        metrics = {
+            key: statistics.median(s[key] for s in samples)
+            for key in ("import_ms", "init_ms", "first_request_ms", "total_ms")
+        }
+        results.append({"name": f"coldstart.{'warmup' if warm else 'plain'}", "params": {"runs": runs, "warmup": warm},
+                        "metrics": metrics})
+    return results
+
+
+def check_budgets(report: Dict[str, Any], budgets: Dict[str, Dict[str, float]]) -> List[str]:
+    """Budget violations: every budgets[name][metric] is an upper bound."""
+    by_name = {r["name"]: r["metrics"] for r in report["results"]}
+    violations = []
+    for name, limits in budgets.items():
+        metrics = by_name.get(name)
+        if metrics is None:
+            continue
+        for metric, limit in limits.items():
+            value = metrics.get(metric)
+            if value is not None and value > limit:
+                violations.append(f"{name}.{metric} = {value:.2f} > budget {limit}")
+    return violations
+
+
+# =========================
+# Entry point
+# =========================
+
+def run(suites: List[str], quick: bool = False) -> Dict[str, Any]:
+    results: List[Dict[str, Any]] = []
+    with StandInServer() as server:
+        for suite in suites:
+            if suite == "import":
+                results.extend(bench_import(quick))
+            else:
+                results.extend(globals()[f"bench_{suite}"](server, quick))
+    return {"meta": _meta(quick), "results": results}
+
+
+def _meta(quick: bool) -> Dict[str, Any]:
+    try:
+        from importlib.metadata import version
+        sdk_version: Optional[str] = version("persisto")
+    except Exception:
+        sdk_version = None
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        rev = ""
+    return {
+        "sdk_version": sdk_version,
+        "sdk_path": os.path.dirname(persisto.__file__),
+        "git_rev": rev or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "quick": quick,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Persisto SDK benchmarks")
+    parser.add_argument("--only", default=",".join(SUITES), help=f"comma-separated subset of {','.join(SUITES)}")
+    parser.add_argument("--quick", action="store_true", help="fewer calls and levels (CI smoke run)")
+    parser.add_argument("--out", help="write JSON here instead of stdout")
+    parser.add_argument("--budgets", nargs="?", const=BUDGETS, help="fail if over the budgets in this JSON file")
+    args = parser.parse_args(argv)
+
+    suites = [s.strip() for s in args.only.split(",") if s.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {sorted(unknown)}")
+    report = run(suites, quick=args.quick)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.budgets:
+        with open(args.budgets, encoding="utf-8") as f:
+            violations = check_budgets(report, json.load(f))
+        for line in violations:
+            print(f"OVER BUDGET: {line}", file=sys.stderr)
+        if violations:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
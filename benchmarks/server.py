@@ -0,0 +1,298 @@
+# benchmarks/server.py
+"""
+Local stand-in for the Persisto API, for benchmarks and offline checks.
+
+    from benchmarks.server import StandInServer
+    with StandInServer(latency=0.005, error_rate=0.05) as srv:
+        c = Client(api_key="bench", base_url=srv.url)
+
+Implements the routes the SDK uses (/memory/save, /memory/save_batch,
+/memory/query, /memory/query_batch, /memory/delete, /memory/export, /memory/namespaces,
+/queries/list) with injectable faults:
+
+    latency          seconds added to every request (plus up to `jitter`)
+    error_rate       fraction of requests answered 503
+    rate_limit_rate  fraction of requests answered 429 with Retry-After
+    retry_after      Retry-After value sent with 429s (seconds)
+    rps_limit        requests/second over which the server answers 429 (0: off)
+    result_count     hits returned per query (capped by the request's k)
+    result_bytes     content size of each returned hit (a query's "fields"
+                     list projects the hits)
+    batch_endpoints  False: save_batch / query_batch answer 404 (old server)
+
+Settings can be changed on a running server with configure(). Responses
+are written in one send so Nagle/delayed-ACK never adds latency the real
+backend would not have. The server is a single Python process: compare
+numbers between SDK versions, not against production.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+DEFAULTS: Dict[str, Any] = {
+    "latency": 0.0,
+    "jitter": 0.0,
+    "error_rate": 0.0,
+    "rate_limit_rate": 0.0,
+    "retry_after": 0.0,
+    "rps_limit": 0.0,
+    "result_count": 5,
+    "result_bytes": 200,
+    "max_records": 10_000,
+    "batch_endpoints": True,
+    "seed": None,
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_HTTPServer"
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def do_DELETE(self) -> None:
+        self._handle("DELETE")
+
+    def _handle(self, method: str) -> None:
+        owner = self.server.owner
+        url = urlparse(self.path)
+        body = self._read_body()
+        status, payload, headers = owner.dispatch(method, url.path, body, parse_qs(url.query))
+        self._reply(status, payload, headers)
+
+    def _read_body(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if not raw:
+            return {}
+        if self.headers.get("Content-Encoding") == "gzip":
+            raw = gzip.decompress(raw)
+        elif self.headers.get("Content-Encoding") == "zstd":
+            import zstandard
+            raw = zstandard.ZstdDecompressor().decompress(raw)
+        return json.loads(raw)
+
+    def _reply(self, status: int, payload: Dict[str, Any], headers: Dict[str, str]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        if len(body) > 1024 and "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(body, compresslevel=1)
+            headers = dict(headers, **{"Content-Encoding": "gzip"})
+        lines = [f"HTTP/1.1 {status} {self.responses.get(status, ('',))[0]}"]
+        lines.append("Content-Type: application/json")
+        lines.append(f"Content-Length: {len(body)}")
+        lines.extend(f"{k}: {v}" for k, v in headers.items())
+        self.wfile.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 512
+    owner: "StandInServer"
+
+
+class StandInServer:
+    """In-process fake Persisto backend on 127.0.0.1 (see module docstring)."""
+
+    def __init__(self, port: int = 0, **config: Any):
+        self.config = dict(DEFAULTS)
+        self.configure(**config)
+        self._httpd = _HTTPServer(("127.0.0.1", port), _Handler)
+        self._httpd.owner = self
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._records: Dict[str, list] = {}
+        self._queries: list = []
+        self.counters: Dict[str, int] = {}
+        self._allowance = 0.0
+        self._allowance_at = time.monotonic()
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def configure(self, **changes: Any) -> None:
+        unknown = set(changes) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown stand-in settings: {sorted(unknown)}")
+        self.config.update(changes)
+        self._rng = random.Random(self.config["seed"])
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.counters = {}
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="persisto-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    # ---------- Request handling ----------
+
+    def dispatch(self, method: str, path: str, body: Dict[str, Any], query: Dict[str, list]):
+        cfg = self.config
+        self._count("requests")
+        delay = cfg["latency"] + (self._rng.uniform(0, cfg["jitter"]) if cfg["jitter"] else 0.0)
+        if delay:
+            time.sleep(delay)
+
+        if cfg["rps_limit"] and not self._admit(cfg["rps_limit"]):
+            self._count("limited_429")
+            return 429, {"detail": "rate limited"}, {"Retry-After": str(cfg["retry_after"])}
+
+        roll = self._rng.random()
+        if roll < cfg["rate_limit_rate"]:
+            self._count("injected_429")
+            return 429, {"detail": "rate limited"}, {"Retry-After": str(cfg["retry_after"])}
+        if roll < cfg["rate_limit_rate"] + cfg["error_rate"]:
+            self._count("injected_503")
+            return 503, {"detail": "injected failure"}, {}
+
+        route = getattr(self, _ROUTES.get((method, path), ""), None)
+        if route is None or (path.endswith("_batch") and not cfg["batch_endpoints"]):
+            return 404, {"detail": "Not found"}, {}
+        self._count(path)
+        return route(body, {k: v[0] for k, v in query.items()})
+
+    def _save(self, body: Dict[str, Any], _query: Dict[str, str]):
+        self._store(body["namespace"], [body])
+        return 200, {"status": "ok"}, {}
+
+    def _save_batch(self, body: Dict[str, Any], _query: Dict[str, str]):
+        items = body.get("items") or []
+        self._store(body["namespace"], items)
+        return 200, {"results": [{"status": "ok"} for _ in items]}, {}
+
+    def _query(self, body: Dict[str, Any], _query: Dict[str, str]):
+        cfg = self.config
+        k = int(body.get("k") or cfg["result_count"])
+        filler = "x" * cfg["result_bytes"]
+        with self._lock:
+            self._queries.append({
+                "namespace": body.get("namespace"),
+                "query": body.get("query"),
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            })
+            del self._queries[:-cfg["max_records"]]
+        results = [
+            {"id": i, "content": filler, "similarity": 1.0 - i / 100.0, "metadata": {"rank": i}}
+            for i in range(min(k, cfg["result_count"]))
+        ]
+        fields = body.get("fields")
+        if fields is not None:
+            results = [{key: value for key, value in hit.items() if key in fields} for hit in results]
+        return 200, {"results": results}, {}
+
+    def _query_batch(self, body: Dict[str, Any], query: Dict[str, str]):
+        results = [self._query(spec, query)[1] for spec in body.get("queries") or []]
+        return 200, {"results": results}, {}
+
+    def _delete(self, body: Dict[str, Any], _query: Dict[str, str]):
+        with self._lock:
+            removed = len(self._records.pop(body.get("namespace"), []))
+        return 200, {"deleted": removed}, {}
+
+    def _export(self, _body: Dict[str, Any], query: Dict[str, str]):
+        start = int(query.get("cursor") or 0)
+        limit = int(query.get("limit") or 1000)
+        with self._lock:
+            rows = list(self._records.get(query.get("namespace"), []))
+        page = rows[start:start + limit]
+        memories = [
+            {"id": start + i, "content": r["content"], "metadata": r.get("metadata") or {},
+             "created_at": r["created_at"], "expires_at": None}
+            for i, r in enumerate(page)
+        ]
+        resp: Dict[str, Any] = {"memories": memories}
+        if start + limit < len(rows):
+            resp["next_cursor"] = str(start + limit)
+        return 200, resp, {}
+
+    def _namespaces(self, _body: Dict[str, Any], _query: Dict[str, str]):
+        with self._lock:
+            return 200, {"namespaces": sorted(self._records)}, {}
+
+    def _list_queries(self, _body: Dict[str, Any], query: Dict[str, str]):
+        with self._lock:
+            rows = [q for q in self._queries if not query.get("namespace") or q["namespace"] == query["namespace"]]
+        return 200, {"queries": rows}, {}
+
+    def _store(self, namespace: str, items: list) -> None:
+        created_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        items = [dict(item, created_at=created_at) for item in items]
+        with self._lock:
+            rows = self._records.setdefault(namespace, [])
+            rows.extend(items)
+            del rows[:-self.config["max_records"]]
+
+    def _admit(self, rps: float) -> bool:
+        """Server-side token bucket (one second of burst)."""
+        with self._lock:
+            now = time.monotonic()
+            self._allowance = min(rps, self._allowance + (now - self._allowance_at) * rps)
+            self._allowance_at = now
+            if self._allowance < 1.0:
+                return False
+            self._allowance -= 1.0
+            return True
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+
+_ROUTES = {
+    ("POST", "/memory/save"): "_save",
+    ("POST", "/memory/save_batch"): "_save_batch",
+    ("POST", "/memory/query"): "_query",
+    ("POST", "/memory/query_batch"): "_query_batch",
+    ("DELETE", "/memory/delete"): "_delete",
+    ("GET", "/memory/export"): "_export",
+    ("GET", "/memory/namespaces"): "_namespaces",
+    ("GET", "/queries/list"): "_list_queries",
+}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the Persisto stand-in server")
+    parser.add_argument("--port", type=int, default=8000)
+    for name, default in DEFAULTS.items():
+        if name == "seed":
+            continue
+        flag = f"--{name.replace('_', '-')}"
+        if isinstance(default, bool):
+            # type=bool would read "False" as True: --batch-endpoints / --no-batch-endpoints
+            parser.add_argument(flag, action=argparse.BooleanOptionalAction, default=default)
+        else:
+            parser.add_argument(flag, type=type(default), default=default)
+    args = vars(parser.parse_args())
+    port = args.pop("port")
+    server = StandInServer(port=port, **args)
+    print(f"Persisto stand-in listening on {server.url}")
+    server._httpd.serve_forever()
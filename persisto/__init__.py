@@ -1,5 +1,84 @@
-from .client import PersistoClient as Client
-from .errors import PersistoAuthError
+# persisto/__init__.py
+"""
+Persisto SDK.
 
-__all__ = ["Client", "PersistoAuthError"]
+Importing the package is cheap: only the exception classes load eagerly.
+Everything else (and its dependencies: requests for Client, aiohttp for
+AsyncClient, numpy for embedded mode) is imported on first attribute access.
+"""
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
 
+from .errors import (
+    PersistoAuthError,
+    PersistoCircuitOpenError,
+    PersistoDeadlineExceeded,
+    PersistoError,
+    PersistoNotFoundError,
+    PersistoRateLimitError,
+)
+
+# public name -> (submodule, attribute)
+_LAZY: Dict[str, Tuple[str, str]] = {
+    "Client": (".client", "PersistoClient"),
+    "AsyncClient": (".aio", "AsyncPersistoClient"),
+    "QueryCache": (".cache", "QueryCache"),
+    "CacheBackend": (".cache", "CacheBackend"),
+    "MemoryCacheBackend": (".cache", "MemoryCacheBackend"),
+    "SQLiteCacheBackend": (".cache", "SQLiteCacheBackend"),
+    "SingleFlight": (".singleflight", "SingleFlight"),
+    "QueryHistoryStats": (".history", "QueryHistoryStats"),
+    "RetryBudget": (".resilience", "RetryBudget"),
+    "CircuitBreaker": (".resilience", "CircuitBreaker"),
+    "HedgePolicy": (".hedging", "HedgePolicy"),
+    "RequestHook": (".instrumentation", "RequestHook"),
+    "LatencyHistogram": (".instrumentation", "LatencyHistogram"),
+    "TracingHook": (".instrumentation", "TracingHook"),
+    "DedupIndex": (".dedup", "DedupIndex"),
+    "RateLimiter": (".ratelimit", "RateLimiter"),
+    "Deadline": (".deadline", "Deadline"),
+    "deadline_scope": (".deadline", "deadline_scope"),
+    "EndpointRouter": (".routing", "EndpointRouter"),
+    "QueryHit": (".results", "QueryHit"),
+    "QueryResult": (".results", "QueryResult"),
+}
+
+__all__ = [
+    *_LAZY,
+    "PersistoError",
+    "PersistoAuthError",
+    "PersistoNotFoundError",
+    "PersistoRateLimitError",
+    "PersistoCircuitOpenError",
+    "PersistoDeadlineExceeded",
+]
+
+
+def __getattr__(name: str) -> Any:
+    target = _LAZY.get(name)
+    if target is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(target[0], __name__), target[1])
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(__all__)
+
+
+if TYPE_CHECKING:
+    from .aio import AsyncPersistoClient as AsyncClient
+    from .cache import CacheBackend, MemoryCacheBackend, QueryCache, SQLiteCacheBackend
+    from .client import PersistoClient as Client
+    from .deadline import Deadline, deadline_scope
+    from .dedup import DedupIndex
+    from .hedging import HedgePolicy
+    from .history import QueryHistoryStats
+    from .instrumentation import LatencyHistogram, RequestHook, TracingHook
+    from .ratelimit import RateLimiter
+    from .resilience import CircuitBreaker, RetryBudget
+    from .results import QueryHit, QueryResult
+    from .routing import EndpointRouter
+    from .singleflight import SingleFlight
@@ -0,0 +1,4 @@
+# persisto/__main__.py
+from .cli import main
+
+main()
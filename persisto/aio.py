@@ -0,0 +1,632 @@
+# persisto/aio.py
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+from .client import (
+    _MIN_ATTEMPT_SECONDS,
+    PersistoAuthError,
+    PersistoCircuitOpenError,
+    PersistoDeadlineExceeded,
+    PersistoError,
+    PersistoNotFoundError,
+    PersistoRateLimitError,
+    _decode_body,
+    _delete_payload,
+    _idempotency_header,
+    _list_queries_params,
+    _pick_endpoint,
+    _profile_specs,
+    _projected,
+    _query_error,
+    _query_payload,
+    _query_spec_payload,
+    _raise_for_client_error,
+    _resolve_circuit_breakers,
+    _resolve_rate_limiter,
+    _resolve_retry_budget,
+    _resolve_router,
+    _retry_after_seconds,
+    _save_payload,
+)
+from .deadline import Deadline, current_deadline, deadline_scope
+from .hedging import HedgePolicy, hedged_call_async
+from .instrumentation import HookSet, RequestHook, RequestInfo
+from .ratelimit import RateLimiter, rate_scope
+from .resilience import CircuitBreaker, RetryBudget, full_jitter
+from .results import QueryResult, projection
+from .routing import Endpoint, EndpointRouter
+from .serialization import (
+    JSONSerializer,
+    TransferStats,
+    accept_encoding,
+    check_compression,
+    default_serializer,
+    encode_body,
+)
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None  # type: ignore[assignment]
+
+
+def _text(content: bytes) -> str:
+    return content.decode("utf-8", errors="replace")
+
+
+class AsyncPersistoClient:
+    """
+    asyncio client for Persisto with the same surface as PersistoClient.
+
+    Recommended usage:
+        from persisto import AsyncClient
+        async with AsyncClient(api_key="sk_live_xxx", max_concurrency=200) as c:
+            await c.save(namespace="support-bot", content="Customer prefers dark mode")
+            hits = await c.query(namespace="support-bot", query="theme preference", k=5)
+
+    Constructor:
+        AsyncPersistoClient(
+            api_key: str,
+            base_url: Optional[str] = None,
+            timeout: float = 15,                        # read timeout per attempt (seconds)
+            retries: int = 3,
+            max_concurrency: int = 100,                 # requests in flight at once (callers beyond this queue)
+            pool_size: Optional[int] = None,            # keep-alive connections (default: max_concurrency)
+            compression: Optional[str] = None,          # "gzip" | "zstd": compress request bodies
+            compress_min_bytes: int = 1024,             # smaller bodies are sent uncompressed
+            serializer: Optional[JSONSerializer] = None,  # default: orjson if installed, else stdlib json
+            retry_budget: Union[bool, RetryBudget] = False,        # True: process-wide RetryBudget.shared()
+            circuit_breaker: Union[bool, CircuitBreaker] = False,  # True: CircuitBreaker.for_url() per endpoint
+            hedge: Union[bool, HedgePolicy] = False,               # hedge reads past ~p95; loser is cancelled
+            hooks: Optional[Iterable[RequestHook]] = None,         # request lifecycle hooks (persisto.instrumentation)
+            rate_limit: Union[None, float, RateLimiter] = None,    # requests/second, or a shared RateLimiter
+            connect_timeout: Optional[float] = None,               # TCP/TLS connect timeout (default: timeout)
+            deadline: Optional[float] = None,                      # seconds per request, retries included
+            endpoints: Union[None, Sequence[str], EndpointRouter] = None,  # replicas to route between
+        )
+
+    Retries, errors and routing follow PersistoClient; backoff sleeps use
+    asyncio.sleep, so the event loop is never blocked.
+
+    Unlike PersistoClient there is no embedded mode (local:// URLs), query
+    cache, coalescing, dedup index or write-behind log: passing query_cache,
+    coalesce, engine, dedup_index or write_behind raises ValueError rather
+    than being ignored.
+
+    Requires the optional `aiohttp` dependency: pip install "persisto[async]"
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        timeout: float = 15,
+        retries: int = 3,
+        max_concurrency: int = 100,
+        pool_size: Optional[int] = None,
+        compression: Optional[str] = None,
+        compress_min_bytes: int = 1024,
+        serializer: Optional[JSONSerializer] = None,
+        retry_budget: Union[bool, RetryBudget] = False,
+        circuit_breaker: Union[bool, CircuitBreaker] = False,
+        hedge: Union[bool, HedgePolicy] = False,
+        hooks: Optional[Iterable[RequestHook]] = None,
+        rate_limit: Union[None, float, RateLimiter] = None,
+        connect_timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        endpoints: Union[None, Sequence[str], EndpointRouter] = None,
+        query_cache: Any = None,
+        coalesce: bool = False,
+        engine: Any = None,
+        dedup_index: Any = None,
+        write_behind: Optional[str] = None,
+    ):
+        unsupported = [
+            name for name, value in (
+                ("query_cache", query_cache), ("coalesce", coalesce), ("engine", engine),
+                ("dedup_index", dedup_index), ("write_behind", write_behind),
+            ) if value
+        ]
+        if unsupported:
+            raise ValueError(f"AsyncPersistoClient does not support {', '.join(unsupported)}; use PersistoClient")
+        if aiohttp is None:
+            raise ImportError('AsyncPersistoClient requires aiohttp: pip install "persisto[async]"')
+        if not api_key:
+            raise ValueError("Missing API key")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        self.api_key = api_key
+        self.router = _resolve_router(base_url, endpoints)
+        self.base_url = (
+            self.router.urls[0] if self.router is not None
+            else (base_url or os.getenv("PERSISTO_API_URL") or "http://localhost:8000").rstrip("/")
+        )
+        if self.base_url.startswith("local:"):
+            raise ValueError("AsyncPersistoClient has no embedded mode (local://); use PersistoClient")
+        self.timeout = float(timeout)
+        self.connect_timeout = float(connect_timeout) if connect_timeout is not None else self.timeout
+        self.deadline = float(deadline) if deadline is not None else None
+        self._attempt_seconds: Dict[str, float] = {}
+        self.retries = max(0, int(retries))
+        self.max_concurrency = int(max_concurrency)
+        self.pool_size = int(pool_size) if pool_size is not None else self.max_concurrency
+        self.compression = check_compression(compression)
+        self.compress_min_bytes = max(0, int(compress_min_bytes))
+        self.serializer = serializer if serializer is not None else default_serializer()
+        self.transfer_stats = TransferStats()
+        self.retry_budget = _resolve_retry_budget(retry_budget)
+        # One breaker per endpoint, so a failing replica cannot open the circuit for the others
+        self._breakers = _resolve_circuit_breakers(
+            circuit_breaker, self.router.urls if self.router is not None else [self.base_url]
+        )
+        self.circuit_breaker: Optional[CircuitBreaker] = (
+            circuit_breaker if isinstance(circuit_breaker, CircuitBreaker)
+            else self._breakers.get(self.base_url) if self.router is None else None
+        )
+        self.rate_limiter = _resolve_rate_limiter(rate_limit)
+        self._rate_scope = rate_scope(api_key)
+        self.hedge_policy: Optional[HedgePolicy] = HedgePolicy() if hedge is True else (hedge or None)
+        self._hooks: Optional[HookSet] = HookSet(hooks) if hooks else None
+        # None = unknown; False once /memory/query_batch 404s
+        self._bulk_query: Optional[bool] = None
+
+        # Created lazily: aiohttp sessions must be bound to a running loop
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def add_hook(self, hook: RequestHook) -> None:
+        """Register an instrumentation hook (see persisto.instrumentation.RequestHook)."""
+        if self._hooks is None:
+            self._hooks = HookSet()
+        self._hooks.hooks.append(hook)
+
+    def endpoint_stats(self) -> List[Dict[str, Any]]:
+        """
+        Per-endpoint traffic share, latency, errors and health (see
+        EndpointRouter.stats), plus "circuit" with circuit_breaker; [] without routing.
+        """
+        if self.router is None:
+            return []
+        stats = self.router.stats()
+        if self._breakers:
+            for row in stats:
+                row["circuit"] = self._breakers[row["url"]].state
+        return stats
+
+    # Context manager support
+    async def aclose(self) -> None:
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            try:
+                await session.close()
+            except Exception:
+                pass
+
+    async def __aenter__(self) -> "AsyncPersistoClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    # ---------- Public API ----------
+
+    async def save(
+        self,
+        *,
+        namespace: str,
+        content: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        ttl_seconds: Optional[int] = None,
+        deadline: Union[None, float, Deadline] = None,
+    ) -> Dict[str, Any]:
+        with deadline_scope(deadline):
+            payload = _save_payload(namespace, content, metadata, ttl_seconds)
+            return await self._request("POST", "/memory/save", json=payload, headers=_idempotency_header(payload))
+
+    async def query(
+        self,
+        *,
+        namespace: str,
+        query: str,
+        filters: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None,
+        k: Optional[int] = None,
+        profile: Optional[Dict[str, Any]] = None,
+        fields: Optional[Sequence[str]] = None,
+        include_content: bool = True,
+        deadline: Union[None, float, Deadline] = None,
+    ) -> Dict[str, Any]:
+        with deadline_scope(deadline):
+            payload = _query_payload(namespace, query, filters, mode, k, profile, projection(fields, include_content))
+            return _projected(await self._read("POST", "/memory/query", json=payload), payload)
+
+    async def query_hits(
+        self,
+        *,
+        namespace: str,
+        query: str,
+        filters: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None,
+        k: Optional[int] = None,
+        profile: Optional[Dict[str, Any]] = None,
+        fields: Optional[Sequence[str]] = None,
+        include_content: bool = True,
+        deadline: Union[None, float, Deadline] = None,
+    ) -> QueryResult:
+        """Async PersistoClient.query_hits: the query as a QueryResult of typed hits."""
+        return QueryResult(await self.query(
+            namespace=namespace, query=query, filters=filters, mode=mode, k=k, profile=profile,
+            fields=fields, include_content=include_content, deadline=deadline,
+        ))
+
+    async def query_many(
+        self,
+        queries: Sequence[Dict[str, Any]],
+        *,
+        max_workers: int = 8,
+        batch_size: int = 50,
+        deadline: Union[None, float, Deadline] = None,
+    ) -> List[Dict[str, Any]]:
+        """Async PersistoClient.query_many: one round trip per `batch_size` specs, capped fan-out without a batch endpoint."""
+        with deadline_scope(deadline):
+            if max_workers < 1 or batch_size < 1:
+                raise ValueError("max_workers and batch_size must be >= 1")
+            payloads = [_query_spec_payload(spec) for spec in queries]
+            out: List[Optional[Dict[str, Any]]] = [None] * len(payloads)
+            n = len(payloads)
+            chunks = [list(range(j, min(j + batch_size, n))) for j in range(0, n, batch_size)]
+            answered = await asyncio.gather(*(self._query_batch([payloads[i] for i in chunk]) for chunk in chunks))
+
+            fallback: List[int] = []
+            for chunk, results in zip(chunks, answered):
+                if results is None:
+                    fallback.extend(chunk)
+                else:
+                    for i, resp in zip(chunk, results):
+                        out[i] = _projected(resp, payloads[i])
+            if fallback:
+                gate = asyncio.Semaphore(max_workers)
+
+                async def single(i: int) -> None:
+                    async with gate:
+                        out[i] = _projected(await self._query_single(payloads[i]), payloads[i])
+
+                await asyncio.gather(*(single(i) for i in fallback))
+            return out  # type: ignore[return-value]
+
+    async def query_profiles(
+        self,
+        *,
+        namespace: str,
+        query: str,
+        profiles: Union[Sequence[str], Dict[str, Dict[str, Any]]] = ("strict", "fuzzy", "recency"),
+        filters: Optional[Dict[str, Any]] = None,
+        k: int = 5,
+        fetch_k: Optional[int] = None,
+        mmr_lambda: Optional[float] = None,
+        deadline: Union[None, float, Deadline] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Async PersistoClient.query_profiles: one over-fetched query, every
+        profile applied locally. Like it, assumes the server honours
+        profile=UNFILTERED_PROFILE on the over-fetch.
+        """
+        from .profiles import UNFILTERED_PROFILE, apply_profiles
+
+        specs, fetch_k = _profile_specs(profiles, k, fetch_k, mmr_lambda)
+        resp = await self.query(
+            namespace=namespace, query=query, filters=filters, k=fetch_k, profile=UNFILTERED_PROFILE, deadline=deadline
+        )
+        return apply_profiles(resp.get("results") or [], specs, k=k, now=time.time())
+
+    async def delete(
+        self,
+        *,
+        namespace: str,
+        content: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        deadline: Union[None, float, Deadline] = None,
+    ) -> Dict[str, Any]:
+        with deadline_scope(deadline):
+            payload = _delete_payload(namespace, content, metadata)
+            return await self._request("DELETE", "/memory/delete", json=payload)
+
+    async def list_namespaces(self, *, deadline: Union[None, float, Deadline] = None) -> List[str]:
+        with deadline_scope(deadline):
+            resp = await self._read("GET", "/memory/namespaces")
+            return resp.get("namespaces", [])
+
+    async def list_queries(
+        self,
+        *,
+        namespace: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        deadline: Union[None, float, Deadline] = None,
+    ) -> List[Dict[str, Any]]:
+        with deadline_scope(deadline):
+            params = _list_queries_params(namespace, start_date, end_date)
+            resp = await self._read("GET", "/queries/list", params=params)
+            return resp.get("queries", [])
+
+    # ---------- Internal HTTP ----------
+
+    async def _read(
+        self,
+        method: str,
+        path: str,
+        *,
+        json: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """_request for side-effect-free calls; hedged when enabled."""
+        if self.hedge_policy is None:
+            return await self._request(method, path, json=json, params=params)
+        return await hedged_call_async(
+            self.hedge_policy, lambda: self._request(method, path, json=json, params=params)
+        )
+
+    async def _query_batch(self, payloads: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """One POST /memory/query_batch; None when the server has no batch endpoint or garbles the answer."""
+        if self._bulk_query is False:
+            return None
+        try:
+            resp = await self._read("POST", "/memory/query_batch", json={"queries": payloads})
+        except PersistoNotFoundError:
+            self._bulk_query = False
+            return None
+        except (PersistoAuthError, PersistoDeadlineExceeded):
+            raise
+        except PersistoError as e:
+            return [_query_error(e) for _ in payloads]  # one dict per slot: callers may edit them
+        results = resp.get("results")
+        if not isinstance(results, list) or len(results) != len(payloads):
+            return None  # malformed answer: fan this chunk out as single queries
+        self._bulk_query = True
+        return results
+
+    async def _query_single(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return await self._read("POST", "/memory/query", json=payload)
+        except (PersistoAuthError, PersistoDeadlineExceeded):
+            raise
+        except PersistoError as e:
+            return _query_error(e)
+
+    def _ensure_session(self) -> "aiohttp.ClientSession":
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.pool_size)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                    "Accept": "application/json",
+                    "Accept-Encoding": accept_encoding("aiohttp"),
+                },
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        json: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        hooks = self._hooks
+        if hooks is None:
+            return await self._perform(method, path, json, params, None, headers)
+
+        info = RequestInfo(method, path, json, params)
+        hooks.emit("on_request_start", info)
+        try:
+            result = await self._perform(method, path, json, params, info, headers)
+        except BaseException as e:  # includes cancellation (e.g. a losing hedge)
+            info.finish()
+            hooks.emit("on_error", info, e)
+            raise
+        info.finish()
+        hooks.emit("on_response", info)
+        return result
+
+    async def _perform(
+        self,
+        method: str,
+        path: str,
+        json: Optional[Dict[str, Any]],
+        params: Optional[Dict[str, Any]],
+        info: Optional[RequestInfo],
+        request_headers: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        url = f"{self.base_url}{path}"
+        body, extra_headers, raw_len = encode_body(json, self.serializer, self.compression, self.compress_min_bytes)
+        if request_headers:
+            extra_headers = {**extra_headers, **request_headers}
+        breaker = self.circuit_breaker
+        limiter = self.rate_limiter
+        router = self.router
+        failed: List[Endpoint] = []
+        hooks = self._hooks
+        deadline = current_deadline()
+        if deadline is None and self.deadline is not None:
+            deadline = Deadline(self.deadline)
+        if self.retry_budget is not None:
+            self.retry_budget.record_request()
+
+        attempt = 0
+        backoff = 0.5
+        while True:
+            if deadline is not None:
+                deadline.check(f"{method} {path} after {attempt} attempts")
+            if limiter is not None:
+                wait = limiter.reserve(
+                    self._rate_scope, path, budget=deadline.remaining() if deadline is not None else None
+                )
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            if router is not None:
+                endpoint, breaker = _pick_endpoint(router, self._breakers, failed)
+                url = f"{endpoint.url}{path}"
+                if info is not None:
+                    info.base_url = endpoint.url
+            elif breaker is not None and not breaker.allow():
+                raise PersistoCircuitOpenError(
+                    f"Circuit open for {breaker.name}; retry in {breaker.retry_in():.1f}s"
+                )
+            if info is not None:
+                info.attempt = attempt
+                hooks.emit("on_attempt", info)
+            send = self._send(method, url, data=body, headers=extra_headers, params=params, info=info)
+            t_send = time.perf_counter()
+            try:
+                if deadline is None:
+                    status, headers, content = await send
+                else:
+                    # Cancels the attempt (or the wait for a concurrency slot) at the deadline
+                    status, headers, content = await asyncio.wait_for(send, max(0.001, deadline.remaining()))
+                    self._observe_attempt(path, time.perf_counter() - t_send)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if router is not None:
+                    router.report(endpoint, None, False)
+                    failed.append(endpoint)
+                if breaker is not None:
+                    breaker.record_failure()
+                if deadline is not None and deadline.expired():
+                    raise deadline.exceeded(f"{method} {path} timed out on attempt {attempt+1}") from e
+                delay = full_jitter(backoff)
+                if not self._may_retry(attempt, deadline, path, delay, f"network error: {e!r}"):
+                    raise PersistoError(f"Network error after {attempt+1} attempts: {e}")
+                await self._backoff(info, "network", delay)
+                attempt += 1
+                backoff = min(backoff * 2, 8.0)
+                continue
+            except BaseException:  # includes cancellation (e.g. a losing hedge)
+                if router is not None:
+                    router.report(endpoint, None, None)
+                raise
+            if router is not None:
+                router.report(endpoint, time.perf_counter() - t_send, status < 500)
+                if status >= 500:
+                    failed.append(endpoint)
+
+            wire = int(headers.get("Content-Length") or len(content))
+            self.transfer_stats.record(raw_len, len(body or b""), len(content), wire)
+            if info is not None:
+                info.status = status
+                info.bytes_sent += len(body or b"")
+                info.bytes_received += wire
+            if breaker is not None:
+                if status >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+
+            # Error mapping
+            if status >= 400:
+                _raise_for_client_error(status, _text(content))
+            if status == 429:
+                if limiter is not None:
+                    limiter.on_rate_limited(self._rate_scope, path, headers.get("Retry-After"))
+                delay = _retry_after_seconds(headers.get("Retry-After"), full_jitter(backoff))
+                if not self._may_retry(attempt, deadline, path, delay, "rate limited", status, _text(content)):
+                    raise PersistoRateLimitError("Rate limited", status=status, body=_text(content))
+                await self._backoff(info, "rate_limited", delay)
+                attempt += 1
+                backoff = min(backoff * 2, 8.0)
+                continue
+            if 500 <= status < 600:
+                delay = full_jitter(backoff)
+                text = _text(content)
+                if not self._may_retry(attempt, deadline, path, delay, f"server error {status}", status, text):
+                    raise PersistoError(f"Server error {status}", status=status, body=text)
+                await self._backoff(info, "server_error", delay)
+                attempt += 1
+                backoff = min(backoff * 2, 8.0)
+                continue
+
+            # Success
+            if info is None:
+                return _decode_body(status, content, self.serializer)
+            t_decode = time.perf_counter()
+            result = _decode_body(status, content, self.serializer)
+            info.timings["decode"] = time.perf_counter() - t_decode
+            return result
+
+    async def _backoff(self, info: Optional[RequestInfo], reason: str, delay: float) -> None:
+        if info is not None:
+            info.retries += 1
+            info.slept += delay
+            self._hooks.emit("on_retry", info, reason, delay)
+        await asyncio.sleep(delay)
+
+    def _may_retry(
+        self,
+        attempt: int,
+        deadline: Optional[Deadline] = None,
+        path: str = "",
+        delay: float = 0.0,
+        reason: str = "",
+        status: Optional[int] = None,
+        body: Optional[str] = None,
+    ) -> bool:
+        if attempt >= self.retries:
+            return False
+        if deadline is not None:
+            needed = delay + self._attempt_seconds.get(path, _MIN_ATTEMPT_SECONDS)
+            left = deadline.remaining()
+            if needed > left:
+                raise deadline.exceeded(
+                    f"{left:.2f}s left, a retry needs ~{needed:.2f}s (after {attempt+1} attempts, last: {reason})",
+                    status,
+                    body,
+                )
+        return self.retry_budget is None or self.retry_budget.try_acquire()
+
+    def _observe_attempt(self, path: str, seconds: float) -> None:
+        prev = self._attempt_seconds.get(path)
+        self._attempt_seconds[path] = seconds if prev is None else prev + 0.2 * (seconds - prev)
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        *,
+        data: Optional[bytes],
+        headers: Dict[str, str],
+        params: Optional[Dict[str, Any]],
+        info: Optional[RequestInfo] = None,
+    ):
+        m = method.upper()
+        if m not in ("GET", "POST", "PUT", "PATCH", "DELETE"):
+            raise PersistoError(f"Unsupported HTTP method: {method}")
+        session = self._ensure_session()
+        # Hold a slot only for the wire time, not for backoff sleeps
+        async with self._semaphore:
+            t_send = time.perf_counter()
+            async with session.request(
+                m,
+                url,
+                data=data if m != "GET" else None,
+                headers=headers,
+                params=params,
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=self.connect_timeout, sock_read=self.timeout),
+            ) as r:
+                if info is None:
+                    return r.status, r.headers, await r.read()
+                t_headers = time.perf_counter()
+                content = await r.read()
+                # aiohttp does not expose connect time per request
+                info.timings = {
+                    "connect": None,
+                    "server": t_headers - t_send,
+                    "transfer": time.perf_counter() - t_headers,
+                }
+                return r.status, r.headers, content
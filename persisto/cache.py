@@ -0,0 +1,274 @@
+# persisto/cache.py
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+# =========================
+# Backends
+# =========================
+
+class CacheBackend:
+    """
+    Storage interface for QueryCache.
+
+    Implement this to share cached query results between workers (e.g. a
+    file, a sidecar process, Redis). Keys are opaque strings; every entry
+    also records its namespace so writes can drop a whole namespace.
+    """
+
+    evictions: int = 0    # entries dropped to respect the size bound
+    expirations: int = 0  # entries dropped because their TTL passed
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def set(self, key: str, namespace: str, value: Dict[str, Any], ttl_seconds: float) -> None:
+        raise NotImplementedError
+
+    def invalidate(self, namespace: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Thread-safe in-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 1024):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.max_entries = int(max_entries)
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.Lock()
+        # key -> (expires_at, namespace, value)
+        self._entries: "OrderedDict[str, Tuple[float, str, Dict[str, Any]]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def set(self, key: str, namespace: str, value: Dict[str, Any], ttl_seconds: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, namespace, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, namespace: str) -> None:
+        with self._lock:
+            stale = [k for k, (_, ns, _) in self._entries.items() if ns == namespace]
+            for k in stale:
+                del self._entries[k]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    On-disk LRU shared by every process that opens the same path.
+
+    Uses the stdlib sqlite3 module in WAL mode, so several workers on one host
+    can read concurrently while one writes. Counters are per-process.
+
+    The entry count is kept as a running total rather than counted on every
+    write. Other processes' writes make it drift, so it is recounted when it
+    says the table is full; eviction then trims an extra tenth of
+    `max_entries`, so the recount runs once per that many inserts.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10_000):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.path = path
+        self.max_entries = int(max_entries)
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.Lock()
+        import sqlite3  # deferred: most processes never use the on-disk cache
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS query_cache ("
+            " key TEXT PRIMARY KEY,"
+            " namespace TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS query_cache_ns ON query_cache(namespace)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS query_cache_lru ON query_cache(last_used)")
+        self._count = self._conn.execute("SELECT COUNT(*) FROM query_cache").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM query_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._count -= self._conn.execute("DELETE FROM query_cache WHERE key = ?", (key,)).rowcount
+                self.expirations += 1
+                return None
+            self._conn.execute("UPDATE query_cache SET last_used = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, namespace: str, value: Dict[str, Any], ttl_seconds: float) -> None:
+        now = time.time()
+        encoded = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM query_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO query_cache (key, namespace, value, expires_at, last_used)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, namespace, encoded, now + ttl_seconds, now),
+            )
+            if exists is None:
+                self._count += 1
+            if self._count > self.max_entries:
+                self._count = self._conn.execute("SELECT COUNT(*) FROM query_cache").fetchone()[0]
+                overflow = self._count - self.max_entries
+                if overflow > 0:
+                    evicted = self._conn.execute(
+                        "DELETE FROM query_cache WHERE key IN"
+                        " (SELECT key FROM query_cache ORDER BY last_used LIMIT ?)",
+                        (overflow + self.max_entries // 10,),
+                    ).rowcount
+                    self._count -= evicted
+                    self.evictions += evicted
+
+    def invalidate(self, namespace: str) -> None:
+        with self._lock:
+            self._count -= self._conn.execute("DELETE FROM query_cache WHERE namespace = ?", (namespace,)).rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM query_cache")
+            self._count = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._count = self._conn.execute("SELECT COUNT(*) FROM query_cache").fetchone()[0]
+            return self._count
+
+
+# =========================
+# Cache front-end
+# =========================
+
+class QueryCache:
+    """
+    Opt-in client-side cache for PersistoClient.query results.
+
+    Entries are keyed on (namespace, query, filters, mode, k, profile) and
+    live for `ttl_seconds`. A save/delete through the owning client drops
+    every entry for that namespace.
+
+    Usage:
+        from persisto import Client, QueryCache
+        c = Client(api_key="...", query_cache=QueryCache(ttl_seconds=30, max_entries=2048))
+
+    Cached results are shared between callers: treat them as read-only.
+
+    Every namespace has a generation, bumped by invalidate(). A caller reads
+    generation() before fetching and passes it to set(), which drops the
+    result if the namespace was invalidated meanwhile: a save racing a
+    query can never leave the pre-save result cached.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 60.0,
+        max_entries: int = 1024,
+        backend: Optional[CacheBackend] = None,
+    ):
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be > 0")
+        self.ttl_seconds = float(ttl_seconds)
+        self.backend = backend if backend is not None else MemoryCacheBackend(max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._generations: Dict[str, int] = {}
+        self._cleared = 0  # clear() counts as an invalidation of every namespace
+
+    @staticmethod
+    def key_for(payload: Dict[str, Any]) -> str:
+        """Stable key for a /memory/query payload (dict ordering does not matter)."""
+        raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def generation(self, namespace: str) -> int:
+        with self._lock:
+            return self._cleared + self._generations.get(namespace, 0)
+
+    def set(self, key: str, namespace: str, value: Dict[str, Any], generation: Optional[int] = None) -> None:
+        """Store `value`; skipped when `generation` (from generation()) is no longer current."""
+        with self._lock:
+            if generation is not None and generation != self._cleared + self._generations.get(namespace, 0):
+                return
+            # Under the lock, so an invalidate() cannot slip between the check and the write
+            self.backend.set(key, namespace, value, self.ttl_seconds)
+
+    def invalidate(self, namespace: str) -> None:
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            self.backend.invalidate(namespace)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cleared += 1
+            self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": (hits / lookups) if lookups else 0.0,
+            "evictions": self.backend.evictions,
+            "expirations": self.backend.expirations,
+            "size": len(self.backend),
+        }
@@ -0,0 +1,161 @@
+# persisto/cli.py
+"""
+Command line interface.
+
+    persisto ingest --namespace docs ./handbook notes.md
+    persisto ingest --namespace docs ./handbook --checkpoint ingest.ckpt --workers 8 \\
+        --path-pattern '(?P<team>[^/]+)/' --meta source_system=wiki
+
+Connection settings come from --api-key / --base-url or the PERSISTO_API_KEY
+and PERSISTO_API_URL environment variables. Exit status: 0 when everything
+was saved, 1 when some chunks failed or the API refused the run (e.g. a bad
+API key), 130 when interrupted (in both of the last cases the checkpoint
+is kept, so rerunning the same command resumes).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from .errors import PersistoError
+from .ingest import DEFAULT_INCLUDE, ingest
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="persisto", description="Persisto command line tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("ingest", help="chunk text files and upload them to a namespace")
+    p.add_argument("paths", nargs="+", help="files or directories (walked recursively)")
+    p.add_argument("--namespace", "-n", required=True)
+    p.add_argument("--api-key", default=os.getenv("PERSISTO_API_KEY"), help="default: $PERSISTO_API_KEY")
+    p.add_argument("--base-url", default=None, help="default: $PERSISTO_API_URL or http://localhost:8000")
+    p.add_argument("--include", action="append", metavar="GLOB",
+                   help=f"file patterns to load (repeatable; default: {' '.join(DEFAULT_INCLUDE)})")
+    p.add_argument("--exclude", action="append", default=[], metavar="GLOB", help="file patterns to skip (repeatable)")
+    p.add_argument("--chunk-chars", type=int, default=1500, help="maximum characters per chunk")
+    p.add_argument("--overlap", type=int, default=150, help="characters repeated between neighbouring chunks")
+    p.add_argument("--meta", action="append", default=[], metavar="KEY=VALUE", help="metadata for every chunk")
+    p.add_argument("--path-pattern", metavar="REGEX", help="named groups matched on the relative path become metadata")
+    p.add_argument("--no-front-matter", action="store_true", help="keep a leading --- block as content")
+    p.add_argument("--ttl-seconds", type=int)
+    p.add_argument("--batch-size", type=int, default=100)
+    p.add_argument("--workers", type=int, default=4, help="parallel upload threads")
+    p.add_argument("--checkpoint", metavar="FILE", help="resume file; rerun the same command to continue")
+    p.add_argument("--dedup-index", metavar="FILE", help="skip chunks already saved (see persisto.dedup)")
+    p.add_argument("--rate-limit", type=float, metavar="RPS", help="client-side requests per second")
+    p.add_argument("--quiet", "-q", action="store_true", help="no progress line")
+    p.add_argument("--json", action="store_true", help="print the final report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "ingest":
+        sys.exit(_ingest(parser, args))
+
+
+def _ingest(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    if not args.api_key:
+        parser.error("an API key is required (--api-key or PERSISTO_API_KEY)")
+    metadata: Dict[str, Any] = {}
+    for pair in args.meta:
+        key, sep, value = pair.partition("=")
+        if not sep or not key:
+            parser.error(f"--meta expects KEY=VALUE, got {pair!r}")
+        metadata[key] = value
+
+    from .client import PersistoClient
+
+    client = PersistoClient(
+        api_key=args.api_key,
+        base_url=args.base_url,
+        dedup_index=args.dedup_index,
+        rate_limit=args.rate_limit,
+    )
+    printer = _Progress(sys.stderr) if not args.quiet else None
+    try:
+        report = ingest(
+            client,
+            args.namespace,
+            args.paths,
+            include=args.include or DEFAULT_INCLUDE,
+            exclude=args.exclude,
+            chunk_chars=args.chunk_chars,
+            overlap=args.overlap,
+            metadata=metadata,
+            path_pattern=args.path_pattern,
+            front_matter=not args.no_front_matter,
+            ttl_seconds=args.ttl_seconds,
+            batch_size=args.batch_size,
+            max_workers=args.workers,
+            checkpoint=args.checkpoint,
+            progress=printer,
+        )
+    except KeyboardInterrupt:
+        if printer is not None:
+            printer.finish()
+        print("Interrupted" + (f"; rerun to resume from {args.checkpoint}" if args.checkpoint else ""), file=sys.stderr)
+        return 130
+    except (OSError, ValueError) as e:  # missing paths, stale checkpoint, bad --path-pattern
+        print(f"persisto ingest: {e}", file=sys.stderr)
+        return 2
+    except PersistoError as e:  # auth errors, an expired deadline: save_many only reports per-item failures
+        if printer is not None:
+            printer.finish()
+        parser.exit(1, f"persisto: {e}\n")
+    finally:
+        client.close()
+    if printer is not None:
+        printer.finish()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        rate = report["chunks"] / report["elapsed"] if report["elapsed"] else 0.0
+        print(
+            f"{report['files']} files, {report['chunks']} chunks: {report['saved']} saved, "
+            f"{report['skipped']} skipped, {report['failed']} failed in {report['elapsed']:.1f}s ({rate:.0f} chunks/s)"
+        )
+        for err in report["errors"][:10]:
+            print(f"  chunk #{err['index']}: {err['error']}", file=sys.stderr)
+    return 1 if report["failed"] else 0
+
+
+class _Progress:
+    """Status line: rewritten in place up to 4 times a second on a terminal, one line per 5s otherwise."""
+
+    def __init__(self, stream: Any):
+        self.stream = stream
+        self.tty = stream.isatty()
+        self._last = 0.0
+        self._shown = False
+
+    def __call__(self, s: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        if now - self._last < (0.25 if self.tty else 5.0):
+            return
+        self._last = now
+        elapsed = max(s["elapsed"], 1e-9)
+        pct = 100.0 * s["bytes"] / s["bytes_total"] if s["bytes_total"] else 100.0
+        line = (
+            f"{s['files']}/{s['files_total']} files {pct:5.1f}%  {s['chunks']} chunks  "
+            f"{s['saved']} saved  {s['failed']} failed  "
+            f"{s['chunks'] / elapsed:.0f} chunks/s  {(s['bytes'] - s['bytes_resumed']) / elapsed / 1e6:.2f} MB/s"
+        )
+        if self.tty:
+            self.stream.write("\r\033[K" + line)
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+        self._shown = True
+
+    def finish(self) -> None:
+        if self._shown and self.tty:
+            self.stream.write("\n")
+            self.stream.flush()
+
+
+if __name__ == "__main__":
+    main()
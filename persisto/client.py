@@ -1,35 +1,50 @@
 # sdk/python/persisto/client.py
 from __future__ import annotations
 
+import json
 import os
+import threading
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 import requests
 
+from .deadline import Deadline, current_deadline, deadline_scope, propagate
+from .dedup import DedupIndex, idempotency_key
+from .errors import (  # noqa: F401  (re-exported: persisto.client is their historical home)
+    PersistoAuthError,
+    PersistoCircuitOpenError,
+    PersistoDeadlineExceeded,
+    PersistoError,
+    PersistoNotFoundError,
+    PersistoRateLimitError,
+)
+from .hedging import HedgePolicy, HedgeTimer, hedged_call
+from .history import QueryHistoryStats, date_windows
+from .instrumentation import HookSet, RequestHook, RequestInfo
+from .pool import ConnectionPool, take_connect_seconds
+from .ratelimit import RateLimiter, rate_scope
+from .resilience import CircuitBreaker, RetryBudget, full_jitter
+from .results import QueryResult, project_response, projection
+from .routing import Endpoint, EndpointRouter
+from .serialization import (
+    JSONSerializer,
+    TransferStats,
+    accept_encoding,
+    check_compression,
+    default_serializer,
+    encode_body,
+)
+from .singleflight import SingleFlight
+from .transfer import ImportCheckpoint, export_record, import_items, infer_format, iter_records, open_writer
 
-# =========================
-# Errors
-# =========================
-
-class PersistoError(Exception):
-    """Base SDK error with optional HTTP status and raw body."""
-    def __init__(self, message: str, status: Optional[int] = None, body: Optional[str] = None):
-        super().__init__(message)
-        self.status = status
-        self.body = body
-
-
-class PersistoAuthError(PersistoError):
-    """401/403 authentication/authorization errors."""
-
-
-class PersistoNotFoundError(PersistoError):
-    """404 not found errors."""
-
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
 
-class PersistoRateLimitError(PersistoError):
-    """429 rate-limit errors."""
+    from .cache import QueryCache
+    from .local import LocalEngine
+    from .writebehind import WriteBehindBuffer
 
 
 # =========================
@@ -50,36 +65,195 @@ class PersistoClient:
         PersistoClient(
             api_key: str,
             base_url: Optional[str] = None,
-            timeout: int = 15,
+            timeout: float = 15,                       # read timeout per attempt (seconds)
             retries: int = 3,
+            query_cache: Optional[QueryCache] = None,  # opt-in client-side query result cache
+            coalesce: bool = False,                    # share one in-flight request among identical concurrent reads
+            engine: Optional[LocalEngine] = None,      # serve calls in-process instead of over HTTP
+            write_behind: Optional[str] = None,        # directory for the write-behind save log (opt-in)
+            write_behind_max_bytes: int = 64 << 20,    # log size at which save() blocks (backpressure)
+            compression: Optional[str] = None,         # "gzip" | "zstd": compress request bodies
+            compress_min_bytes: int = 1024,            # smaller bodies are sent uncompressed
+            serializer: Optional[JSONSerializer] = None,  # default: orjson if installed, else stdlib json
+            pool_size: int = 10,                       # keep-alive connections per host
+            pool_hosts: int = 10,                      # hosts with a cached connection pool
+            pool_block: bool = False,                  # wait for a free connection instead of opening extras
+            keep_alive: bool = True,                   # False: "Connection: close" on every request
+            retry_budget: Union[bool, RetryBudget] = False,        # True: process-wide RetryBudget.shared()
+            circuit_breaker: Union[bool, CircuitBreaker] = False,  # True: CircuitBreaker.for_url() per endpoint
+            hedge: Union[bool, HedgePolicy] = False,               # hedge reads (query, list_*) past ~p95 latency
+            hooks: Optional[Iterable[RequestHook]] = None,         # request lifecycle hooks (persisto.instrumentation)
+            dedup_index: Union[None, str, DedupIndex] = None,      # path or DedupIndex: skip saves already made
+            rate_limit: Union[None, float, RateLimiter] = None,    # requests/second, or a shared RateLimiter
+            connect_timeout: Optional[float] = None,               # TCP/TLS connect timeout (default: timeout)
+            deadline: Optional[float] = None,                      # seconds per request, retries included
+            endpoints: Union[None, Sequence[str], EndpointRouter] = None,  # replicas to route between
         )
 
     Env convenience (if base_url not provided):
-        PERSISTO_API_URL  (default: http://localhost:8000)
+        PERSISTO_API_URL  (default: http://localhost:8000; "local://<dir>" for
+                           embedded mode, a comma-separated list for several replicas)
+
+    One client can be shared by any number of threads. See the README for
+    retries, caching, hedging, write-behind, rate limits and deadlines.
     """
 
-    def __init__(self, api_key: str, base_url: Optional[str] = None, timeout: int = 15, retries: int = 3):
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        timeout: float = 15,
+        retries: int = 3,
+        query_cache: Optional[QueryCache] = None,
+        coalesce: bool = False,
+        engine: Optional["LocalEngine"] = None,
+        write_behind: Optional[str] = None,
+        write_behind_max_bytes: int = 64 * 1024 * 1024,
+        compression: Optional[str] = None,
+        compress_min_bytes: int = 1024,
+        serializer: Optional[JSONSerializer] = None,
+        pool_size: int = 10,
+        pool_hosts: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        retry_budget: Union[bool, RetryBudget] = False,
+        circuit_breaker: Union[bool, CircuitBreaker] = False,
+        hedge: Union[bool, HedgePolicy] = False,
+        hooks: Optional[Iterable[RequestHook]] = None,
+        dedup_index: Union[None, str, DedupIndex] = None,
+        rate_limit: Union[None, float, RateLimiter] = None,
+        connect_timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        endpoints: Union[None, Sequence[str], EndpointRouter] = None,
+    ):
         if not api_key:
             raise ValueError("Missing API key")
         self.api_key = api_key
-        self.base_url = (base_url or os.getenv("PERSISTO_API_URL") or "http://localhost:8000").rstrip("/")
-        self.timeout = int(timeout)
+        self.router = _resolve_router(base_url, endpoints)
+        self.base_url = (
+            self.router.urls[0] if self.router is not None
+            else (base_url or os.getenv("PERSISTO_API_URL") or "http://localhost:8000").rstrip("/")
+        )
+        self.timeout = float(timeout)
+        self.connect_timeout = float(connect_timeout) if connect_timeout is not None else self.timeout
+        self.deadline = float(deadline) if deadline is not None else None
+        # Typical attempt duration per path, for "does another retry still fit?"
+        self._attempt_seconds: Dict[str, float] = {}
         self.retries = max(0, int(retries))
+        self.compression = check_compression(compression)
+        self.compress_min_bytes = max(0, int(compress_min_bytes))
+        self.serializer = serializer if serializer is not None else default_serializer()
+        self.transfer_stats = TransferStats()
+        self.retry_budget = _resolve_retry_budget(retry_budget)
+        # One breaker per endpoint, so a failing replica cannot open the circuit for the others
+        self._breakers = _resolve_circuit_breakers(
+            circuit_breaker, self.router.urls if self.router is not None else [self.base_url]
+        )
+        self.circuit_breaker: Optional[CircuitBreaker] = (
+            circuit_breaker if isinstance(circuit_breaker, CircuitBreaker)
+            else self._breakers.get(self.base_url) if self.router is None else None
+        )
+        self.rate_limiter = _resolve_rate_limiter(rate_limit)
+        self._rate_scope = rate_scope(api_key)
+        self.hedge_policy: Optional[HedgePolicy] = HedgePolicy() if hedge is True else (hedge or None)
+        self._hedge_timer: Optional[HedgeTimer] = None
+        self._hedge_pid = 0
+        self._hedge_lock = threading.Lock()
+        self._hooks: Optional[HookSet] = HookSet(hooks) if hooks else None
+        self.query_cache = query_cache
+        self.singleflight: Optional[SingleFlight] = SingleFlight() if coalesce else None
+        self._owns_dedup_index = isinstance(dedup_index, str)
+        self.dedup_index: Optional[DedupIndex] = DedupIndex(dedup_index) if self._owns_dedup_index else dedup_index
+
+        if engine is None and self.base_url.startswith("local:"):
+            from .local import LocalEngine
+            engine = LocalEngine.from_url(self.base_url)
+        self._engine = engine
 
-        # Reuse TCP connections
-        self._session = requests.Session()
-        self._session.headers.update({
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-        })
+        # None = unknown; flipped to False the first time /memory/save_batch (query_batch) 404s
+        self._bulk_save: Optional[bool] = None
+        self._bulk_query: Optional[bool] = None
+
+        # Reuse TCP connections: one urllib3 pool shared by per-thread sessions
+        self._pool = ConnectionPool(
+            {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+                "Accept-Encoding": accept_encoding(),
+            },
+            pool_size=pool_size,
+            pool_hosts=pool_hosts,
+            pool_block=pool_block,
+            keep_alive=keep_alive,
+        )
+
+        # Last: the flusher thread starts sending (replayed saves included) at once
+        self.write_behind: Optional[WriteBehindBuffer] = None
+        if write_behind:
+            from .writebehind import WriteBehindBuffer
+            self.write_behind = WriteBehindBuffer(self, write_behind, max_log_bytes=write_behind_max_bytes)
 
     # Context manager support
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until write-behind saves reach the server (no-op otherwise). False on timeout."""
+        if self.write_behind is None:
+            return True
+        return self.write_behind.flush(timeout)
+
     def close(self) -> None:
+        if self.write_behind is not None:
+            self.write_behind.close()
+        if self._owns_dedup_index:
+            self.dedup_index.close()
+        if self._hedge_timer is not None:
+            self._hedge_timer.close()
+            self._hedge_timer = None
         try:
-            self._session.close()
+            self._pool.close()
         except Exception:
             pass
+        if self._engine is not None:
+            self._engine.close()
+
+    def warmup(self, connections: int = 1, timeout: Optional[float] = None) -> int:
+        """
+        Pay connection set-up before the first call: open `connections`
+        pooled keep-alive connections (DNS + TCP + TLS) to base_url (to
+        every endpoint when routing) and load the lazily imported modules
+        that call needs. No request is sent.
+
+        Call it during serverless init / worker boot. Returns the number of
+        ready connections (0 in embedded mode).
+        """
+        if self._engine is not None:
+            return 0
+        timeout = timeout if timeout is not None else self.connect_timeout
+        urls = self.router.urls if self.router is not None else [self.base_url]
+        return sum(self._pool.warmup(url, connections, timeout) for url in urls)
+
+    def add_hook(self, hook: RequestHook) -> None:
+        """Register an instrumentation hook (see persisto.instrumentation.RequestHook)."""
+        if self._hooks is None:
+            self._hooks = HookSet()
+        self._hooks.hooks.append(hook)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Requests, new connections and reuse_ratio for this client's HTTP pool."""
+        return self._pool.stats()
+
+    def endpoint_stats(self) -> List[Dict[str, Any]]:
+        """
+        Per-endpoint traffic share, latency, errors and health (see
+        EndpointRouter.stats), plus "circuit" with circuit_breaker; [] without routing.
+        """
+        if self.router is None:
+            return []
+        stats = self.router.stats()
+        if self._breakers:
+            for row in stats:
+                row["circuit"] = self._breakers[row["url"]].state
+        return stats
 
     def __enter__(self) -> "PersistoClient":
         return self
@@ -96,15 +270,34 @@ class PersistoClient:
         content: str,
         metadata: Optional[Dict[str, Any]] = None,
         ttl_seconds: Optional[int] = None,
+        deadline: Union[None, float, Deadline] = None,
     ) -> Dict[str, Any]:
-        payload: Dict[str, Any] = {
-            "namespace": namespace,
-            "content": content,
-            "metadata": metadata or {},
-        }
-        if ttl_seconds is not None:
-            payload["ttl_seconds"] = int(ttl_seconds)
-        return self._request("POST", "/memory/save", json=payload)
+        """
+        Save one memory. The payload carries an `idempotency_key` (also sent
+        as the Idempotency-Key header), so a retried save is stored once.
+
+        With a dedup_index, a save already accepted returns
+        {"status": "duplicate"} without a request. In write-behind mode the
+        save is appended to the local log and {"status": "queued", "seq": n}
+        returns at once; flush() waits for delivery, and only delivered
+        saves are added to the dedup_index.
+        """
+        payload = _save_payload(namespace, content, metadata, ttl_seconds)
+        key = payload["idempotency_key"]
+        index = self.dedup_index
+        if index is not None and index.contains(key):
+            return {"status": "duplicate", "idempotency_key": key}
+        if self.write_behind is not None:
+            # The index learns the key when the flusher delivers it; a rejected save stays unknown
+            return self.write_behind.append(payload)
+        try:
+            with deadline_scope(deadline):
+                resp = self._request("POST", "/memory/save", json=payload, headers=_idempotency_header(payload))
+        finally:
+            self._invalidate_cache(namespace)
+        if index is not None and _response_error(resp) is None:
+            index.add(key, namespace, content, ttl_seconds)
+        return resp
 
     def query(
         self,
@@ -115,19 +308,172 @@ class PersistoClient:
         mode: Optional[str] = None,            # "strict" | "fuzzy" | "recency" (optional)
         k: Optional[int] = None,               # optional override for top-k
         profile: Optional[Dict[str, Any]] = None,  # optional client-side config; server may ignore
+        fields: Optional[Sequence[str]] = None,    # hit keys to return (see persisto.results.HIT_FIELDS)
+        include_content: bool = True,
+        deadline: Union[None, float, Deadline] = None,
     ) -> Dict[str, Any]:
-        payload: Dict[str, Any] = {
-            "namespace": namespace,
-            "query": query,
-            "filters": filters or {},
-        }
-        if mode:
-            payload["mode"] = mode
-        if k is not None:
-            payload["k"] = int(k)
-        if profile:
-            payload["profile"] = profile
-        return self._request("POST", "/memory/query", json=payload)
+        with deadline_scope(deadline):
+            payload = _query_payload(namespace, query, filters, mode, k, profile, projection(fields, include_content))
+            if self.query_cache is None:
+                return _projected(self._read("POST", "/memory/query", json=payload), payload)
+
+            key = self.query_cache.key_for(payload)
+            cached = self.query_cache.get(key)
+            if cached is not None:
+                return cached
+            generation = self.query_cache.generation(namespace)
+            resp = _projected(self._read("POST", "/memory/query", json=payload), payload)
+            if _response_error(resp) is None:
+                self.query_cache.set(key, namespace, resp, generation)
+            return resp
+
+    def query_hits(
+        self,
+        *,
+        namespace: str,
+        query: str,
+        filters: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None,
+        k: Optional[int] = None,
+        profile: Optional[Dict[str, Any]] = None,
+        fields: Optional[Sequence[str]] = None,
+        include_content: bool = True,
+        deadline: Union[None, float, Deadline] = None,
+    ) -> QueryResult:
+        """
+        query() returning a QueryResult: a sequence of typed QueryHit views
+        over the decoded response (see persisto.results).
+
+        `fields` / `include_content=False` project the hits: the server is
+        asked for only those keys, and a server that ignores the request
+        has the rest dropped on arrival, so the shape never depends on the
+        server version. For ids and scores alone ("score" also fetches the
+        "similarity" it falls back to):
+
+            top = client.query_hits(namespace="docs", query=q, fields=("id", "score"))
+            ids, scores = top.ids(), top.scores()
+        """
+        return QueryResult(self.query(
+            namespace=namespace, query=query, filters=filters, mode=mode, k=k, profile=profile,
+            fields=fields, include_content=include_content, deadline=deadline,
+        ))
+
+    def query_many(
+        self,
+        queries: Sequence[Dict[str, Any]],
+        *,
+        max_workers: int = 8,
+        batch_size: int = 50,
+        deadline: Union[None, float, Deadline] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Run several queries in one round trip.
+
+        Each spec is a dict of query() arguments: `namespace`, `query` and
+        optional `filters` / `mode` / `k` / `profile` / `fields` /
+        `include_content`. Specs go to
+        POST /memory/query_batch, `batch_size` per request; if the server has
+        no batch endpoint (404) or answers a batch with a malformed body,
+        they fan out as single queries on up to `max_workers` threads. The query cache is consulted per spec.
+
+        Returns one entry per spec, in input order: the query() response, or
+        {"error": str, "status": Optional[int]} for a query that failed.
+        Auth errors and an expired `deadline` are raised.
+        """
+        with deadline_scope(deadline):
+            if max_workers < 1 or batch_size < 1:
+                raise ValueError("max_workers and batch_size must be >= 1")
+            payloads = [_query_spec_payload(spec) for spec in queries]
+            out: List[Optional[Dict[str, Any]]] = [None] * len(payloads)
+            keys: Dict[int, str] = {}
+            generations: Dict[int, int] = {}
+            pending: List[int] = []
+            for i, payload in enumerate(payloads):
+                if self.query_cache is not None:
+                    keys[i] = self.query_cache.key_for(payload)
+                    cached = self.query_cache.get(keys[i])
+                    if cached is not None:
+                        out[i] = cached
+                        continue
+                    generations[i] = self.query_cache.generation(payload["namespace"])
+                pending.append(i)
+
+            chunks = [pending[j:j + batch_size] for j in range(0, len(pending), batch_size)]
+            fallback: List[int] = []
+
+            @propagate
+            def run_chunk(chunk: List[int]) -> Tuple[List[int], Optional[List[Dict[str, Any]]]]:
+                return chunk, self._query_batch([payloads[i] for i in chunk])
+
+            if len(chunks) <= 1 or self._bulk_query is False:
+                answered = map(run_chunk, chunks)
+            else:
+                from concurrent.futures import ThreadPoolExecutor
+
+                with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+                    answered = list(pool.map(run_chunk, chunks))
+            for chunk, results in answered:
+                if results is None:
+                    fallback.extend(chunk)
+                else:
+                    for i, resp in zip(chunk, results):
+                        out[i] = _projected(resp, payloads[i])
+
+            if len(fallback) == 1:
+                out[fallback[0]] = _projected(self._query_single(payloads[fallback[0]]), payloads[fallback[0]])
+            elif fallback:
+                from concurrent.futures import ThreadPoolExecutor
+
+                with ThreadPoolExecutor(max_workers=min(max_workers, len(fallback))) as pool:
+                    query_single = propagate(self._query_single)
+                    for i, resp in zip(fallback, pool.map(query_single, [payloads[i] for i in fallback])):
+                        out[i] = _projected(resp, payloads[i])
+
+            if self.query_cache is not None:
+                for i in pending:
+                    if _response_error(out[i]) is None:
+                        self.query_cache.set(keys[i], payloads[i]["namespace"], out[i], generations[i])
+            return out  # type: ignore[return-value]
+
+    def query_profiles(
+        self,
+        *,
+        namespace: str,
+        query: str,
+        profiles: Union[Sequence[str], Dict[str, Dict[str, Any]]] = ("strict", "fuzzy", "recency"),
+        filters: Optional[Dict[str, Any]] = None,
+        k: int = 5,
+        fetch_k: Optional[int] = None,
+        mmr_lambda: Optional[float] = None,
+        deadline: Union[None, float, Deadline] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Results for several retrieval profiles from one query.
+
+        `profiles` is a list of mode names, or {name: spec} where a spec
+        holds "mode" and/or "min_sim", "recency_weight", "half_life_seconds",
+        "k" and "mmr_lambda" (see persisto.profiles). One query fetches the
+        `fetch_k` most similar memories (default 4x the largest k) with no
+        threshold; every profile is then applied locally to that candidate
+        set: threshold, recency re-scoring, top-k and, with `mmr_lambda`,
+        MMR de-duplication. A profile only ever sees those candidates, so
+        raise fetch_k when recency should surface older-but-weaker matches.
+
+        The over-fetch is sent with profile=UNFILTERED_PROFILE
+        ({"min_sim": -1.0, "recency_weight": 0.0}), assuming the server
+        honours a per-request profile. One that ignores it applies its
+        default threshold first, and looser profiles then get fewer
+        candidates than they should.
+
+        Returns {name: {"results": [...]}}. Needs numpy.
+        """
+        from .profiles import UNFILTERED_PROFILE, apply_profiles
+
+        specs, fetch_k = _profile_specs(profiles, k, fetch_k, mmr_lambda)
+        resp = self.query(
+            namespace=namespace, query=query, filters=filters, k=fetch_k, profile=UNFILTERED_PROFILE, deadline=deadline
+        )
+        return apply_profiles(resp.get("results") or [], specs, k=k, now=time.time())
 
     def delete(
         self,
@@ -135,17 +481,180 @@ class PersistoClient:
         namespace: str,
         content: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None,
+        deadline: Union[None, float, Deadline] = None,
+    ) -> Dict[str, Any]:
+        with deadline_scope(deadline):
+            payload = _delete_payload(namespace, content, metadata)
+            if self.dedup_index is not None:
+                # Before the request: if it fails, re-saving costs a round trip, never a lost write
+                self.dedup_index.forget(namespace, content)
+            try:
+                return self._request("DELETE", "/memory/delete", json=payload)
+            finally:
+                self._invalidate_cache(namespace)
+
+    def save_many(
+        self,
+        *,
+        namespace: str,
+        items: Iterable[Union[str, Dict[str, Any]]],
+        batch_size: int = 100,
+        max_workers: int = 4,
+        deadline: Union[None, float, Deadline] = None,
+    ) -> Dict[str, Any]:
+        """
+        Save many memories with batched, parallel uploads.
+
+        `items` may be any iterable, including a generator: it is consumed
+        incrementally and at most ~2 * max_workers batches are held at once.
+        Each item is either a content string or a dict with `content` and
+        optional `metadata` / `ttl_seconds`.
+
+        Batches go to POST /memory/save_batch; if the server has no bulk
+        endpoint (404), every batch falls back to single-item saves. With a
+        dedup_index, items already saved (or repeated within `items`) are
+        counted in `skipped` and not sent.
+
+        Returns:
+            {"total": int, "saved": int, "skipped": int, "failed": int,
+             "errors": [{"index": int, "error": str, "status": Optional[int], "retryable": bool}]}
+        A bad item or a batch that exhausts its retries is recorded in
+        `errors` (by input index) and the run carries on. `retryable` marks
+        transient failures (network, 5xx, 429) worth re-sending. An expired
+        `deadline` stops the run with PersistoDeadlineExceeded.
+        """
+        with deadline_scope(deadline):
+            return self._run_saves(namespace, items, batch_size, max_workers)
+
+    def iter_memories(
+        self,
+        *,
+        namespace: str,
+        page_size: int = 1000,
+        include_embeddings: bool = False,
+        deadline: Union[None, float, Deadline] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield every live memory in a namespace ({"id", "content",
+        "metadata", "created_at", "expires_at"} plus "embedding" when asked),
+        following GET /memory/export's `next_cursor` one page at a time.
+        A `deadline` covers the whole iteration, from the first page on.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be >= 1")
+        params: Dict[str, Any] = {"namespace": namespace, "limit": int(page_size)}
+        if include_embeddings:
+            params["include_embeddings"] = "true"
+        scope = deadline_scope(deadline)
+        while True:
+            with scope:
+                resp = self._read("GET", "/memory/export", params=params)
+            yield from resp.get("memories", [])
+            cursor = resp.get("next_cursor")
+            if not cursor:
+                break
+            params = {**params, "cursor": cursor}
+
+    def export_namespace(
+        self,
+        *,
+        namespace: str,
+        path: str,
+        format: Optional[str] = None,
+        include_embeddings: bool = False,
+        page_size: int = 1000,
+        deadline: Union[None, float, Deadline] = None,
+    ) -> Dict[str, Any]:
+        """
+        Stream a namespace to a file: NDJSON (gzipped for "*.gz") or, with
+        format="parquet" / a *.parquet path, columnar via pyarrow. See
+        persisto.transfer for the record layout. Memory use is one page.
+
+        The file appears at `path` only once the export completes.
+        Returns {"namespace", "path", "format", "exported"}.
+        """
+        with deadline_scope(deadline):
+            fmt = infer_format(path, format)
+            with open_writer(path, fmt, include_embeddings=include_embeddings, serializer=self.serializer) as writer:
+                page: List[Dict[str, Any]] = []
+                for memory in self.iter_memories(
+                    namespace=namespace, page_size=page_size, include_embeddings=include_embeddings
+                ):
+                    page.append(export_record(memory, include_embeddings))
+                    if len(page) >= page_size:
+                        writer.write_many(page)
+                        page = []
+                writer.write_many(page)
+            return {"namespace": namespace, "path": path, "format": fmt, "exported": writer.count}
+
+    def import_namespace(
+        self,
+        *,
+        namespace: str,
+        path: str,
+        format: Optional[str] = None,
+        include_embeddings: bool = False,
+        batch_size: int = 100,
+        max_workers: int = 4,
+        checkpoint: Optional[str] = None,
+        deadline: Union[None, float, Deadline] = None,
     ) -> Dict[str, Any]:
-        payload: Dict[str, Any] = {"namespace": namespace}
-        if content is not None:
-            payload["content"] = content
-        if metadata is not None:
-            payload["metadata"] = metadata
-        return self._request("DELETE", "/memory/delete", json=payload)
+        """
+        Stream an export_namespace file into `namespace` with save_many's
+        pipeline: records are read lazily, uploaded in batches by
+        `max_workers` threads, and reading pauses while ~2 * max_workers
+        batches are in flight (429s are retried per Retry-After).
 
-    def list_namespaces(self) -> List[str]:
-        resp = self._request("GET", "/memory/namespaces")
-        return resp.get("namespaces", [])
+        Remaining TTLs are carried over; records already expired count as
+        `skipped`. The server stamps new created_at values. With
+        include_embeddings=True, stored embeddings are sent along; only use
+        it when both sides run the same embedding model.
+
+        With `checkpoint` (a file path), the position up to which every
+        record has been sent is saved as batches finish, and a rerun resumes
+        there; the file is removed when the import completes. Idempotency
+        keys make the few re-sent records harmless.
+
+        Returns save_many's report plus "resumed_from" (records skipped via
+        the checkpoint); error indexes are record positions in the file.
+        """
+        with deadline_scope(deadline):
+            fmt = infer_format(path, format)
+            ckpt = ImportCheckpoint(checkpoint, path, namespace) if checkpoint else None
+            start = ckpt.load() if ckpt is not None else 0
+            records = iter_records(path, fmt, start=start, batch_rows=batch_size * 10, serializer=self.serializer)
+            items = import_items(records, time.time(), include_embeddings, _SKIP_ITEM)
+
+            if ckpt is None:
+                report = self._run_saves(namespace, items, batch_size, max_workers, start=start)
+                report["resumed_from"] = start
+                return report
+
+            progress: Dict[str, Any] = {"position": start, "counts": {}, "written": 0.0}
+
+            def on_progress(position: int, report: Dict[str, Any]) -> None:
+                progress["position"] = position
+                progress["counts"] = {k: report[k] for k in ("saved", "skipped", "failed")}
+                now = time.monotonic()
+                if now - progress["written"] >= 1.0:  # at most one checkpoint write per second
+                    progress["written"] = now
+                    ckpt.save(position, progress["counts"])
+
+            try:
+                report = self._run_saves(
+                    namespace, items, batch_size, max_workers, start=start, on_progress=on_progress
+                )
+            except BaseException:
+                ckpt.save(progress["position"], progress["counts"])
+                raise
+            ckpt.remove()
+            report["resumed_from"] = start
+            return report
+
+    def list_namespaces(self, *, deadline: Union[None, float, Deadline] = None) -> List[str]:
+        with deadline_scope(deadline):
+            resp = self._read("GET", "/memory/namespaces")
+            return resp.get("namespaces", [])
 
     def list_queries(
         self,
@@ -153,16 +662,331 @@ class PersistoClient:
         namespace: Optional[str] = None,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
+        deadline: Union[None, float, Deadline] = None,
     ) -> List[Dict[str, Any]]:
-        params: Dict[str, Any] = {}
-        if namespace:
-            params["namespace"] = namespace
-        if start_date:
-            params["start_date"] = start_date
-        if end_date:
-            params["end_date"] = end_date
-        resp = self._request("GET", "/queries/list", params=params)
-        return resp.get("queries", [])
+        with deadline_scope(deadline):
+            params = _list_queries_params(namespace, start_date, end_date)
+            resp = self._read("GET", "/queries/list", params=params)
+            return resp.get("queries", [])
+
+    def iter_queries(
+        self,
+        *,
+        namespace: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        page_size: int = 500,
+        window_days: Optional[int] = None,
+        deadline: Union[None, float, Deadline] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield query-history records, one page at a time.
+
+        Each request asks /queries/list for `page_size` records and follows the
+        server's `next_cursor` until it is exhausted. With `window_days` (needs
+        both start_date and end_date) the range is also split into date
+        windows, which bounds each response on servers without cursors.
+        Only one page is held in memory at a time. A `deadline` covers the
+        whole iteration, from the first page on.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be >= 1")
+        if window_days is not None:
+            if not (start_date and end_date):
+                raise ValueError("window_days requires start_date and end_date")
+            windows: Iterable[Tuple[Optional[str], Optional[str]]] = date_windows(start_date, end_date, window_days)
+        else:
+            windows = [(start_date, end_date)]
+
+        scope = deadline_scope(deadline)
+        for lo, hi in windows:
+            params = _list_queries_params(namespace, lo, hi)
+            params["limit"] = int(page_size)
+            while True:
+                with scope:
+                    resp = self._read("GET", "/queries/list", params=params)
+                yield from resp.get("queries", [])
+                cursor = resp.get("next_cursor")
+                if not cursor:
+                    break
+                params = {**params, "cursor": cursor}
+
+    def summarize_queries(
+        self,
+        *,
+        namespace: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        page_size: int = 500,
+        window_days: Optional[int] = None,
+        top_n: int = 10,
+        deadline: Union[None, float, Deadline] = None,
+    ) -> Dict[str, Any]:
+        """
+        Usage report over query history in one bounded-memory pass.
+
+        Returns {"total", "by_namespace", "by_day", "top_queries"}; see
+        persisto.history.QueryHistoryStats.
+        """
+        with deadline_scope(deadline):
+            stats = QueryHistoryStats(top_capacity=max(1000, top_n * 10))
+            stats.update(self.iter_queries(
+                namespace=namespace,
+                start_date=start_date,
+                end_date=end_date,
+                page_size=page_size,
+                window_days=window_days,
+            ))
+            return stats.summary(top_n=top_n)
+
+    # ---------- Internal helpers ----------
+
+    def _read(
+        self,
+        method: str,
+        path: str,
+        *,
+        json: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """_request for side-effect-free calls: hedged and/or coalesced when enabled."""
+        def call() -> Dict[str, Any]:
+            return self._request(method, path, json=json, params=params)
+
+        if self.hedge_policy is not None and self._engine is None:
+            unhedged = call
+
+            def call() -> Dict[str, Any]:
+                parent = current_deadline()
+                if parent is None and self.deadline is not None:
+                    parent = Deadline(self.deadline)
+                # Own deadline for the primary, so a winning hedge can stop it without stopping itself
+                primary = Deadline(float("inf"), parent=parent)
+                thread_id = threading.get_ident()
+
+                def run_primary() -> Dict[str, Any]:
+                    with deadline_scope(primary):
+                        return unhedged()
+
+                def cancel_primary() -> None:
+                    primary.cancel()
+                    self._pool.abort(thread_id)
+
+                return hedged_call(
+                    self.hedge_policy, self._hedge_scheduler(), run_primary, propagate(unhedged), cancel_primary
+                )
+
+        if self.singleflight is None:
+            return call()
+        key = _request_key(method, path, json, params)
+        # The leader's deadline or cancellation is its own: followers with time left take over instead
+        private = (PersistoDeadlineExceeded,)
+        deadline = current_deadline()
+        if deadline is None:
+            return self.singleflight.do(key, call, private=private)
+        try:
+            return self.singleflight.do(key, call, timeout=deadline.check(path), private=private)
+        except TimeoutError:
+            raise deadline.exceeded(f"waiting for a coalesced {method} {path}") from None
+
+    def _hedge_scheduler(self) -> HedgeTimer:
+        # Threads do not survive a fork: rebuild in the child
+        timer = self._hedge_timer
+        if timer is not None and self._hedge_pid == os.getpid():
+            return timer
+        with self._hedge_lock:
+            if self._hedge_timer is None or self._hedge_pid != os.getpid():
+                from concurrent.futures import ThreadPoolExecutor
+                self._hedge_timer = HedgeTimer(ThreadPoolExecutor(
+                    max_workers=self._pool.pool_size * 2, thread_name_prefix="persisto-hedge"
+                ))
+                self._hedge_pid = os.getpid()
+            return self._hedge_timer
+
+    def _invalidate_cache(self, namespace: str) -> None:
+        if self.query_cache is not None:
+            self.query_cache.invalidate(namespace)
+
+    def _run_saves(
+        self,
+        namespace: str,
+        items: Iterable[Any],
+        batch_size: int,
+        max_workers: int,
+        start: int = 0,
+        on_progress: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        The save_many pipeline. Batches settle in submission order, so after
+        each one every item before the reported position has been handled.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+
+        report: Dict[str, Any] = {"total": 0, "saved": 0, "skipped": 0, "failed": 0, "errors": []}
+        # (input position after the batch, future) in submission order
+        inflight: "deque[Tuple[int, Future]]" = deque()
+
+        def settle_oldest() -> None:
+            position, fut = inflight.popleft()
+            saved, errors = fut.result()
+            report["saved"] += saved
+            report["failed"] += len(errors)
+            report["errors"].extend(errors)
+            if on_progress is not None:
+                on_progress(position, report)
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        save_batch = propagate(self._save_batch)
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                for batch in self._save_batches(namespace, items, batch_size, report, start):
+                    if len(inflight) >= max_workers * 2:
+                        settle_oldest()  # backpressure: stop reading until the oldest batch lands
+                    inflight.append((start + report["total"], pool.submit(save_batch, namespace, batch)))
+                    while inflight and inflight[0][1].done():
+                        settle_oldest()
+                while inflight:
+                    settle_oldest()
+        finally:
+            self._invalidate_cache(namespace)
+
+        report["errors"].sort(key=lambda e: e["index"])
+        return report
+
+    def _save_batches(
+        self,
+        namespace: str,
+        items: Iterable[Any],
+        batch_size: int,
+        report: Dict[str, Any],
+        start: int = 0,
+    ) -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+        """Group items into (index, payload) batches; invalid items are reported, not sent."""
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        dedup = self.dedup_index
+        seen: set = set()  # keys in the batch being built; the index covers earlier ones
+        for index, item in enumerate(items, start):
+            report["total"] += 1
+            if item is _SKIP_ITEM:
+                report["skipped"] += 1
+                continue
+            try:
+                payload = _save_item_payload(namespace, item)
+            except (TypeError, ValueError) as e:
+                report["failed"] += 1
+                report["errors"].append({"index": index, "error": str(e), "status": None, "retryable": False})
+                continue
+            if dedup is not None:
+                key = payload["idempotency_key"]
+                if key in seen or dedup.contains(key):
+                    report["skipped"] += 1
+                    continue
+                seen.add(key)
+            batch.append((index, payload))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+                seen.clear()
+        if batch:
+            yield batch
+
+    def _save_batch(
+        self,
+        namespace: str,
+        batch: List[Tuple[int, Dict[str, Any]]],
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """Send one batch; returns (saved count, per-item errors)."""
+        if self._bulk_save is not False:
+            body = {
+                "namespace": namespace,
+                "items": [{k: v for k, v in p.items() if k != "namespace"} for _, p in batch],
+            }
+            try:
+                resp = self._request("POST", "/memory/save_batch", json=body)
+            except PersistoNotFoundError:
+                self._bulk_save = False
+            except (PersistoAuthError, PersistoDeadlineExceeded):
+                raise
+            except PersistoError as e:
+                return 0, [{"index": i, "error": str(e), "status": e.status, "retryable": True} for i, _ in batch]
+            else:
+                self._bulk_save = True
+                results = resp.get("results")
+                if isinstance(results, list) and len(results) == len(batch):
+                    errors = []
+                    accepted = []
+                    for (index, payload), item in zip(batch, results):
+                        err = _response_error(item)
+                        if err is not None:
+                            errors.append({"index": index, "error": err, "status": None, "retryable": False})
+                        else:
+                            accepted.append(payload)
+                    self._remember_saved(accepted)
+                    return len(batch) - len(errors), errors
+                if _response_error(resp) is None:
+                    self._remember_saved([p for _, p in batch])
+                    return len(batch), []
+                # Whole batch rejected (e.g. one malformed record): isolate per item
+
+        saved = 0
+        errors: List[Dict[str, Any]] = []
+        accepted = []
+        for index, payload in batch:
+            try:
+                resp = self._request("POST", "/memory/save", json=payload, headers=_idempotency_header(payload))
+            except (PersistoAuthError, PersistoDeadlineExceeded):
+                raise
+            except PersistoError as e:
+                retryable = not isinstance(e, PersistoNotFoundError)
+                errors.append({"index": index, "error": str(e), "status": e.status, "retryable": retryable})
+                continue
+            err = _response_error(resp)
+            if err is not None:
+                errors.append({"index": index, "error": err, "status": None, "retryable": False})
+            else:
+                saved += 1
+                accepted.append(payload)
+        self._remember_saved(accepted)
+        return saved, errors
+
+    def _remember_saved(self, payloads: List[Dict[str, Any]]) -> None:
+        if self.dedup_index is not None and payloads:
+            self.dedup_index.add_many(
+                (p["idempotency_key"], p["namespace"], p["content"], p.get("ttl_seconds"))
+                for p in payloads
+                if "idempotency_key" in p  # write-behind logs from before keys existed
+            )
+
+    def _query_batch(self, payloads: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """One POST /memory/query_batch; None when the server has no batch endpoint or garbles the answer."""
+        if self._bulk_query is False:
+            return None
+        try:
+            resp = self._read("POST", "/memory/query_batch", json={"queries": payloads})
+        except PersistoNotFoundError:
+            self._bulk_query = False
+            return None
+        except (PersistoAuthError, PersistoDeadlineExceeded):
+            raise
+        except PersistoError as e:
+            return [_query_error(e) for _ in payloads]  # one dict per slot: callers may edit them
+        results = resp.get("results")
+        if not isinstance(results, list) or len(results) != len(payloads):
+            return None  # malformed answer: fan this chunk out as single queries
+        self._bulk_query = True
+        return results
+
+    def _query_single(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return self._read("POST", "/memory/query", json=payload)
+        except (PersistoAuthError, PersistoDeadlineExceeded):
+            raise
+        except PersistoError as e:
+            return _query_error(e)
 
     # ---------- Internal HTTP ----------
 
@@ -173,67 +997,489 @@ class PersistoClient:
         *,
         json: Optional[Dict[str, Any]] = None,
         params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
     ) -> Dict[str, Any]:
+        if self._engine is not None:
+            return self._engine.handle(method, path, json=json, params=params)
+        hooks = self._hooks
+        if hooks is None:
+            return self._perform(method, path, json, params, None, headers)
+
+        info = RequestInfo(method, path, json, params)
+        hooks.emit("on_request_start", info)
+        try:
+            result = self._perform(method, path, json, params, info, headers)
+        except Exception as e:
+            info.finish()
+            hooks.emit("on_error", info, e)
+            raise
+        info.finish()
+        hooks.emit("on_response", info)
+        return result
+
+    def _perform(
+        self,
+        method: str,
+        path: str,
+        json: Optional[Dict[str, Any]],
+        params: Optional[Dict[str, Any]],
+        info: Optional[RequestInfo],
+        extra_headers: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """The HTTP attempt/retry loop; `info` is None unless hooks are registered."""
         url = f"{self.base_url}{path}"
+        body, headers, raw_len = encode_body(json, self.serializer, self.compression, self.compress_min_bytes)
+        if extra_headers:
+            headers = {**headers, **extra_headers}
+        breaker = self.circuit_breaker
+        limiter = self.rate_limiter
+        router = self.router
+        failed: List[Endpoint] = []  # endpoints that failed this call: retries go elsewhere
+        hooks = self._hooks
+        deadline = current_deadline()
+        if deadline is None and self.deadline is not None:
+            deadline = Deadline(self.deadline)
+        timeout: Union[float, Tuple[float, float]] = (self.connect_timeout, self.timeout)
+        if self.retry_budget is not None:
+            self.retry_budget.record_request()
 
         attempt = 0
         backoff = 0.5
         while True:
+            if deadline is not None:
+                deadline.check(f"{method} {path} after {attempt} attempts")
+            if limiter is not None:
+                if deadline is None:
+                    limiter.acquire(self._rate_scope, path)
+                else:
+                    deadline.sleep(limiter.reserve(self._rate_scope, path, budget=deadline.remaining()))
+            if router is not None:
+                endpoint, breaker = _pick_endpoint(router, self._breakers, failed)
+                url = f"{endpoint.url}{path}"
+                if info is not None:
+                    info.base_url = endpoint.url
+            elif breaker is not None and not breaker.allow():
+                raise PersistoCircuitOpenError(
+                    f"Circuit open for {breaker.name}; retry in {breaker.retry_in():.1f}s"
+                )
+            if info is not None:
+                info.attempt = attempt
+                hooks.emit("on_attempt", info)
+                take_connect_seconds()  # drop time from connects outside this attempt
+            if deadline is not None:
+                # Never wait on the wire past the deadline
+                left = max(0.001, deadline.remaining())
+                timeout = (min(self.connect_timeout, left), min(self.timeout, left))
+            if info is not None or deadline is not None or router is not None:
+                t_send = time.perf_counter()
             try:
-                r = self._send(method, url, json=json, params=params, timeout=self.timeout)
+                r = self._send(method, url, data=body, headers=headers, params=params, timeout=timeout)
             except requests.RequestException as e:
-                if attempt >= self.retries:
+                if deadline is not None and deadline.cancelled:
+                    # Cut off on purpose (e.g. a hedge answered first): not the endpoint's failure
+                    if router is not None:
+                        router.report(endpoint, None, None)
+                    raise deadline.exceeded(f"{method} {path} on attempt {attempt+1}") from e
+                if router is not None:
+                    router.report(endpoint, None, False)
+                    failed.append(endpoint)
+                if breaker is not None:
+                    breaker.record_failure()
+                if deadline is not None and deadline.expired():
+                    raise deadline.exceeded(f"{method} {path} timed out on attempt {attempt+1}: {e}") from e
+                delay = full_jitter(backoff)
+                if not self._may_retry(attempt, deadline, path, delay, f"network error: {e}"):
                     raise PersistoError(f"Network error after {attempt+1} attempts: {e}")
+                self._backoff(info, "network", delay, deadline)
                 attempt += 1
-                time.sleep(backoff)
                 backoff = min(backoff * 2, 8.0)
                 continue
+            except BaseException:
+                if router is not None:
+                    router.report(endpoint, None, None)
+                raise
+            if router is not None:
+                router.report(endpoint, time.perf_counter() - t_send, r.status_code < 500)
+                if r.status_code >= 500:
+                    failed.append(endpoint)
+            if deadline is not None:
+                self._observe_attempt(path, time.perf_counter() - t_send)
+
+            wire = _wire_length(r)
+            self.transfer_stats.record(raw_len, len(body or b""), len(r.content), wire)
+            if info is not None:
+                elapsed = time.perf_counter() - t_send
+                connect = take_connect_seconds()
+                headers_at = r.elapsed.total_seconds()
+                info.status = r.status_code
+                info.bytes_sent += len(body or b"")
+                info.bytes_received += wire
+                info.timings = {
+                    "connect": connect,
+                    "server": max(0.0, headers_at - connect),
+                    "transfer": max(0.0, elapsed - headers_at),
+                }
+            if breaker is not None:
+                # Any non-5xx answer means the backend is up
+                if r.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
 
             # Error mapping
-            if r.status_code in (401, 403):
-                raise PersistoAuthError("Unauthorized: invalid API key or insufficient scope", status=r.status_code, body=r.text)
-            if r.status_code == 404:
-                raise PersistoNotFoundError("Not found", status=r.status_code, body=r.text)
+            if r.status_code >= 400:
+                _raise_for_client_error(r.status_code, r.text)
             if r.status_code == 429:
-                if attempt >= self.retries:
+                if limiter is not None:
+                    limiter.on_rate_limited(self._rate_scope, path, r.headers.get("Retry-After"))
+                delay = _retry_after_seconds(r.headers.get("Retry-After"), full_jitter(backoff))
+                if not self._may_retry(attempt, deadline, path, delay, "rate limited", r.status_code, r.text):
                     raise PersistoRateLimitError("Rate limited", status=r.status_code, body=r.text)
-                retry_after = r.headers.get("Retry-After")
-                try:
-                    sleep_s = float(retry_after) if retry_after is not None else backoff
-                except ValueError:
-                    sleep_s = backoff
-                time.sleep(max(0.1, sleep_s))
+                self._backoff(info, "rate_limited", delay, deadline)
                 attempt += 1
                 backoff = min(backoff * 2, 8.0)
                 continue
             if 500 <= r.status_code < 600:
-                if attempt >= self.retries:
+                delay = full_jitter(backoff)
+                if not self._may_retry(
+                    attempt, deadline, path, delay, f"server error {r.status_code}", r.status_code, r.text
+                ):
                     raise PersistoError(f"Server error {r.status_code}", status=r.status_code, body=r.text)
+                self._backoff(info, "server_error", delay, deadline)
                 attempt += 1
-                time.sleep(backoff)
                 backoff = min(backoff * 2, 8.0)
                 continue
 
             # Success
-            if r.status_code == 204 or not r.content:
-                return {}
-            try:
-                return r.json()
-            except ValueError:
-                return {"raw": r.text}
+            if info is None:
+                return _decode_body(r.status_code, r.content, self.serializer)
+            t_decode = time.perf_counter()
+            result = _decode_body(r.status_code, r.content, self.serializer)
+            info.timings["decode"] = time.perf_counter() - t_decode
+            return result
+
+    def _backoff(
+        self,
+        info: Optional[RequestInfo],
+        reason: str,
+        delay: float,
+        deadline: Optional[Deadline] = None,
+    ) -> None:
+        if info is not None:
+            info.retries += 1
+            info.slept += delay
+            self._hooks.emit("on_retry", info, reason, delay)
+        if deadline is None:
+            time.sleep(delay)
+        else:
+            deadline.sleep(delay)  # wakes early on cancel()
+
+    def _may_retry(
+        self,
+        attempt: int,
+        deadline: Optional[Deadline] = None,
+        path: str = "",
+        delay: float = 0.0,
+        reason: str = "",
+        status: Optional[int] = None,
+        body: Optional[str] = None,
+    ) -> bool:
+        """
+        Retries left for this call, and room in the shared retry budget.
+        Raises PersistoDeadlineExceeded when a retry is due but the backoff
+        plus a typical attempt would overrun the deadline.
+        """
+        if attempt >= self.retries:
+            return False
+        if deadline is not None:
+            needed = delay + self._attempt_seconds.get(path, _MIN_ATTEMPT_SECONDS)
+            left = deadline.remaining()
+            if needed > left:
+                raise deadline.exceeded(
+                    f"{left:.2f}s left, a retry needs ~{needed:.2f}s (after {attempt+1} attempts, last: {reason})",
+                    status,
+                    body,
+                )
+        return self.retry_budget is None or self.retry_budget.try_acquire()
+
+    def _observe_attempt(self, path: str, seconds: float) -> None:
+        # Moving average; a lost update between threads only skews the estimate a little
+        prev = self._attempt_seconds.get(path)
+        self._attempt_seconds[path] = seconds if prev is None else prev + 0.2 * (seconds - prev)
 
     def _send(
         self,
         method: str,
         url: str,
         *,
-        json: Optional[Dict[str, Any]],
+        data: Optional[bytes],
+        headers: Dict[str, str],
         params: Optional[Dict[str, Any]],
-        timeout: int,
+        timeout: Union[float, Tuple[float, float]],
     ) -> requests.Response:
         m = method.upper()
         if m == "GET":
-            return self._session.get(url, params=params, timeout=timeout)
+            return self._pool.session().get(url, params=params, timeout=timeout)
         elif m in ("POST", "PUT", "PATCH", "DELETE"):
-            return self._session.request(m, url, json=json, params=params, timeout=timeout)
+            return self._pool.session().request(m, url, data=data, headers=headers, params=params, timeout=timeout)
         raise PersistoError(f"Unsupported HTTP method: {method}")
+
+
+# =========================
+# Shared helpers (sync + async clients)
+# =========================
+
+# Floor for the expected duration of one attempt when judging whether a retry fits the deadline
+_MIN_ATTEMPT_SECONDS = 0.01
+
+def _save_payload(
+    namespace: str,
+    content: str,
+    metadata: Optional[Dict[str, Any]],
+    ttl_seconds: Optional[int],
+) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        "namespace": namespace,
+        "content": content,
+        "metadata": metadata or {},
+        # Same key on every retry and replay: the server stores the memory once
+        "idempotency_key": idempotency_key(namespace, content, metadata, ttl_seconds),
+    }
+    if ttl_seconds is not None:
+        payload["ttl_seconds"] = int(ttl_seconds)
+    return payload
+
+
+# save_many item that is counted as skipped, never sent (e.g. an expired import record)
+_SKIP_ITEM = object()
+
+
+def _idempotency_header(payload: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    key = payload.get("idempotency_key")
+    return {"Idempotency-Key": key} if key else None
+
+
+def _save_item_payload(namespace: str, item: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Normalise one save_many item (content string or dict) into a save payload."""
+    if isinstance(item, str):
+        item = {"content": item}
+    if not isinstance(item, dict):
+        raise TypeError(f"Item must be a str or dict, got {type(item).__name__}")
+    content = item.get("content")
+    if not isinstance(content, str) or not content:
+        raise ValueError("Item is missing non-empty 'content'")
+    metadata = item.get("metadata")
+    if metadata is not None and not isinstance(metadata, dict):
+        raise TypeError("Item 'metadata' must be a dict")
+    payload = _save_payload(namespace, content, metadata, item.get("ttl_seconds"))
+    if item.get("embedding") is not None:
+        payload["embedding"] = item["embedding"]
+    return payload
+
+
+def _response_error(resp: Any) -> Optional[str]:
+    """Error message carried in a 2xx/4xx JSON body (`error` or FastAPI `detail`), if any."""
+    if isinstance(resp, dict):
+        err = resp.get("error") or resp.get("detail")
+        if err:
+            return str(err)
+    return None
+
+
+def _query_payload(
+    namespace: str,
+    query: str,
+    filters: Optional[Dict[str, Any]],
+    mode: Optional[str],
+    k: Optional[int],
+    profile: Optional[Dict[str, Any]],
+    fields: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        "namespace": namespace,
+        "query": query,
+        "filters": filters or {},
+    }
+    if mode:
+        payload["mode"] = mode
+    if k is not None:
+        payload["k"] = int(k)
+    if profile:
+        payload["profile"] = profile
+    if fields is not None:
+        payload["fields"] = fields
+    return payload
+
+
+def _projected(resp: Dict[str, Any], payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply the payload's field projection to a query response the server did not project."""
+    fields = payload.get("fields")
+    if fields is None or _response_error(resp) is not None:
+        return resp
+    return project_response(resp, fields)
+
+
+_QUERY_SPEC_KEYS = frozenset(("namespace", "query", "filters", "mode", "k", "profile", "fields", "include_content"))
+
+
+def _profile_specs(
+    profiles: Union[Sequence[str], Dict[str, Dict[str, Any]]],
+    k: int,
+    fetch_k: Optional[int],
+    mmr_lambda: Optional[float],
+) -> Tuple[Dict[str, Dict[str, Any]], int]:
+    from .profiles import normalize_profiles
+
+    specs = normalize_profiles(profiles, mmr_lambda)
+    if fetch_k is None:
+        fetch_k = max(20, 4 * max(int(spec.get("k") or k) for spec in specs.values()))
+    if fetch_k < 1:
+        raise ValueError("fetch_k must be >= 1")
+    return specs, fetch_k
+
+
+def _query_spec_payload(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate one query_many() spec and build its request payload."""
+    if not isinstance(spec, dict) or not spec.get("namespace") or "query" not in spec:
+        raise ValueError("Each query needs a 'namespace' and a 'query'")
+    unknown = set(spec) - _QUERY_SPEC_KEYS
+    if unknown:
+        raise ValueError(f"Unknown query fields: {sorted(unknown)}")
+    return _query_payload(
+        spec["namespace"], spec["query"], spec.get("filters"), spec.get("mode"), spec.get("k"), spec.get("profile"),
+        projection(spec.get("fields"), spec.get("include_content", True)),
+    )
+
+
+def _query_error(e: PersistoError) -> Dict[str, Any]:
+    return {"error": str(e), "status": e.status}
+
+
+def _delete_payload(
+    namespace: str,
+    content: Optional[str],
+    metadata: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {"namespace": namespace}
+    if content is not None:
+        payload["content"] = content
+    if metadata is not None:
+        payload["metadata"] = metadata
+    return payload
+
+
+def _list_queries_params(
+    namespace: Optional[str],
+    start_date: Optional[str],
+    end_date: Optional[str],
+) -> Dict[str, Any]:
+    params: Dict[str, Any] = {}
+    if namespace:
+        params["namespace"] = namespace
+    if start_date:
+        params["start_date"] = start_date
+    if end_date:
+        params["end_date"] = end_date
+    return params
+
+
+def _resolve_retry_budget(option: Union[bool, RetryBudget]) -> Optional[RetryBudget]:
+    if option is True:
+        return RetryBudget.shared()
+    return option or None
+
+
+def _resolve_rate_limiter(option: Union[None, float, RateLimiter]) -> Optional[RateLimiter]:
+    if option is None or isinstance(option, RateLimiter):
+        return option
+    return RateLimiter(rate=float(option))
+
+
+def _resolve_router(
+    base_url: Optional[str],
+    endpoints: Union[None, Sequence[str], EndpointRouter],
+) -> Optional[EndpointRouter]:
+    """The router for `endpoints`, or for a comma-separated base_url / PERSISTO_API_URL; None for one URL."""
+    if isinstance(endpoints, EndpointRouter):
+        return endpoints
+    if endpoints:
+        if isinstance(endpoints, str):
+            raise TypeError("endpoints must be a list of URLs")
+        return EndpointRouter(endpoints)
+    raw = base_url or os.getenv("PERSISTO_API_URL") or ""
+    urls = [u.strip() for u in raw.split(",") if u.strip()]
+    return EndpointRouter(urls) if len(urls) > 1 else None
+
+
+def _resolve_circuit_breakers(option: Union[bool, CircuitBreaker], urls: Sequence[str]) -> Dict[str, CircuitBreaker]:
+    """Breaker per endpoint URL: the process-wide one for that URL (True), or a given breaker shared by all."""
+    if option is True:
+        return {url: CircuitBreaker.for_url(url) for url in urls}
+    if option:
+        return {url: option for url in urls}
+    return {}
+
+
+def _pick_endpoint(
+    router: EndpointRouter,
+    breakers: Dict[str, CircuitBreaker],
+    failed: List[Endpoint],
+) -> Tuple[Endpoint, Optional[CircuitBreaker]]:
+    """
+    Routed endpoint for the next attempt whose circuit lets it through;
+    PersistoCircuitOpenError when every endpoint's circuit is open.
+    """
+    denied: List[Endpoint] = []
+    for _ in range(len(router.endpoints) + 1):
+        endpoint = router.pick(failed + denied)
+        breaker = breakers.get(endpoint.url)
+        if breaker is None or breaker.allow():
+            return endpoint, breaker
+        router.report(endpoint, None, None)
+        denied.append(endpoint)
+    retry_in = min(breakers[e.url].retry_in() for e in denied)
+    raise PersistoCircuitOpenError(f"Circuit open for every endpoint; retry in {retry_in:.1f}s")
+
+
+def _request_key(
+    method: str,
+    path: str,
+    body: Optional[Dict[str, Any]],
+    params: Optional[Dict[str, Any]],
+) -> str:
+    """Identity of a request, independent of dict ordering."""
+    return json.dumps([method, path, body, params], sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _raise_for_client_error(status: int, body: str) -> None:
+    """Raise the typed error for non-retryable 4xx statuses."""
+    if status in (401, 403):
+        raise PersistoAuthError("Unauthorized: invalid API key or insufficient scope", status=status, body=body)
+    if status == 404:
+        raise PersistoNotFoundError("Not found", status=status, body=body)
+
+
+def _retry_after_seconds(retry_after: Optional[str], backoff: float) -> float:
+    """Sleep for a 429: honour Retry-After when it parses, else the current backoff."""
+    try:
+        sleep_s = float(retry_after) if retry_after is not None else backoff
+    except ValueError:
+        sleep_s = backoff
+    return max(0.1, sleep_s)
+
+
+def _decode_body(status: int, content: bytes, serializer: JSONSerializer) -> Dict[str, Any]:
+    if status == 204 or not content:
+        return {}
+    try:
+        return serializer.loads(content)
+    except ValueError:
+        return {"raw": content.decode("utf-8", errors="replace")}
+
+
+def _wire_length(r: requests.Response) -> int:
+    """Response body bytes as received, i.e. before Content-Encoding was undone."""
+    try:
+        return int(r.raw.tell())
+    except Exception:
+        return int(r.headers.get("Content-Length") or len(r.content))
@@ -0,0 +1,157 @@
+# persisto/deadline.py
+"""
+Deadlines: one time budget for a whole call, retries and backoff included.
+
+    c = Client(api_key="...", timeout=5, connect_timeout=0.5, deadline=10)  # per-request default
+    c.query(namespace="ns", query="...", deadline=2.0)                     # this call, all attempts
+
+    turn = Deadline(2.0)                    # one budget shared by several calls
+    with deadline_scope(turn):
+        facts = c.query(namespace="facts", query=q)
+        prefs = c.query(namespace="prefs", query=q)
+    turn.cancel()                           # from any thread: pending calls stop
+
+Inside a scope every request caps its connect/read timeouts at the time
+left, a retry is only made if its backoff plus a typical attempt still fits,
+and rate-limiter waits longer than the time left are refused. Expiry raises
+PersistoDeadlineExceeded. A deadline given in seconds nests under the
+enclosing scope (it never outlives it); scopes are carried into the worker
+threads of batch calls and into asyncio tasks.
+
+Cancellation is cooperative: cancel() stops a call at its next checkpoint
+(before an attempt, during a backoff or rate-limit sleep); an attempt
+already on the wire finishes or hits its timeout. Async callers can also
+cancel the task itself.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Optional, TypeVar, Union
+
+from .errors import PersistoDeadlineExceeded
+
+T = TypeVar("T")
+
+_current: ContextVar[Optional["Deadline"]] = ContextVar("persisto_deadline", default=None)
+
+
+class Deadline:
+    """
+    A point in time (monotonic clock) by which a call must finish.
+
+    With `parent`, the deadline is also bounded by the parent's: whichever
+    comes first, and cancelling the parent cancels this one too.
+    """
+
+    __slots__ = ("seconds", "expires_at", "parent", "_cancelled")
+
+    def __init__(self, seconds: float, parent: Optional["Deadline"] = None):
+        if seconds < 0:
+            raise ValueError("seconds must be >= 0")
+        self.seconds = float(seconds)
+        self.expires_at = time.monotonic() + self.seconds
+        self.parent = parent
+        self._cancelled = threading.Event()
+
+    def remaining(self) -> float:
+        """Seconds left (0.0 once expired or cancelled)."""
+        if self.cancelled:
+            return 0.0
+        left = self.expires_at - time.monotonic()
+        if self.parent is not None:
+            left = min(left, self.parent.remaining())
+        return max(0.0, left)
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    def cancel(self) -> None:
+        """Expire now; calls running under this deadline stop at their next checkpoint."""
+        self._cancelled.set()
+
+    def check(self, what: str = "call") -> float:
+        """Seconds left; raises PersistoDeadlineExceeded when there are none."""
+        left = self.remaining()
+        if left <= 0.0:
+            raise self.exceeded(what)
+        return left
+
+    def exceeded(self, what: str, status: Optional[int] = None, body: Optional[str] = None) -> PersistoDeadlineExceeded:
+        if self.cancelled:
+            reason = "cancelled"
+        else:
+            binding = self  # report the budget that ran out, which may be an enclosing one
+            node = self.parent
+            while node is not None:
+                if node.expires_at < binding.expires_at:
+                    binding = node
+                node = node.parent
+            reason = f"exceeded ({binding.seconds:.2f}s budget)"
+        return PersistoDeadlineExceeded(f"Deadline {reason}: {what}", status=status, body=body)
+
+    def sleep(self, seconds: float) -> None:
+        """time.sleep(seconds), cut short by expiry or cancellation."""
+        end = time.monotonic() + min(seconds, self.remaining())
+        while not self.cancelled:
+            left = end - time.monotonic()
+            if left <= 0:
+                return
+            # Own cancel() wakes at once; a parent's is noticed within 50 ms
+            self._cancelled.wait(min(left, 0.05) if self.parent is not None else left)
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f}s{', cancelled' if self.cancelled else ''})"
+
+
+def current_deadline() -> Optional[Deadline]:
+    """The deadline of the innermost deadline_scope, if any."""
+    return _current.get()
+
+
+class deadline_scope:
+    """
+    Context manager: calls made inside the block run under `deadline`
+    (seconds or a Deadline; None leaves the current scope as it is).
+    Seconds nest under the enclosing scope; a Deadline object is used as-is.
+    """
+
+    __slots__ = ("deadline", "_token")
+
+    def __init__(self, deadline: Union[None, float, Deadline] = None):
+        if deadline is not None and not isinstance(deadline, Deadline):
+            deadline = Deadline(float(deadline), parent=_current.get())
+        self.deadline: Optional[Deadline] = deadline
+        self._token: Any = None
+
+    def __enter__(self) -> Optional[Deadline]:
+        if self.deadline is None:
+            return _current.get()
+        self._token = _current.set(self.deadline)
+        return self.deadline
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+
+
+def propagate(fn: Callable[..., T]) -> Callable[..., T]:
+    """`fn` bound to the caller's current deadline, for running on worker threads."""
+    deadline = _current.get()
+    if deadline is None:
+        return fn
+
+    def run(*args: Any, **kwargs: Any) -> T:
+        token = _current.set(deadline)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return run
@@ -0,0 +1,174 @@
+# persisto/dedup.py
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+def idempotency_key(
+    namespace: str,
+    content: str,
+    metadata: Optional[Dict[str, Any]] = None,
+    ttl_seconds: Optional[int] = None,
+) -> str:
+    """
+    Content-hash key of a save: sha256 over canonical JSON of
+    (namespace, content, metadata[, ttl_seconds]). Identical saves get
+    identical keys, so a retried or repeated save can be recognised by the
+    server and by DedupIndex; the same content saved with another TTL is a
+    new save. Saves without a TTL keep the keys they had before TTLs counted.
+    """
+    fields = [namespace, content, metadata or {}]
+    if ttl_seconds is not None:
+        fields.append(int(ttl_seconds))
+    canonical = json.dumps(
+        fields,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class DedupIndex:
+    """
+    Persistent local index of saves the server has already accepted.
+
+        c = Client(api_key="...", dedup_index="/var/lib/myagent/persisto-dedup.db")
+        c.save(namespace="bot", content="User prefers dark mode")   # sent
+        c.save(namespace="bot", content="User prefers dark mode")   # {"status": "duplicate"}, no request
+
+    Rows are (idempotency key, namespace, content hash, expiry) in SQLite (WAL
+    mode, so several processes on one host can share a file; path=":memory:"
+    keeps it per-process). Saves with ttl_seconds expire from the index when
+    they expire on the server.
+
+    The index only ever forgets conservatively: delete() on the client drops
+    the namespace's entries (or just the deleted content's), and the oldest
+    entries are pruned past `max_entries`. A forgotten entry costs one extra
+    save, which the idempotency key lets the server absorb; a stale entry
+    would silently drop a write, so memories removed by other means (another
+    client, server-side TTL changes) call for clear() or forget().
+    """
+
+    def __init__(self, path: str = ":memory:", max_entries: int = 1_000_000):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.path = path
+        self.max_entries = int(max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        import sqlite3  # deferred like SQLiteCacheBackend
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS saved ("
+            " key TEXT PRIMARY KEY,"
+            " namespace TEXT NOT NULL,"
+            " content_hash TEXT NOT NULL,"
+            " expires_at REAL,"
+            " added_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS saved_ns ON saved(namespace, content_hash)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS saved_age ON saved(added_at)")
+        # COUNT(*) is a full scan: keep a running (per-process) estimate instead
+        self._count = self._conn.execute("SELECT COUNT(*) FROM saved").fetchone()[0]
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT expires_at FROM saved WHERE key = ?", (key,)).fetchone()
+            if row is not None and (row[0] is None or row[0] > time.time()):
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def add(self, key: str, namespace: str, content: str, ttl_seconds: Optional[int] = None) -> None:
+        self.add_many([(key, namespace, content, ttl_seconds)])
+
+    def add_many(self, rows: Iterable[Tuple[str, str, str, Optional[int]]]) -> None:
+        now = time.time()
+        values = [
+            (key, namespace, _content_hash(content), None if ttl is None else now + int(ttl), now)
+            for key, namespace, content, ttl in rows
+        ]
+        if not values:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for key, namespace, content_hash, expires_at, added_at in values:
+                    cur = self._conn.execute(
+                        "INSERT OR IGNORE INTO saved (key, namespace, content_hash, expires_at, added_at)"
+                        " VALUES (?, ?, ?, ?, ?)",
+                        (key, namespace, content_hash, expires_at, added_at),
+                    )
+                    if cur.rowcount:
+                        self._count += 1  # only new keys grow the index
+                    else:
+                        self._conn.execute(
+                            "UPDATE saved SET namespace = ?, content_hash = ?, expires_at = ?, added_at = ?"
+                            " WHERE key = ?",
+                            (namespace, content_hash, expires_at, added_at, key),
+                        )
+                if self._count > self.max_entries:
+                    self._prune()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def forget(self, namespace: str, content: Optional[str] = None) -> None:
+        """Drop a namespace's entries, or only those for one content string."""
+        with self._lock:
+            if content is None:
+                cur = self._conn.execute("DELETE FROM saved WHERE namespace = ?", (namespace,))
+            else:
+                cur = self._conn.execute(
+                    "DELETE FROM saved WHERE namespace = ? AND content_hash = ?", (namespace, _content_hash(content))
+                )
+            self._count = max(0, self._count - cur.rowcount)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM saved")
+            self._count = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": self._count,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM saved").fetchone()[0]
+
+    def _prune(self) -> None:
+        # Expired rows first, then the oldest, down to 90% so pruning is not per-insert
+        self._conn.execute("DELETE FROM saved WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+        self._count = self._conn.execute("SELECT COUNT(*) FROM saved").fetchone()[0]
+        excess = self._count - int(self.max_entries * 0.9)
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM saved WHERE key IN (SELECT key FROM saved ORDER BY added_at LIMIT ?)", (excess,)
+            )
+            self._count -= excess
@@ -1,3 +1,33 @@
 # persisto/errors.py
-class PersistoAuthError(Exception):
-    pass
+"""SDK exceptions. Dependency-free so `import persisto` stays cheap; re-exported by persisto.client."""
+from __future__ import annotations
+
+from typing import Optional
+
+
+class PersistoError(Exception):
+    """Base SDK error with optional HTTP status and raw body."""
+    def __init__(self, message: str, status: Optional[int] = None, body: Optional[str] = None):
+        super().__init__(message)
+        self.status = status
+        self.body = body
+
+
+class PersistoAuthError(PersistoError):
+    """401/403 authentication/authorization errors."""
+
+
+class PersistoNotFoundError(PersistoError):
+    """404 not found errors."""
+
+
+class PersistoRateLimitError(PersistoError):
+    """429 rate-limit errors."""
+
+
+class PersistoCircuitOpenError(PersistoError):
+    """Backend marked unhealthy by the circuit breaker; the request was not sent."""
+
+
+class PersistoDeadlineExceeded(PersistoError):
+    """The call's deadline passed (or was cancelled) before it finished; status/body come from the last attempt."""
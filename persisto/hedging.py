@@ -0,0 +1,274 @@
+# persisto/hedging.py
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+class HedgePolicy:
+    """
+    When and how often to hedge read-only calls.
+
+    The hedge delay tracks the `percentile` of recently observed call
+    latencies (clamped to [min_delay, max_delay]; `initial_delay` until
+    `min_samples` calls have completed). A hedge is sent only while hedges
+    stay within `max_extra_load` of primary calls, so a slow backend is never
+    hit with twice the traffic.
+
+    Counters: requests (primary calls), hedges_sent, hedges_won (the hedge
+    answered first), hedges_skipped (delay passed but the load cap said no).
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        max_extra_load: float = 0.1,
+        min_delay: float = 0.005,
+        max_delay: float = 2.0,
+        initial_delay: float = 0.1,
+        min_samples: int = 20,
+        window: int = 1000,
+    ):
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be in (0, 100)")
+        if max_extra_load < 0:
+            raise ValueError("max_extra_load must be >= 0")
+        self.percentile = float(percentile)
+        self.max_extra_load = float(max_extra_load)
+        self.min_delay = float(min_delay)
+        self.max_delay = float(max_delay)
+        self.initial_delay = float(initial_delay)
+        self.min_samples = int(min_samples)
+
+        self.requests = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self.hedges_skipped = 0
+
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=int(window))
+        self._delay = self.initial_delay
+        self._since_recompute = 0
+
+    def delay(self) -> float:
+        return self._delay
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+            self._since_recompute += 1
+            # Re-sorting on every sample would dominate fast calls
+            if len(self._latencies) >= self.min_samples and self._since_recompute >= 16:
+                self._since_recompute = 0
+                ordered = sorted(self._latencies)
+                idx = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100.0))
+                self._delay = min(self.max_delay, max(self.min_delay, ordered[idx]))
+
+    def start(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def try_hedge(self) -> bool:
+        with self._lock:
+            if self.hedges_sent + 1 > self.max_extra_load * self.requests:
+                self.hedges_skipped += 1
+                return False
+            self.hedges_sent += 1
+            return True
+
+    def won(self) -> None:
+        with self._lock:
+            self.hedges_won += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedges_sent": self.hedges_sent,
+                "hedges_won": self.hedges_won,
+                "hedges_skipped": self.hedges_skipped,
+                "extra_load": (self.hedges_sent / self.requests) if self.requests else 0.0,
+                "delay": self._delay,
+            }
+
+
+def _timed(policy: HedgePolicy, fn: Callable[[], Any]) -> Callable[[], Any]:
+    def run() -> Any:
+        t0 = time.perf_counter()
+        result = fn()
+        policy.observe(time.perf_counter() - t0)
+        return result
+    return run
+
+
+class HedgeTimer:
+    """
+    Schedules hedges for hedged_call: one thread keeps the pending ones in
+    a heap and hands a hedge to `executor` only once its delay has passed
+    and its primary is still running. Reads that answer in time never
+    occupy a worker, so the workers stay free for the hedges that matter.
+    """
+
+    def __init__(self, executor: "Executor"):
+        self.executor = executor
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[float, int, Callable[[], None], Callable[[], bool]]] = []
+        self._seq = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def call_later(self, delay: float, fn: Callable[[], None], cancelled: Callable[[], bool]) -> None:
+        """Submit `fn` to the executor after `delay` seconds unless `cancelled()` is true by then."""
+        with self._cond:
+            if self._closed:
+                return
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), fn, cancelled))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="persisto-hedge-timer", daemon=True)
+                self._thread.start()
+            elif self._heap[0][2] is fn:
+                self._cond.notify()  # new earliest deadline
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._heap.clear()
+            self._cond.notify()
+        self.executor.shutdown(wait=False)
+
+    def _run(self) -> None:
+        with self._cond:
+            while not self._closed:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                wait = self._heap[0][0] - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                _, _, fn, cancelled = heapq.heappop(self._heap)
+                if cancelled():
+                    continue
+                try:
+                    self.executor.submit(fn)
+                except RuntimeError:  # executor shut down under us
+                    return
+
+
+class _Race:
+    """Shared state of one primary (calling thread) and its hedge (pool thread)."""
+
+    __slots__ = ("lock", "primary_done", "hedge_done", "hedged", "won", "result", "error")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.primary_done = threading.Event()
+        self.hedge_done = threading.Event()
+        self.hedged = False
+        self.won = False
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+def hedged_call(
+    policy: HedgePolicy,
+    timer: HedgeTimer,
+    fn: Callable[[], Any],
+    hedge_fn: Optional[Callable[[], Any]] = None,
+    cancel: Optional[Callable[[], None]] = None,
+) -> Any:
+    """
+    Run `fn` on the calling thread; if it has not finished after
+    policy.delay(), `timer` runs `hedge_fn` (default `fn`) on its executor
+    and whichever succeeds first is returned.
+
+    When the hedge wins, `cancel()` must make the still-running `fn` raise
+    soon (the client cancels its deadline and aborts its socket); without
+    it, the caller gets the hedge's answer only once `fn` returns.
+    """
+    policy.start()
+    race = _Race()
+    hedge_call = _timed(policy, hedge_fn or fn)
+
+    def hedge() -> None:
+        with race.lock:
+            if race.primary_done.is_set() or not policy.try_hedge():
+                return
+            race.hedged = True
+        try:
+            result = hedge_call()
+        except BaseException as e:
+            race.error = e
+            race.hedge_done.set()
+            return
+        with race.lock:
+            race.result = result
+            race.won = not race.primary_done.is_set()
+        race.hedge_done.set()
+        if race.won and cancel is not None:
+            cancel()
+
+    timer.call_later(policy.delay(), hedge, race.primary_done.is_set)
+    try:
+        result = _timed(policy, fn)()
+    except BaseException as e:
+        with race.lock:
+            race.primary_done.set()
+            hedged = race.hedged
+        if hedged and isinstance(e, Exception):
+            race.hedge_done.wait()
+            if race.error is None:
+                policy.won()
+                return race.result
+        raise
+    with race.lock:
+        race.primary_done.set()
+        won = race.won
+    if won:  # the hedge answered first but cancel() did not stop the primary
+        policy.won()
+        return race.result
+    return result
+
+
+async def hedged_call_async(policy: HedgePolicy, make_call: Callable[[], Awaitable[Any]]) -> Any:
+    """asyncio variant of hedged_call; the losing task is cancelled."""
+    import asyncio  # only async clients pay for it
+
+    policy.start()
+
+    async def call() -> Any:
+        t0 = time.perf_counter()
+        result = await make_call()
+        policy.observe(time.perf_counter() - t0)
+        return result
+
+    primary = asyncio.ensure_future(call())
+    done, _ = await asyncio.wait({primary}, timeout=policy.delay())
+    if done or not policy.try_hedge():
+        return await primary
+
+    hedge = asyncio.ensure_future(call())
+    pending = {primary, hedge}
+    first_error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                err = task.exception()
+                if err is None:
+                    if task is hedge:
+                        policy.won()
+                    return task.result()
+                if first_error is None:
+                    first_error = err
+        raise first_error
+    finally:
+        for task in pending:
+            task.cancel()
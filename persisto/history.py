@@ -0,0 +1,154 @@
+# persisto/history.py
+from __future__ import annotations
+
+import heapq
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# =========================
+# Date windows
+# =========================
+
+def _parse_when(value: str) -> datetime:
+    # fromisoformat on 3.9/3.10 rejects a trailing "Z"
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
+
+
+def date_windows(start_date: str, end_date: str, window_days: int) -> Iterator[Tuple[str, str]]:
+    """
+    Split [start_date, end_date] into consecutive inclusive windows.
+
+    Plain dates ("YYYY-MM-DD") give plain-date windows of `window_days`
+    days, each ending the day before the next begins. Otherwise windows are
+    ISO datetimes, each ending one microsecond before the next begins (a
+    date-only end_date then covers that whole day). Either way, a server
+    that treats both bounds as inclusive never returns a record twice.
+    """
+    if window_days < 1:
+        raise ValueError("window_days must be >= 1")
+    if len(start_date) == 10 and len(end_date) == 10:
+        first, last = date.fromisoformat(start_date), date.fromisoformat(end_date)
+        day = first
+        while day <= last:
+            hi = min(day + timedelta(days=window_days - 1), last)
+            yield day.isoformat(), hi.isoformat()
+            day = hi + timedelta(days=1)
+        return
+    start = _parse_when(start_date)
+    end = _parse_when(end_date)
+    if len(end_date) == 10:  # "YYYY-MM-DD": include the full day
+        end = end + timedelta(days=1) - timedelta(microseconds=1)
+    step = timedelta(days=window_days)
+    lo = start
+    while lo <= end:
+        hi = min(lo + step - timedelta(microseconds=1), end)
+        yield lo.isoformat(), hi.isoformat()
+        lo = hi + timedelta(microseconds=1)
+
+
+# =========================
+# Streaming aggregation
+# =========================
+
+class TopK:
+    """
+    Bounded-memory heavy hitters (Space-Saving algorithm).
+
+    Tracks at most `capacity` distinct keys. Counts for keys that were ever
+    evicted are over-estimates by at most the smallest tracked count, which is
+    exact enough for "most repeated queries" reports.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = int(capacity)
+        self._counts: Dict[str, int] = {}
+        # One entry per tracked key; counts may lag behind _counts (refreshed on pop)
+        self._heap: List[Tuple[int, str]] = []
+
+    def add(self, key: str, n: int = 1) -> None:
+        counts = self._counts
+        if key in counts:
+            counts[key] += n
+            return
+        if len(counts) < self.capacity:
+            counts[key] = n
+            heapq.heappush(self._heap, (n, key))
+            return
+        while True:
+            stale, victim = heapq.heappop(self._heap)
+            current = counts[victim]
+            if stale == current:
+                break
+            heapq.heappush(self._heap, (current, victim))
+        del counts[victim]
+        counts[key] = current + n
+        heapq.heappush(self._heap, (current + n, key))
+
+    def most_common(self, n: int = 10) -> List[Tuple[str, int]]:
+        return sorted(self._counts.items(), key=lambda kv: (-kv[1], kv[0]))[:n]
+
+
+def _record_query(record: Dict[str, Any]) -> Optional[str]:
+    q = record.get("query") or record.get("query_text")
+    return q if isinstance(q, str) else None
+
+
+def _record_day(record: Dict[str, Any]) -> Optional[str]:
+    ts = record.get("created_at") or record.get("timestamp")
+    if isinstance(ts, str) and len(ts) >= 10:
+        return ts[:10]
+    if isinstance(ts, (int, float)):
+        return date.fromtimestamp(ts).isoformat()
+    return None
+
+
+class QueryHistoryStats:
+    """
+    One-pass aggregation over query-history records.
+
+    Memory is bounded by the number of namespaces, the number of days and
+    `top_capacity`, never by the number of records.
+
+    Usage:
+        stats = QueryHistoryStats()
+        for rec in client.iter_queries(namespace="support-bot"):
+            stats.add(rec)
+        stats.summary()
+    """
+
+    def __init__(self, top_capacity: int = 1000):
+        self.total = 0
+        self.by_namespace: Counter = Counter()
+        self.by_day: Counter = Counter()
+        self.top_queries = TopK(top_capacity)
+
+    def add(self, record: Dict[str, Any]) -> None:
+        self.total += 1
+        ns = record.get("namespace")
+        if ns is not None:
+            self.by_namespace[ns] += 1
+        day = _record_day(record)
+        if day is not None:
+            self.by_day[day] += 1
+        q = _record_query(record)
+        if q is not None:
+            self.top_queries.add(q.strip().lower())
+
+    def update(self, records: Iterable[Dict[str, Any]]) -> "QueryHistoryStats":
+        for record in records:
+            self.add(record)
+        return self
+
+    def summary(self, top_n: int = 10) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "by_namespace": dict(self.by_namespace),
+            "by_day": dict(sorted(self.by_day.items())),
+            "top_queries": [{"query": q, "count": c} for q, c in self.top_queries.most_common(top_n)],
+        }
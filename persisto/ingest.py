@@ -0,0 +1,385 @@
+# persisto/ingest.py
+"""
+Bulk loading of text files into a namespace (the engine behind
+`persisto ingest`).
+
+    report = ingest(client, "docs", ["./handbook", "notes.md"], checkpoint="ingest.ckpt")
+
+Files are walked in sorted order and read in blocks; each is cut into
+chunks of about `chunk_chars` characters (split at paragraph, line,
+sentence or word boundaries, with `overlap` characters repeated between
+neighbours) and uploaded through PersistoClient's save_many pipeline. Only
+one block per file and a bounded window of batches are held in memory.
+
+Every chunk's metadata has "source" (path relative to the root given) and
+"chunk" / "offset" (index, and character offset after any front matter),
+plus:
+    metadata       static key/values for every chunk
+    path_pattern   regex matched against "source"; named groups become keys
+    front matter   a leading "---" block of `key: value` lines (YAML when
+                   PyYAML is installed), removed from the content
+Later sources win: static < path pattern < front matter.
+
+A checkpoint records the file and chunk up to which everything has been
+sent; rerunning with the same arguments resumes there.
+"""
+from __future__ import annotations
+
+import fnmatch
+import json
+import os
+import re
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from .client import PersistoClient
+
+DEFAULT_INCLUDE = ("*.txt", "*.md", "*.markdown", "*.rst")
+BLOCK_CHARS = 1 << 20
+
+
+# =========================
+# Files
+# =========================
+
+def iter_files(
+    paths: Sequence[str],
+    include: Sequence[str] = DEFAULT_INCLUDE,
+    exclude: Sequence[str] = (),
+) -> List[Tuple[str, str, int]]:
+    """(absolute path, source name, size) for every matching file, in a stable order. Hidden entries are skipped."""
+    found: List[Tuple[str, str, int]] = []
+
+    def wanted(rel: str) -> bool:
+        name = os.path.basename(rel)
+        if include and not any(fnmatch.fnmatch(name, p) or fnmatch.fnmatch(rel, p) for p in include):
+            return False
+        return not any(fnmatch.fnmatch(name, p) or fnmatch.fnmatch(rel, p) for p in exclude)
+
+    for root in paths:
+        if os.path.isfile(root):
+            rel = os.path.basename(root)
+            if wanted(rel):
+                found.append((os.path.abspath(root), rel, os.path.getsize(root)))
+            continue
+        if not os.path.isdir(root):
+            raise FileNotFoundError(f"No such file or directory: {root}")
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+            for name in sorted(filenames):
+                if name.startswith("."):
+                    continue
+                full = os.path.join(dirpath, name)
+                rel = os.path.relpath(full, root).replace(os.sep, "/")
+                if wanted(rel):
+                    found.append((os.path.abspath(full), rel, os.path.getsize(full)))
+    return found
+
+
+def read_front_matter(fh: Any) -> Tuple[Dict[str, Any], str]:
+    """
+    Consume a leading "---" front-matter block from a text stream.
+    Returns (metadata, text already read that belongs to the body).
+    """
+    first = fh.readline()
+    if first.strip() != "---":
+        return {}, first
+    lines: List[str] = []
+    for line in fh:
+        if line.strip() in ("---", "..."):
+            return _parse_front_matter("".join(lines)), ""
+        lines.append(line)
+    # No closing marker: it was not front matter after all
+    return {}, first + "".join(lines)
+
+
+def _parse_front_matter(text: str) -> Dict[str, Any]:
+    try:
+        import yaml  # optional: full YAML when available
+    except ImportError:
+        yaml = None
+    if yaml is not None:
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError:
+            data = None
+        return {str(k): v for k, v in data.items()} if isinstance(data, dict) else {}
+    meta: Dict[str, Any] = {}
+    for line in text.splitlines():
+        key, sep, value = line.partition(":")
+        if not sep or not key.strip() or line[:1].isspace():
+            continue
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+            meta[key.strip()] = value[1:-1]
+            continue
+        try:
+            meta[key.strip()] = json.loads(value)  # numbers, true/false, null, [lists]
+        except ValueError:
+            meta[key.strip()] = value
+    return meta
+
+
+# =========================
+# Chunking
+# =========================
+
+_BOUNDARIES = ("\n\n", "\n", ". ", "? ", "! ", " ")
+
+
+def iter_chunks(
+    blocks: Iterable[str],
+    chunk_chars: int = 1500,
+    overlap: int = 150,
+) -> Iterator[Tuple[int, str]]:
+    """
+    Cut a stream of text blocks into (character offset, chunk) pairs of at
+    most `chunk_chars`, preferring to split at the strongest boundary in
+    the second half of the window. Whitespace-only chunks are dropped.
+    """
+    if chunk_chars < 1:
+        raise ValueError("chunk_chars must be >= 1")
+    if not 0 <= overlap < chunk_chars:
+        raise ValueError("overlap must be >= 0 and < chunk_chars")
+    buf = ""
+    pos = 0   # start of the next chunk in buf (an index: slicing per chunk would copy the block each time)
+    base = 0  # offset of buf[0] in the text
+    for block in blocks:
+        base += pos
+        buf = buf[pos:] + block
+        pos = 0
+        while len(buf) - pos > chunk_chars:
+            cut = _split_point(buf, pos, pos + chunk_chars)
+            chunk = _trimmed(buf, pos, cut, base)
+            if chunk is not None:
+                yield chunk
+            pos = _overlap_start(buf, pos, cut, overlap)
+    chunk = _trimmed(buf, pos, len(buf), base)
+    if chunk is not None:
+        yield chunk
+
+
+def _trimmed(buf: str, start: int, end: int, base: int) -> Optional[Tuple[int, str]]:
+    raw = buf[start:end]
+    text = raw.lstrip()
+    if not text.strip():
+        return None
+    return base + start + len(raw) - len(text), text.rstrip()
+
+
+def _split_point(buf: str, start: int, limit: int) -> int:
+    floor = start + (limit - start) // 2
+    for sep in _BOUNDARIES:
+        i = buf.rfind(sep, floor, limit)
+        if i != -1:
+            return i + len(sep)
+    return limit
+
+
+def _overlap_start(buf: str, start: int, cut: int, overlap: int) -> int:
+    """Where the next chunk starts: `overlap` chars before the cut, moved forward to a word start."""
+    if overlap <= 0:
+        return cut
+    begin = max(start + 1, cut - overlap)
+    space = buf.find(" ", begin, cut)
+    return space + 1 if space != -1 else begin
+
+
+def iter_file_chunks(
+    path: str,
+    chunk_chars: int = 1500,
+    overlap: int = 150,
+    front_matter: bool = True,
+) -> Tuple[Dict[str, Any], Iterator[Tuple[int, str]]]:
+    """(front-matter metadata, chunk iterator) for one file, read in BLOCK_CHARS blocks."""
+    fh = open(path, "r", encoding="utf-8", errors="replace", newline=None)
+    try:
+        meta, head = read_front_matter(fh) if front_matter else ({}, "")
+    except BaseException:
+        fh.close()
+        raise
+
+    def blocks() -> Iterator[str]:
+        with fh:
+            if head:
+                yield head
+            while True:
+                block = fh.read(BLOCK_CHARS)
+                if not block:
+                    return
+                yield block
+
+    return meta, iter_chunks(blocks(), chunk_chars, overlap)
+
+
+# =========================
+# Checkpoint
+# =========================
+
+class IngestCheckpoint:
+    """
+    {"fingerprint", "position", "file_index", "file", "chunk", ...counts}:
+    every chunk before `chunk` of file `file_index` (and all earlier files)
+    has been sent. The fingerprint covers the arguments that decide chunk
+    numbering, so a changed run cannot resume a stale checkpoint.
+    """
+
+    def __init__(self, path: str, fingerprint: Dict[str, Any]):
+        self.path = path
+        self.fingerprint = fingerprint
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "r", encoding="utf-8") as fh:
+            state = json.load(fh)
+        if state.get("fingerprint") != self.fingerprint:
+            raise ValueError(
+                f"Checkpoint {self.path} was written by an ingest with different arguments; "
+                "delete it to start over"
+            )
+        return state
+
+    def save(self, state: Dict[str, Any]) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"fingerprint": self.fingerprint, **state}, fh)
+        os.replace(tmp, self.path)
+
+    def remove(self) -> None:
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+# =========================
+# Runner
+# =========================
+
+def ingest(
+    client: "PersistoClient",
+    namespace: str,
+    paths: Sequence[str],
+    *,
+    include: Sequence[str] = DEFAULT_INCLUDE,
+    exclude: Sequence[str] = (),
+    chunk_chars: int = 1500,
+    overlap: int = 150,
+    metadata: Optional[Dict[str, Any]] = None,
+    path_pattern: Optional[str] = None,
+    front_matter: bool = True,
+    ttl_seconds: Optional[int] = None,
+    batch_size: int = 100,
+    max_workers: int = 4,
+    checkpoint: Optional[str] = None,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Chunk and upload `paths` into `namespace` (see module docstring).
+
+    `progress` is called as batches land with {"files", "files_total",
+    "bytes", "bytes_resumed", "bytes_total", "chunks", "saved", "skipped",
+    "failed", "elapsed"} (files and bytes include those done before a resume). Returns save_many's report plus "files", "bytes", "chunks",
+    "resumed_from" and "elapsed".
+    """
+    pattern = re.compile(path_pattern) if path_pattern else None
+    files = iter_files(paths, include, exclude)
+    ckpt = None
+    state: Optional[Dict[str, Any]] = None
+    if checkpoint:
+        ckpt = IngestCheckpoint(checkpoint, {
+            "namespace": namespace,
+            "paths": [os.path.abspath(p) for p in paths],
+            "include": list(include),
+            "exclude": list(exclude),
+            "chunk_chars": chunk_chars,
+            "overlap": overlap,
+            "front_matter": front_matter,
+        })
+        state = ckpt.load()
+
+    resume_file, resume_chunk, start = 0, 0, 0
+    if state is not None:
+        resume_file, resume_chunk, start = state["file_index"], state["chunk"], state["position"]
+        if resume_file < len(files) and files[resume_file][1] != state["file"]:
+            raise ValueError(f"Files changed since checkpoint {checkpoint}: expected {state['file']!r} next")
+
+    resumed_bytes = sum(size for _, _, size in files[:resume_file])
+    stats: Dict[str, Any] = {
+        "files": resume_file,
+        "files_total": len(files),
+        "bytes": resumed_bytes,
+        "bytes_resumed": resumed_bytes,
+        "bytes_total": sum(size for _, _, size in files),
+        "chunks": 0,
+    }
+    # (position of the file's first chunk, file index, source) for files not yet fully settled
+    marks: "deque[Tuple[int, int, str]]" = deque()
+    started = time.monotonic()
+
+    def items() -> Iterator[Dict[str, Any]]:
+        position = start
+        for index in range(resume_file, len(files)):
+            path, rel, size = files[index]
+            skip = resume_chunk if index == resume_file else 0
+            marks.append((position - skip, index, rel))
+            fm, chunks = iter_file_chunks(path, chunk_chars, overlap, front_matter)
+            base = dict(metadata or {})
+            if pattern is not None:
+                m = pattern.search(rel)
+                if m:
+                    base.update({k: v for k, v in m.groupdict().items() if v is not None})
+            base.update(fm)
+            base["source"] = rel
+            for n, (offset, text) in enumerate(chunks):
+                if n < skip:
+                    continue
+                item: Dict[str, Any] = {"content": text, "metadata": {**base, "chunk": n, "offset": offset}}
+                if ttl_seconds is not None:
+                    item["ttl_seconds"] = ttl_seconds
+                stats["chunks"] += 1
+                position += 1
+                yield item
+            stats["files"] += 1
+            stats["bytes"] += size
+
+    settled: Dict[str, Any] = {"position": start, "report": {}, "written": 0.0}
+
+    def on_progress(position: int, report: Dict[str, Any]) -> None:
+        while len(marks) > 1 and marks[1][0] <= position:
+            marks.popleft()
+        settled["position"], settled["report"] = position, report
+        now = time.monotonic()
+        if ckpt is not None and marks and now - settled["written"] >= 1.0:  # at most one write per second
+            settled["written"] = now
+            ckpt.save(_checkpoint_state(position, marks[0], report))
+        if progress is not None:
+            progress({**stats, **{k: report[k] for k in ("saved", "skipped", "failed")}, "elapsed": now - started})
+
+    try:
+        report = client._run_saves(namespace, items(), batch_size, max_workers, start=start, on_progress=on_progress)
+    except BaseException:
+        if ckpt is not None and marks:
+            # Only batches that settled count: marks[0] is the file they stopped in
+            ckpt.save(_checkpoint_state(settled["position"], marks[0], settled["report"]))
+        raise
+    if ckpt is not None:
+        ckpt.remove()
+    report.update(
+        files=stats["files"] - resume_file,
+        bytes=stats["bytes"] - resumed_bytes,
+        chunks=stats["chunks"],
+        resumed_from=start,
+        elapsed=time.monotonic() - started,
+    )
+    return report
+
+
+def _checkpoint_state(position: int, mark: Tuple[int, int, str], report: Dict[str, Any]) -> Dict[str, Any]:
+    first, index, rel = mark
+    state = {"position": position, "file_index": index, "file": rel, "chunk": max(0, position - first)}
+    state.update({k: report[k] for k in ("saved", "skipped", "failed") if k in report})
+    return state
@@ -0,0 +1,274 @@
+# persisto/instrumentation.py
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class RequestInfo:
+    """
+    State of one client call, passed to every hook event.
+
+    timings holds the phases of the latest attempt, in seconds:
+        connect   new TCP/TLS connection set-up (0.0 on a reused connection,
+                  None where the transport does not expose it)
+        server    request sent until response headers arrived
+        transfer  response body download
+        decode    JSON decoding of the body
+    duration is the whole call (all attempts and backoff sleeps), set when
+    the call ends. `data` is scratch space for hooks (e.g. a tracing span).
+    """
+
+    __slots__ = (
+        "method", "path", "namespace", "attempt", "started", "duration", "status",
+        "timings", "retries", "slept", "bytes_sent", "bytes_received", "data", "base_url",
+    )
+
+    def __init__(
+        self,
+        method: str,
+        path: str,
+        json: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ):
+        self.method = method.upper()
+        self.path = path
+        source = json if json is not None else params
+        self.namespace: Optional[str] = source.get("namespace") if isinstance(source, dict) else None
+        self.attempt = 0
+        self.started = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.status: Optional[int] = None
+        self.timings: Dict[str, Optional[float]] = {}
+        self.retries = 0
+        self.slept = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.data: Dict[str, Any] = {}
+        self.base_url: Optional[str] = None  # endpoint of the latest attempt, when routing
+
+    @property
+    def endpoint(self) -> str:
+        return f"{self.method} {self.path}"
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self.started
+
+
+class RequestHook:
+    """
+    Base class for instrumentation hooks; override the events you need.
+
+    For every call: on_request_start, then on_attempt per HTTP attempt,
+    on_retry before each backoff sleep (reason: "network", "rate_limited"
+    or "server_error"), and finally exactly one of on_response (success)
+    or on_error (the exception about to be raised).
+
+    Hooks run on the calling thread (or event loop) and should be cheap;
+    exceptions raised by a hook are swallowed.
+    """
+
+    def on_request_start(self, info: RequestInfo) -> None:
+        pass
+
+    def on_attempt(self, info: RequestInfo) -> None:
+        pass
+
+    def on_retry(self, info: RequestInfo, reason: str, delay: float) -> None:
+        pass
+
+    def on_response(self, info: RequestInfo) -> None:
+        pass
+
+    def on_error(self, info: RequestInfo, error: BaseException) -> None:
+        pass
+
+
+class HookSet:
+    """Registered hooks of one client. Clients keep None instead of an empty set, so the unhooked path costs one check."""
+
+    def __init__(self, hooks: Iterable[RequestHook] = ()):
+        self.hooks: List[RequestHook] = list(hooks)
+
+    def emit(self, event: str, *args: Any) -> None:
+        for hook in self.hooks:
+            try:
+                getattr(hook, event)(*args)
+            except Exception:
+                pass  # a broken hook must not break requests
+
+
+# =========================
+# Latency histogram sink
+# =========================
+
+_MIN_SECONDS = 1e-6
+_GROWTH = 1.02  # bucket width: percentiles are exact to within ~1%
+_LOG_GROWTH = math.log(_GROWTH)
+
+
+class _Series:
+    __slots__ = ("count", "errors", "retries", "total", "max", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, seconds: float, retries: int, error: bool) -> None:
+        self.count += 1
+        self.retries += retries
+        self.total += seconds
+        if error:
+            self.errors += 1
+        if seconds > self.max:
+            self.max = seconds
+        idx = int(math.log(max(seconds, _MIN_SECONDS) / _MIN_SECONDS) / _LOG_GROWTH)
+        self.buckets[idx] = self.buckets.get(idx, 0) + 1
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for idx in sorted(self.buckets):
+            seen += self.buckets[idx]
+            if seen >= rank:
+                # Geometric midpoint of the bucket, never above the true max
+                return min(self.max, _MIN_SECONDS * _GROWTH ** (idx + 0.5))
+        return self.max
+
+
+class LatencyHistogram(RequestHook):
+    """
+    In-memory latency histogram per (endpoint, namespace).
+
+        hist = LatencyHistogram()
+        c = Client(api_key=..., hooks=[hist])
+        ...
+        for row in hist.summary():
+            print(row["endpoint"], row["namespace"], row["p50"], row["p95"], row["p99"])
+
+    Call durations (including retries) land in log-scaled buckets, so
+    memory stays bounded no matter how many calls are recorded.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, Optional[str]], _Series] = {}
+
+    def on_response(self, info: RequestInfo) -> None:
+        self._record(info, error=False)
+
+    def on_error(self, info: RequestInfo, error: BaseException) -> None:
+        self._record(info, error=True)
+
+    def percentile(self, endpoint: str, q: float, namespace: Optional[str] = None) -> float:
+        with self._lock:
+            series = self._series.get((endpoint, namespace))
+            return series.percentile(q) if series is not None else 0.0
+
+    def summary(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "endpoint": endpoint,
+                    "namespace": namespace,
+                    "count": s.count,
+                    "errors": s.errors,
+                    "retries": s.retries,
+                    "mean": s.total / s.count,
+                    "p50": s.percentile(50),
+                    "p95": s.percentile(95),
+                    "p99": s.percentile(99),
+                    "max": s.max,
+                }
+                for (endpoint, namespace), s in sorted(self._series.items(), key=lambda kv: (kv[0][0], kv[0][1] or ""))
+            ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def _record(self, info: RequestInfo, error: bool) -> None:
+        key = (info.endpoint, info.namespace)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series()
+            series.add(info.duration or 0.0, info.retries, error)
+
+
+# =========================
+# Tracing adapter
+# =========================
+
+class TracingHook(RequestHook):
+    """
+    One client span per call, for OpenTelemetry or any tracer with the same
+    start_span() / span.set_attribute() / add_event() / end() surface.
+
+        from opentelemetry import trace
+        c = Client(api_key=..., hooks=[TracingHook(trace.get_tracer("persisto"))])
+
+    With no tracer given, the global OpenTelemetry tracer is used (requires
+    the opentelemetry-api package). Retries become span events; phase
+    timings and byte counts become span attributes.
+    """
+
+    def __init__(self, tracer: Any = None):
+        if tracer is None:
+            try:
+                from opentelemetry import trace
+            except ImportError:
+                raise ImportError("TracingHook without a tracer requires opentelemetry-api") from None
+            tracer = trace.get_tracer("persisto")
+        self.tracer = tracer
+
+    def on_request_start(self, info: RequestInfo) -> None:
+        attributes = {"http.request.method": info.method, "url.path": info.path}
+        if info.namespace is not None:
+            attributes["persisto.namespace"] = info.namespace
+        info.data["span"] = self.tracer.start_span(f"persisto {info.endpoint}", attributes=attributes)
+
+    def on_retry(self, info: RequestInfo, reason: str, delay: float) -> None:
+        span = info.data.get("span")
+        if span is not None:
+            span.add_event("retry", {"reason": reason, "attempt": info.attempt, "delay_s": delay})
+
+    def on_response(self, info: RequestInfo) -> None:
+        self._end(info, None)
+
+    def on_error(self, info: RequestInfo, error: BaseException) -> None:
+        self._end(info, error)
+
+    def _end(self, info: RequestInfo, error: Optional[BaseException]) -> None:
+        span = info.data.pop("span", None)
+        if span is None:
+            return
+        if info.status is not None:
+            span.set_attribute("http.response.status_code", info.status)
+        span.set_attribute("persisto.retries", info.retries)
+        span.set_attribute("persisto.bytes_sent", info.bytes_sent)
+        span.set_attribute("persisto.bytes_received", info.bytes_received)
+        for phase, seconds in info.timings.items():
+            if seconds is not None:
+                span.set_attribute(f"persisto.{phase}_ms", seconds * 1000.0)
+        if error is not None:
+            if hasattr(span, "record_exception"):
+                span.record_exception(error)
+            _set_error_status(span, error)
+        span.end()
+
+
+def _set_error_status(span: Any, error: BaseException) -> None:
+    try:
+        from opentelemetry.trace import Status, StatusCode
+    except ImportError:
+        return
+    span.set_status(Status(StatusCode.ERROR, str(error)))
@@ -0,0 +1,695 @@
+# persisto/local.py
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .errors import PersistoError, PersistoNotFoundError
+from .profiles import MODE_DEFAULTS, blend_scores, resolve_profile, top_k  # noqa: F401 (MODE_DEFAULTS re-exported)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+DEFAULT_K = 5
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Body keys each route accepts: (required, optional), as the server validates them
+_SAVE_KEYS = ({"namespace", "content"}, {"metadata", "ttl_seconds", "idempotency_key", "embedding"})
+_SAVE_ITEM_KEYS = ({"content"}, _SAVE_KEYS[1])
+_QUERY_KEYS = ({"namespace", "query"}, {"filters", "mode", "k", "profile", "fields"})
+_ROUTE_KEYS = {
+    ("POST", "/memory/save"): _SAVE_KEYS,
+    ("POST", "/memory/save_batch"): ({"namespace", "items"}, set()),
+    ("POST", "/memory/query"): _QUERY_KEYS,
+    ("POST", "/memory/query_batch"): ({"queries"}, set()),
+    ("DELETE", "/memory/delete"): ({"namespace"}, {"content", "metadata"}),
+    ("GET", "/memory/export"): ({"namespace"}, {"limit", "cursor", "include_embeddings"}),
+    ("GET", "/memory/namespaces"): (set(), set()),
+    ("GET", "/queries/list"): (set(), {"namespace", "start_date", "end_date", "limit", "cursor"}),
+}
+
+
+# =========================
+# Embedders
+# =========================
+
+class HashingEmbedder:
+    """
+    Deterministic, offline embedder (feature hashing).
+
+    Hashes lower-cased words and their character trigrams into a signed
+    `dim`-wide vector and L2-normalises it. No model download, stable across
+    processes and platforms, and good enough for lexical recall in CI and
+    local agents. Swap in a real model by passing any callable with the same
+    signature (list of texts -> float32 array of shape (n, dim)).
+    """
+
+    name = "hashing-v1"
+
+    def __init__(self, dim: int = 256):
+        if dim < 8:
+            raise ValueError("dim must be >= 8")
+        self.dim = int(dim)
+
+    def _features(self, text: str) -> Dict[int, float]:
+        feats: Dict[int, float] = {}
+        dim = self.dim
+        for word in _TOKEN_RE.findall(text.lower()):
+            grams = [word]
+            padded = f"#{word}#"
+            grams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+            for j, gram in enumerate(grams):
+                h = zlib.crc32(gram.encode("utf-8"))
+                weight = 1.0 if j == 0 else 0.5
+                idx = h % dim
+                feats[idx] = feats.get(idx, 0.0) + (weight if (h >> 31) & 1 else -weight)
+        return feats
+
+    def __call__(self, texts: Sequence[str]) -> "np.ndarray":
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for idx, val in self._features(text).items():
+                out[row, idx] = val
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return out / norms
+
+
+# =========================
+# Engine
+# =========================
+
+class LocalEngine:
+    """
+    Embedded, in-process Persisto backend.
+
+    Implements save / save_batch / query / delete / list_namespaces /
+    list_queries with the REST API's semantics, so PersistoClient can use it
+    without changing call sites:
+
+        c = Client(api_key="local", base_url="local://./.persisto")   # persisted
+        c = Client(api_key="local", base_url="local://")              # in-memory only
+        c = Client(api_key="local", engine=LocalEngine(path, embedder=my_model))
+
+    Storage (when `path` is set) is a directory with:
+        vectors.f32     float32 embeddings, memory-mapped (grown by doubling)
+        records.jsonl   append-only save/delete log, replayed on open
+        queries.jsonl   query history
+        engine.json     embedder name and dimension
+
+    Saves carrying an `idempotency_key` whose memory is still live are not
+    embedded or stored again; the existing row comes back with
+    "duplicate": true.
+
+    Requires the optional `numpy` dependency: pip install "persisto[local]"
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        embedder: Optional[Callable[[Sequence[str]], Any]] = None,
+        dim: Optional[int] = None,
+    ):
+        if np is None:
+            raise ImportError('LocalEngine requires numpy: pip install "persisto[local]"')
+        self.embedder = embedder if embedder is not None else HashingEmbedder(dim or 256)
+        self.dim = int(dim or getattr(self.embedder, "dim", 0) or len(self.embedder(["dim probe"])[0]))
+        self.path = path
+        self._lock = threading.RLock()
+
+        # Row-aligned columns
+        self._capacity = 0
+        self._size = 0
+        self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._created = np.zeros(0, dtype=np.float64)
+        self._expires = np.zeros(0, dtype=np.float64)
+        self._namespace: List[str] = []
+        self._content: List[str] = []
+        self._metadata: List[Dict[str, Any]] = []
+        # idempotency_key -> row of the save that carried it
+        self._keyed: Dict[str, int] = {}
+
+        # Per-namespace row lists (cached as arrays) and live counts
+        self._ns_rows: Dict[str, List[int]] = {}
+        self._ns_array: Dict[str, "np.ndarray"] = {}
+        self._ns_live: Dict[str, int] = {}
+        # Metadata equality index: namespace -> (key, encoded value) -> rows
+        self._meta_index: Dict[str, Dict[Tuple[str, str], Set[int]]] = {}
+
+        self._queries: List[Dict[str, Any]] = []
+        self._records_fh = None
+        self._queries_fh = None
+        if path:
+            self._open(path)
+
+    @classmethod
+    def from_url(cls, url: str) -> "LocalEngine":
+        """Build from a `local://<dir>` base URL (empty dir = in-memory)."""
+        path = url[len("local:"):]
+        if path.startswith("//"):
+            path = path[2:]
+        return cls(path or None)
+
+    # ---------- Public API ----------
+
+    def save(
+        self,
+        *,
+        namespace: str,
+        content: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        ttl_seconds: Optional[int] = None,
+        idempotency_key: Optional[str] = None,
+        embedding: Optional[Sequence[float]] = None,
+    ) -> Dict[str, Any]:
+        item = (content, metadata or {}, ttl_seconds, idempotency_key, embedding)
+        row, duplicate = self._insert(namespace, [item])[0]
+        return _save_result(row, duplicate)
+
+    def save_batch(self, *, namespace: str, items: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        batch = [
+            (it["content"], it.get("metadata") or {}, it.get("ttl_seconds"), it.get("idempotency_key"),
+             it.get("embedding"))
+            for it in items
+        ]
+        return {"results": [_save_result(row, duplicate) for row, duplicate in self._insert(namespace, batch)]}
+
+    def query(
+        self,
+        *,
+        namespace: str,
+        query: str,
+        filters: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None,
+        k: Optional[int] = None,
+        profile: Optional[Dict[str, Any]] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Any]:
+        qvec = self._embed([query])[0]
+        return self._search(namespace, query, qvec, filters, mode, k, profile, fields)
+
+    def query_batch(self, *, queries: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        """Several queries, embedded in one pass; per-query errors come back as {"error": ...}."""
+        if not queries:
+            return {"results": []}
+        qvecs = self._embed([q["query"] for q in queries])
+        results: List[Dict[str, Any]] = []
+        for spec, qvec in zip(queries, qvecs):
+            try:
+                results.append(self._search(
+                    spec["namespace"], spec["query"], qvec, spec.get("filters"),
+                    spec.get("mode"), spec.get("k"), spec.get("profile"), spec.get("fields"),
+                ))
+            except PersistoError as e:
+                results.append({"error": str(e), "status": e.status})
+        return {"results": results}
+
+    def _search(
+        self,
+        namespace: str,
+        query: str,
+        qvec: "np.ndarray",
+        filters: Optional[Dict[str, Any]],
+        mode: Optional[str],
+        k: Optional[int],
+        profile: Optional[Dict[str, Any]],
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Any]:
+        try:
+            settings = resolve_profile(mode, profile)
+        except ValueError as e:
+            raise PersistoError(str(e), status=422) from None
+        k = DEFAULT_K if k is None else int(k)
+
+        now = time.time()
+        with self._lock:
+            if not self._ns_live.get(namespace):
+                raise PersistoNotFoundError("Not found", status=404, body=f"Unknown namespace: {namespace}")
+            self._log_query(namespace, query, now)
+            rows = self._candidate_rows(namespace, filters or {})
+            if rows.size:
+                rows = rows[self._alive[rows] & (self._expires[rows] > now)]
+            if rows.size == 0 or k <= 0:
+                return {"results": []}
+
+            if rows.size * 4 >= self._size:
+                # Dense case: one BLAS pass over the contiguous block beats a fancy-index copy
+                sims = (self._vectors[: self._size] @ qvec)[rows]
+            else:
+                sims = self._vectors[rows] @ qvec
+            if settings["min_sim"] is not None:
+                keep = sims >= float(settings["min_sim"])
+                rows, sims = rows[keep], sims[keep]
+            if rows.size == 0:
+                return {"results": []}
+
+            scores = blend_scores(
+                sims, self._created[rows], now, float(settings["recency_weight"]), settings["half_life_seconds"]
+            )
+            top = top_k(scores, k)
+            hits = [self._hit(int(rows[i]), float(sims[i]), float(scores[i])) for i in top]
+            if fields is not None:
+                keep = frozenset(fields)
+                hits = [{key: value for key, value in hit.items() if key in keep} for hit in hits]
+            return {"results": hits}
+
+    def delete(
+        self,
+        *,
+        namespace: str,
+        content: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        with self._lock:
+            if namespace not in self._ns_rows:
+                return {"deleted": 0}
+            rows = self._candidate_rows(namespace, metadata or {})
+            rows = rows[self._alive[rows]] if rows.size else rows
+            if content is not None:
+                rows = np.array([r for r in rows.tolist() if self._content[r] == content], dtype=np.int64)
+            doomed = rows.tolist()
+            for row in doomed:
+                self._kill(row)
+            if doomed:
+                self._append(self._records_fh, {"op": "delete", "rows": doomed})
+            return {"deleted": len(doomed)}
+
+    def export(
+        self,
+        *,
+        namespace: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_embeddings: bool = False,
+    ) -> Dict[str, Any]:
+        """One page of a namespace's live memories in insertion order (GET /memory/export)."""
+        now = time.time()
+        with self._lock:
+            rows = self._ns_rows.get(namespace, [])
+            start = int(cursor or 0)
+            end = len(rows) if limit is None else min(len(rows), start + int(limit))
+            memories = []
+            for row in rows[start:end]:
+                if not self._alive[row] or self._expires[row] <= now:
+                    continue
+                memory = {
+                    "id": row,
+                    "content": self._content[row],
+                    "metadata": dict(self._metadata[row]),
+                    "created_at": _iso(self._created[row]),
+                    "expires_at": _iso(self._expires[row]) if math.isfinite(self._expires[row]) else None,
+                }
+                if include_embeddings:
+                    memory["embedding"] = self._vectors[row].tolist()
+                memories.append(memory)
+        resp: Dict[str, Any] = {"memories": memories}
+        if end < len(rows):
+            resp["next_cursor"] = str(end)
+        return resp
+
+    def list_namespaces(self) -> List[str]:
+        """Namespaces holding at least one live, unexpired memory."""
+        now = time.time()
+        with self._lock:
+            return sorted(ns for ns, live in self._ns_live.items() if live > 0 and self._has_unexpired(ns, now))
+
+    def list_queries(
+        self,
+        *,
+        namespace: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        with self._lock:
+            matched = [
+                q for q in self._queries
+                if (namespace is None or q["namespace"] == namespace)
+                and (start_date is None or q["created_at"] >= start_date)
+                and (end_date is None or q["created_at"][:len(end_date)] <= end_date)  # a plain date covers its day
+            ]
+        start = int(cursor or 0)
+        end = len(matched) if limit is None else start + int(limit)
+        resp: Dict[str, Any] = {"queries": matched[start:end]}
+        if end < len(matched):
+            resp["next_cursor"] = str(end)
+        return resp
+
+    def handle(
+        self,
+        method: str,
+        path: str,
+        *,
+        json: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Serve a REST-shaped request (used by PersistoClient._request). A body
+        or query string with missing or unknown keys is a 422 PersistoError,
+        as from the server.
+        """
+        body = json or {}
+        route = (method.upper(), path)
+        keys = _ROUTE_KEYS.get(route)
+        if keys is not None:
+            _check_keys(body if method.upper() != "GET" else (params or {}), keys, path)
+            if route == ("POST", "/memory/save_batch"):
+                for item in body["items"]:
+                    _check_keys(item, _SAVE_ITEM_KEYS, f"{path} item")
+            elif route == ("POST", "/memory/query_batch"):
+                for spec in body["queries"]:
+                    _check_keys(spec, _QUERY_KEYS, f"{path} query")
+        if route == ("POST", "/memory/save"):
+            return self.save(**body)
+        if route == ("POST", "/memory/save_batch"):
+            return self.save_batch(**body)
+        if route == ("POST", "/memory/query"):
+            return self.query(**body)
+        if route == ("POST", "/memory/query_batch"):
+            return self.query_batch(**body)
+        if route == ("DELETE", "/memory/delete"):
+            return self.delete(**body)
+        if route == ("GET", "/memory/export"):
+            params = dict(params or {})
+            params["include_embeddings"] = str(params.get("include_embeddings", "")).lower() in ("1", "true")
+            return self.export(**params)
+        if route == ("GET", "/memory/namespaces"):
+            return {"namespaces": self.list_namespaces()}
+        if route == ("GET", "/queries/list"):
+            return self.list_queries(**(params or {}))
+        raise PersistoNotFoundError("Not found", status=404, body=f"No local route for {method} {path}")
+
+    def flush(self) -> None:
+        with self._lock:
+            if isinstance(self._vectors, np.memmap):
+                self._vectors.flush()
+            for fh in (self._records_fh, self._queries_fh):
+                if fh is not None:
+                    fh.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            for fh in (self._records_fh, self._queries_fh):
+                if fh is not None:
+                    fh.close()
+            self._records_fh = self._queries_fh = None
+
+    def __enter__(self) -> "LocalEngine":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    # ---------- Internal: search ----------
+
+    def _embed(self, texts: Sequence[str]) -> "np.ndarray":
+        vecs = np.asarray(self.embedder(list(texts)), dtype=np.float32)
+        if vecs.ndim != 2 or vecs.shape[1] != self.dim:
+            raise PersistoError(f"Embedder returned shape {vecs.shape}, expected (n, {self.dim})")
+        return vecs
+
+    def _candidate_rows(self, namespace: str, filters: Dict[str, Any]) -> "np.ndarray":
+        if not filters:
+            arr = self._ns_array.get(namespace)
+            if arr is None:
+                arr = np.array(self._ns_rows.get(namespace, []), dtype=np.int64)
+                self._ns_array[namespace] = arr
+            return arr
+        index = self._meta_index.get(namespace, {})
+        postings = sorted((index.get((key, _encode(val)), set()) for key, val in filters.items()), key=len)
+        matched = set(postings[0]).intersection(*postings[1:]) if postings else set()
+        return np.fromiter(sorted(matched), dtype=np.int64, count=len(matched))
+
+    def _has_unexpired(self, namespace: str, now: float) -> bool:
+        rows = self._candidate_rows(namespace, {})
+        return bool(rows.size) and bool((self._alive[rows] & (self._expires[rows] > now)).any())
+
+    def _hit(self, row: int, similarity: float, score: float) -> Dict[str, Any]:
+        hit: Dict[str, Any] = {
+            "id": row,
+            "content": self._content[row],
+            "metadata": dict(self._metadata[row]),  # callers may edit hits
+            "similarity": similarity,
+            "created_at": _iso(self._created[row]),
+        }
+        if score != similarity:
+            hit["score"] = score
+        if math.isfinite(self._expires[row]):
+            hit["expires_at"] = _iso(self._expires[row])
+        return hit
+
+    # ---------- Internal: mutation ----------
+
+    def _insert(
+        self,
+        namespace: str,
+        batch: List[Tuple[str, Dict[str, Any], Optional[int], Optional[str], Optional[Sequence[float]]]],
+    ) -> List[Tuple[int, bool]]:
+        """Store a batch; returns (row, duplicate) per item. Given embeddings are used as-is."""
+        if not batch:
+            return []
+        now = time.time()
+        vecs: Dict[int, Any] = {}
+        for i, item in enumerate(batch):
+            if item[4] is not None:
+                vec = np.asarray(item[4], dtype=np.float32)
+                if vec.shape != (self.dim,):
+                    raise PersistoError(f"Embedding has {vec.size} dimensions, expected {self.dim}", status=400)
+                vecs[i] = vec
+        with self._lock:
+            fresh = [
+                i for i, item in enumerate(batch)
+                if i not in vecs and self._keyed_row(item[3], now) is None
+            ]
+        # Embed outside the lock, and only what is neither stored nor supplied
+        if fresh:
+            vecs.update(zip(fresh, self._embed([batch[i][0] for i in fresh])))
+        with self._lock:
+            out = []
+            for i, (content, metadata, ttl, key, _) in enumerate(batch):
+                existing = self._keyed_row(key, now)
+                if existing is not None:  # stored earlier, by another thread, or earlier in this batch
+                    out.append((existing, True))
+                    continue
+                vec = vecs.get(i)
+                if vec is None:  # its keyed row died between the two passes
+                    vec = self._embed([content])[0]
+                expires = now + int(ttl) if ttl is not None else math.inf
+                row = self._add_row(namespace, content, metadata, now, expires, vec, key)
+                rec = {
+                    "op": "save",
+                    "row": row,
+                    "namespace": namespace,
+                    "content": content,
+                    "metadata": metadata,
+                    "created_at": now,
+                    "expires_at": None if math.isinf(expires) else expires,
+                }
+                if key is not None:
+                    rec["idempotency_key"] = key
+                self._append(self._records_fh, rec)
+                out.append((row, False))
+            return out
+
+    def _keyed_row(self, key: Optional[str], now: float) -> Optional[int]:
+        """Live, unexpired row saved under `key`, if any."""
+        if key is None:
+            return None
+        row = self._keyed.get(key)
+        if row is None or not self._alive[row] or self._expires[row] <= now:
+            return None
+        return row
+
+    def _add_row(
+        self,
+        namespace: str,
+        content: str,
+        metadata: Dict[str, Any],
+        created: float,
+        expires: float,
+        vec: Optional["np.ndarray"],
+        key: Optional[str] = None,
+    ) -> int:
+        row = self._size
+        self._reserve(row + 1)
+        if vec is not None:
+            self._vectors[row] = vec
+        self._alive[row] = True
+        self._created[row] = created
+        self._expires[row] = expires
+        self._namespace.append(namespace)
+        self._content.append(content)
+        self._metadata.append(dict(metadata))  # the caller's dict may change after the save
+        self._size = row + 1
+        if key is not None:
+            self._keyed[key] = row
+
+        self._ns_rows.setdefault(namespace, []).append(row)
+        self._ns_array.pop(namespace, None)
+        self._ns_live[namespace] = self._ns_live.get(namespace, 0) + 1
+        index = self._meta_index.setdefault(namespace, {})
+        for key, val in metadata.items():
+            index.setdefault((key, _encode(val)), set()).add(row)
+        return row
+
+    def _kill(self, row: int) -> None:
+        if not self._alive[row]:
+            return
+        self._alive[row] = False
+        ns = self._namespace[row]
+        self._ns_live[ns] -= 1
+        index = self._meta_index.get(ns, {})
+        for key, val in self._metadata[row].items():
+            index.get((key, _encode(val)), set()).discard(row)
+
+    def _reserve(self, rows: int) -> None:
+        if rows <= self._capacity:
+            return
+        capacity = max(1024, self._capacity)
+        while capacity < rows:
+            capacity *= 2
+        if self.path:
+            vectors_path = os.path.join(self.path, "vectors.f32")
+            if isinstance(self._vectors, np.memmap):
+                self._vectors.flush()
+            self._vectors = None  # drop the old mapping before resizing the file
+            with open(vectors_path, "r+b" if os.path.exists(vectors_path) else "w+b") as fh:
+                fh.truncate(capacity * self.dim * 4)
+            self._vectors = np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        else:
+            grown = np.zeros((capacity, self.dim), dtype=np.float32)
+            grown[: self._size] = self._vectors[: self._size]
+            self._vectors = grown
+        for name, fill in (("_alive", False), ("_created", 0.0), ("_expires", math.inf)):
+            old = getattr(self, name)
+            new = np.full(capacity, fill, dtype=old.dtype)
+            new[: self._size] = old[: self._size]
+            setattr(self, name, new)
+        self._capacity = capacity
+
+    # ---------- Internal: persistence ----------
+
+    def _open(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, "engine.json")
+        name = getattr(self.embedder, "name", type(self.embedder).__name__)
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as fh:
+                meta = json.load(fh)
+            if meta.get("dim") != self.dim or meta.get("embedder") != name:
+                raise PersistoError(
+                    f"{path} was built with embedder {meta.get('embedder')!r} (dim {meta.get('dim')}), "
+                    f"not {name!r} (dim {self.dim})"
+                )
+        else:
+            with open(meta_path, "w", encoding="utf-8") as fh:
+                json.dump({"dim": self.dim, "embedder": name}, fh)
+
+        vectors_path = os.path.join(path, "vectors.f32")
+        if os.path.exists(vectors_path):
+            capacity = os.path.getsize(vectors_path) // (self.dim * 4)
+            if capacity:
+                self._vectors = np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+                self._capacity = capacity
+                for name_, fill in (("_alive", False), ("_created", 0.0), ("_expires", math.inf)):
+                    setattr(self, name_, np.full(capacity, fill, dtype=getattr(self, name_).dtype))
+
+        missing: List[int] = []
+        for rec in _read_jsonl(os.path.join(path, "records.jsonl")):
+            if rec.get("op") == "save":
+                expires = rec.get("expires_at")
+                row = self._add_row(
+                    rec["namespace"], rec["content"], rec.get("metadata") or {},
+                    rec["created_at"], math.inf if expires is None else expires, None, rec.get("idempotency_key"),
+                )
+                if row != rec.get("row"):
+                    raise PersistoError(f"Corrupt records.jsonl in {path}: row {rec.get('row')} replayed as {row}")
+            elif rec.get("op") == "delete":
+                for row in rec.get("rows", []):
+                    if row < self._size:
+                        self._kill(row)
+
+        # Rows whose vectors never reached disk (crash before msync): re-embed
+        if self._size:
+            norms = np.linalg.norm(self._vectors[: self._size], axis=1)
+            missing = np.flatnonzero((norms == 0) & self._alive[: self._size]).tolist()
+        if missing:
+            self._vectors[missing] = self._embed([self._content[r] for r in missing])
+
+        self._queries = list(_read_jsonl(os.path.join(path, "queries.jsonl")))
+        self._records_fh = open(os.path.join(path, "records.jsonl"), "a", encoding="utf-8")
+        self._queries_fh = open(os.path.join(path, "queries.jsonl"), "a", encoding="utf-8")
+
+    def _log_query(self, namespace: str, query: str, now: float) -> None:
+        rec = {"namespace": namespace, "query": query, "created_at": _iso(now)}
+        self._queries.append(rec)
+        self._append(self._queries_fh, rec)
+
+    @staticmethod
+    def _append(fh, rec: Dict[str, Any]) -> None:
+        if fh is not None:
+            fh.write(json.dumps(rec, separators=(",", ":")) + "\n")
+            fh.flush()
+
+
+# =========================
+# Helpers
+# =========================
+
+def _check_keys(body: Dict[str, Any], keys: Tuple[Set[str], Set[str]], what: str) -> None:
+    if not isinstance(body, dict):
+        raise PersistoError(f"Invalid {what}: expected an object", status=422, body=repr(body))
+    required, optional = keys
+    missing = required - body.keys()
+    unknown = body.keys() - required - optional
+    if missing or unknown:
+        problems = []
+        if missing:
+            problems.append(f"missing {sorted(missing)}")
+        if unknown:
+            problems.append(f"unknown {sorted(unknown)}")
+        message = f"Invalid {what}: {', '.join(problems)}"
+        raise PersistoError(message, status=422, body=message)
+
+
+def _encode(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _save_result(row: int, duplicate: bool) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"status": "ok", "id": row}
+    if duplicate:
+        result["duplicate"] = True
+    return result
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+def _read_jsonl(path: str) -> Iterable[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # Torn final write from a crash; everything before it is intact
+                continue
@@ -1,6 +1,9 @@
 # sdk/python/persisto/models.py
 
-from pydantic import BaseModel
+try:
+    from pydantic import BaseModel
+except ImportError as e:  # pragma: no cover - optional dependency
+    raise ImportError('persisto.models requires pydantic: pip install "persisto[models]"') from e
 from typing import Optional, Dict
 
 
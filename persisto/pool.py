@@ -0,0 +1,340 @@
+# persisto/pool.py
+from __future__ import annotations
+
+import os
+import socket
+import threading
+import time
+import weakref
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+_connect_time = threading.local()
+
+
+def take_connect_seconds() -> float:
+    """Seconds the calling thread spent opening connections since the last call (then reset)."""
+    seconds = getattr(_connect_time, "seconds", 0.0)
+    _connect_time.seconds = 0.0
+    return seconds
+
+
+class _ConnectCounter:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def increment(self) -> None:
+        with self._lock:
+            self.value += 1
+
+
+class _InFlight:
+    """The connection each thread is using right now, so another thread can abort that request."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._conns: Dict[int, Any] = {}
+
+    def track(self, conn: Any) -> None:
+        thread_id = threading.get_ident()
+        conn._persisto_thread = thread_id
+        with self._lock:
+            self._conns[thread_id] = conn
+
+    def untrack(self, conn: Any) -> None:
+        """Forget `conn` once its request is over (back in the pool, or closed)."""
+        thread_id = getattr(conn, "_persisto_thread", None)
+        if thread_id is None:
+            return
+        with self._lock:
+            if self._conns.get(thread_id) is conn:
+                del self._conns[thread_id]
+
+    def abort(self, thread_id: int) -> bool:
+        with self._lock:
+            conn = self._conns.get(thread_id)
+        sock = getattr(conn, "sock", None)
+        # Since reused by another thread: that request is not ours to abort
+        if sock is None or getattr(conn, "_persisto_thread", None) != thread_id:
+            return False
+        try:
+            # The plain socket's shutdown: the blocked read returns EOF at once (also under TLS)
+            socket.socket.shutdown(sock, socket.SHUT_RDWR)
+        except OSError:
+            return False
+        return True
+
+
+def _counting_pool(pool_cls: Any, counter: _ConnectCounter, inflight: _InFlight) -> Any:
+    """
+    Subclass a urllib3 pool so every real socket connect (incl. reconnects)
+    is counted and timed, and every request's connection is tracked.
+    """
+    base = pool_cls.ConnectionCls
+
+    def connect(self: Any) -> None:
+        counter.increment()
+        t0 = time.perf_counter()
+        try:
+            base.connect(self)
+        finally:
+            _connect_time.seconds = getattr(_connect_time, "seconds", 0.0) + time.perf_counter() - t0
+
+    def request(self: Any, *args: Any, **kwargs: Any) -> Any:
+        inflight.track(self)
+        return base.request(self, *args, **kwargs)
+
+    def close(self: Any) -> None:
+        inflight.untrack(self)
+        base.close(self)
+
+    def _put_conn(self: Any, conn: Any) -> None:
+        # Response read (or abandoned): the connection is no longer this request's
+        if conn is not None:
+            inflight.untrack(conn)
+        pool_cls._put_conn(self, conn)
+
+    conn_cls = type(f"Counting{base.__name__}", (base,), {"connect": connect, "request": request, "close": close})
+    return type(f"Counting{pool_cls.__name__}", (pool_cls,), {"ConnectionCls": conn_cls, "_put_conn": _put_conn})
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter with TCP keep-alive probes, a connect counter and in-flight tracking."""
+
+    def __init__(
+        self,
+        *args: Any,
+        tcp_keepalive: bool = True,
+        counter: _ConnectCounter,
+        inflight: _InFlight,
+        **kwargs: Any,
+    ):
+        self._tcp_keepalive = tcp_keepalive
+        self._counter = counter
+        self._inflight = inflight
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        if self._tcp_keepalive:
+            options = list(HTTPConnection.default_socket_options)
+            options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+            kwargs["socket_options"] = options
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, self._counter, self._inflight),
+            "https": _counting_pool(HTTPSConnectionPool, self._counter, self._inflight),
+        }
+
+
+_LIVE_POOLS: "weakref.WeakSet[ConnectionPool]" = weakref.WeakSet()
+
+
+def _reset_locks_in_child() -> None:
+    # A lock held by some parent thread at fork time would never be released
+    for pool in list(_LIVE_POOLS):
+        pool._lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_locks_in_child)
+
+
+class ConnectionPool:
+    """
+    Connection pool shared by every thread using one PersistoClient.
+
+    requests.Session is not documented as thread-safe (cookie jar, adapter
+    mounts), so each thread gets its own lightweight Session. All of them
+    mount one shared HTTPAdapter, and its urllib3 pools are thread-safe. So
+    threads reuse each other's keep-alive connections without sharing
+    mutable Session state.
+
+    The pool is fork-aware: the first request in a child process (gunicorn
+    workers, multiprocessing) builds fresh sockets instead of reusing
+    descriptors inherited from the parent. The inherited ones are dropped
+    without being closed, so the parent's TLS sessions are left alone.
+
+    Tuning:
+        pool_size    connections kept per host (urllib3 pool_maxsize)
+        pool_hosts   distinct hosts with a cached pool (pool_connections)
+        pool_block   wait for a free connection instead of opening an
+                     extra, discarded-after-use one when all are busy
+        keep_alive   False sends "Connection: close" (no reuse at all)
+    """
+
+    def __init__(
+        self,
+        headers: Dict[str, str],
+        *,
+        pool_size: int = 10,
+        pool_hosts: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+    ):
+        if pool_size < 1 or pool_hosts < 1:
+            raise ValueError("pool_size and pool_hosts must be >= 1")
+        self.headers = dict(headers)
+        if not keep_alive:
+            self.headers["Connection"] = "close"
+        self.pool_size = int(pool_size)
+        self.pool_hosts = int(pool_hosts)
+        self.pool_block = bool(pool_block)
+        self.keep_alive = bool(keep_alive)
+        self.forks = 0
+
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._connects = _ConnectCounter()
+        self._inflight = _InFlight()
+        self._adapter = self._new_adapter()
+        self._local = threading.local()
+        self._generation = 0
+        # Requests served by pools that were evicted or dropped (close)
+        self._retired_requests = 0
+        # Adapters inherited across a fork: kept referenced so urllib3's
+        # finalizers never close (and TLS-shutdown) the parent's sockets
+        self._orphaned: List[HTTPAdapter] = []
+        _LIVE_POOLS.add(self)
+
+    def session(self) -> requests.Session:
+        """Session for the calling thread, rebuilt after a fork."""
+        if os.getpid() != self._pid:
+            self._after_fork()
+        local = self._local
+        if getattr(local, "generation", None) != self._generation:
+            s = requests.Session()
+            s.headers.update(self.headers)
+            s.mount("http://", self._adapter)
+            s.mount("https://", self._adapter)
+            local.session = s
+            local.generation = self._generation
+        return local.session
+
+    def warmup(self, url: str, connections: int = 1, timeout: Optional[float] = None) -> int:
+        """
+        Open up to `connections` keep-alive connections to url's host (DNS,
+        TCP and TLS) without sending a request, and park them in the pool.
+
+        Connects run in parallel. Returns how many pooled connections are
+        ready; connects that fail are skipped (the first real request will
+        retry and report the error). This checks connections out of urllib3's
+        pool through its private _get_conn/_put_conn; a urllib3 without them
+        warms nothing and returns 0.
+        """
+        session = self.session()
+        pool = self._pool_for(url, session)
+        if not (hasattr(pool, "_get_conn") and hasattr(pool, "_put_conn")):
+            return 0
+        wanted = max(0, min(int(connections), self.pool_size))
+        conns: List[Any] = []
+        try:
+            for _ in range(wanted):
+                conns.append(pool._get_conn(timeout=0))
+        except Exception:
+            pass  # pool_block=True and every connection busy: warm what we got
+        cold = [c for c in conns if getattr(c, "sock", None) is None]
+
+        def connect(conn: Any) -> None:
+            try:
+                if timeout is not None:
+                    conn.timeout = timeout
+                conn.connect()
+            except Exception:
+                conn.close()
+
+        threads = [threading.Thread(target=connect, args=(c,), daemon=True) for c in cold[1:]]
+        for t in threads:
+            t.start()
+        if cold:
+            connect(cold[0])
+        for t in threads:
+            t.join()
+        ready = 0
+        for conn in conns:
+            if getattr(conn, "sock", None) is not None:
+                ready += 1
+            pool._put_conn(conn)
+        return ready
+
+    def stats(self) -> Dict[str, Any]:
+        """Requests vs new connections; reuse_ratio near 1.0 means TCP/TLS setup is amortised."""
+        requests_made = self._retired_requests + sum(pool.num_requests for pool in self._pools())
+        opened = self._connects.value
+        return {
+            "requests": requests_made,
+            "connections_opened": opened,
+            # warmup() can open connections ahead of requests
+            "reuse_ratio": max(0.0, 1.0 - opened / requests_made) if requests_made else 0.0,
+            "pool_size": self.pool_size,
+            "forks": self.forks,
+        }
+
+    def abort(self, thread_id: int) -> bool:
+        """
+        Cut the request thread `thread_id` is sending or reading right now:
+        its blocked read fails at once and the connection is discarded.
+        Returns False when there is no connection of that thread to cut.
+        """
+        return self._inflight.abort(thread_id)
+
+    def close(self) -> None:
+        with self._lock:
+            self._retire()
+            try:
+                self._adapter.close()
+            except Exception:
+                pass
+            self._adapter = self._new_adapter()
+            self._generation += 1
+
+    # ---------- Internal ----------
+
+    def _new_adapter(self) -> HTTPAdapter:
+        return _KeepAliveAdapter(
+            pool_connections=self.pool_hosts,
+            pool_maxsize=self.pool_size,
+            pool_block=self.pool_block,
+            tcp_keepalive=self.keep_alive,
+            counter=self._connects,
+            inflight=self._inflight,
+        )
+
+    def _pool_for(self, url: str, session: requests.Session) -> Any:
+        """The urllib3 pool requests itself would use for url (same TLS pool key)."""
+        adapter = self._adapter
+        # Same env resolution as a real request (proxies, REQUESTS_CA_BUNDLE), or the pool key differs
+        settings = session.merge_environment_settings(url, {}, None, None, None)
+        if hasattr(adapter, "get_connection_with_tls_context"):  # requests >= 2.32
+            prepared = requests.Request("GET", url).prepare()
+            return adapter.get_connection_with_tls_context(
+                prepared, verify=settings["verify"], proxies=settings["proxies"], cert=settings["cert"]
+            )
+        return adapter.get_connection(url, settings["proxies"])
+
+    def _pools(self) -> List[Any]:
+        container = self._adapter.poolmanager.pools
+        with container.lock:
+            return list(container._container.values())
+
+    def _retire(self) -> None:
+        self._retired_requests += sum(pool.num_requests for pool in self._pools())
+
+    def _after_fork(self) -> None:
+        with self._lock:
+            if os.getpid() == self._pid:
+                return
+            # Sockets belong to the parent: forget them, never close them here
+            self._pid = os.getpid()
+            self._orphaned.append(self._adapter)
+            self._connects = _ConnectCounter()
+            self._inflight = _InFlight()
+            self._adapter = self._new_adapter()
+            self._generation += 1
+            self._retired_requests = 0
+            self.forks += 1
@@ -0,0 +1,204 @@
+# persisto/profiles.py
+"""
+Retrieval profiles: how a similarity-ranked candidate list becomes results.
+
+    min_sim             drop candidates below this cosine similarity
+    recency_weight      blend in freshness: (1 - w) * similarity + w * 2^(-age / half_life)
+    half_life_seconds   age at which freshness is 0.5
+    mmr_lambda          optional maximal-marginal-relevance re-ranking:
+                        lambda * score - (1 - lambda) * max similarity to the
+                        results already picked (1.0 = no diversity)
+
+The named modes ("strict", "fuzzy", "recency") mirror the server's. The
+embedded engine ranks with these settings, and PersistoClient.query_profiles
+applies several profiles on the client to one over-fetched candidate set.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+
+# Server-side retrieval modes, mirrored for the embedded engine.
+# min_sim gates on raw cosine similarity; recency_weight blends in an
+# exponential freshness score (half-life in seconds).
+MODE_DEFAULTS: Dict[str, Dict[str, float]] = {
+    "strict": {"min_sim": 0.55, "recency_weight": 0.0},
+    "fuzzy": {"min_sim": 0.25, "recency_weight": 0.0},
+    "recency": {"min_sim": 0.30, "recency_weight": 0.3, "half_life_seconds": 86400.0},
+}
+
+# Sent with the over-fetch query: rank by similarity alone, no threshold
+UNFILTERED_PROFILE: Dict[str, float] = {"min_sim": -1.0, "recency_weight": 0.0}
+
+_SETTING_KEYS = ("min_sim", "recency_weight", "half_life_seconds")
+_SPEC_KEYS = frozenset(("mode", "k", "mmr_lambda", *_SETTING_KEYS))
+
+
+def resolve_profile(mode: Optional[str] = None, overrides: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+    """Settings for `mode` (None: no threshold, no recency) with `overrides` applied."""
+    settings: Dict[str, Any] = {"min_sim": None, "recency_weight": 0.0, "half_life_seconds": 86400.0}
+    if mode:
+        if mode not in MODE_DEFAULTS:
+            raise ValueError(f"Unknown mode: {mode}")
+        settings.update(MODE_DEFAULTS[mode])
+    if overrides:
+        settings.update({key: overrides[key] for key in _SETTING_KEYS if key in overrides})
+    return settings
+
+
+def normalize_profiles(
+    profiles: Union[Sequence[str], Mapping[str, Mapping[str, Any]]],
+    mmr_lambda: Optional[float] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    {name: spec} from mode names or a mapping of named specs. A spec may
+    hold "mode", "k", "mmr_lambda" and any profile setting; `mmr_lambda`
+    is the default for specs that do not set it.
+    """
+    if isinstance(profiles, Mapping):
+        specs = {name: dict(spec) for name, spec in profiles.items()}
+    else:
+        specs = {name: {"mode": name} for name in profiles}
+    if not specs:
+        raise ValueError("profiles must not be empty")
+    for name, spec in specs.items():
+        unknown = set(spec) - _SPEC_KEYS
+        if unknown:
+            raise ValueError(f"Profile {name!r} has unknown keys: {sorted(unknown)}")
+        resolve_profile(spec.get("mode"))  # fail fast on an unknown mode
+        if mmr_lambda is not None:
+            spec.setdefault("mmr_lambda", mmr_lambda)
+        lam = spec.get("mmr_lambda")
+        if lam is not None and not 0.0 <= float(lam) <= 1.0:
+            raise ValueError(f"Profile {name!r}: mmr_lambda must be in [0, 1]")
+    return specs
+
+
+def blend_scores(
+    sims: "np.ndarray",
+    created: "np.ndarray",
+    now: float,
+    recency_weight: float,
+    half_life_seconds: float,
+) -> "np.ndarray":
+    """Similarity blended with exponential freshness; rows with unknown created time (NaN) count as stale."""
+    if not recency_weight:
+        return sims
+    age = np.maximum(now - created, 0.0)
+    fresh = np.nan_to_num(np.exp2(-age / float(half_life_seconds)), nan=0.0)
+    return (1.0 - recency_weight) * sims + recency_weight * fresh
+
+
+def top_k(scores: "np.ndarray", k: int) -> "np.ndarray":
+    """Indices of the k best scores, best first (ties keep input order)."""
+    if scores.size > k:
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top], kind="stable")]
+    return np.argsort(-scores, kind="stable")
+
+
+def mmr_select(scores: "np.ndarray", vectors: "np.ndarray", k: int, lam: float) -> List[int]:
+    """Greedy maximal-marginal-relevance pick of k indices (vectors L2-normalised)."""
+    n = scores.size
+    k = min(k, n)
+    if k <= 0:
+        return []
+    pair = vectors @ vectors.T
+    picked = [int(np.argmax(scores))]
+    redundancy = pair[picked[0]].copy()
+    available = np.ones(n, dtype=bool)
+    available[picked[0]] = False
+    while len(picked) < k:
+        mmr = np.where(available, lam * scores - (1.0 - lam) * redundancy, -np.inf)
+        best = int(np.argmax(mmr))
+        picked.append(best)
+        available[best] = False
+        np.maximum(redundancy, pair[best], out=redundancy)
+    return picked
+
+
+def apply_profiles(
+    hits: Sequence[Dict[str, Any]],
+    specs: Mapping[str, Mapping[str, Any]],
+    *,
+    k: int,
+    now: float,
+    embed: Optional[Callable[[Sequence[str]], "np.ndarray"]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run every profile over one similarity-ranked candidate list.
+
+    Thresholds and recency scores are computed over the whole list at once.
+    MMR uses the hits' "embedding" when they all carry one, else `embed`
+    over their content. Returns {name: {"results": [...]}}; as from the
+    server, a hit carries "score" when recency moved it off its similarity.
+    """
+    if np is None:
+        raise ImportError('query_profiles requires numpy: pip install "persisto[local]"')
+    sims = np.array([float(h.get("similarity") or 0.0) for h in hits], dtype=np.float64)
+    created = np.array([_epoch(h.get("created_at")) for h in hits], dtype=np.float64)
+    vectors: Optional["np.ndarray"] = None
+
+    out: Dict[str, Dict[str, Any]] = {}
+    for name, spec in specs.items():
+        settings = resolve_profile(spec.get("mode"), spec)
+        kk = int(spec.get("k") or k)
+        rows = np.arange(len(hits))
+        if settings["min_sim"] is not None:
+            rows = rows[sims >= float(settings["min_sim"])]
+        weight = float(settings["recency_weight"])
+        scores = blend_scores(sims[rows], created[rows], now, weight, settings["half_life_seconds"])
+
+        lam = spec.get("mmr_lambda")
+        if lam is not None and rows.size > 1 and kk > 1:
+            if vectors is None:
+                vectors = _hit_vectors(hits, embed)
+            order = mmr_select(scores, vectors[rows], kk, float(lam))
+        else:
+            order = top_k(scores, kk).tolist() if kk > 0 else []
+
+        results = []
+        for i in order:
+            hit = dict(hits[int(rows[i])])
+            hit.pop("score", None)
+            if scores[i] != sims[rows[i]]:
+                hit["score"] = float(scores[i])
+            results.append(hit)
+        out[name] = {"results": results}
+    return out
+
+
+def _hit_vectors(
+    hits: Sequence[Dict[str, Any]],
+    embed: Optional[Callable[[Sequence[str]], "np.ndarray"]],
+) -> "np.ndarray":
+    if hits and all(h.get("embedding") is not None for h in hits):
+        vecs = np.asarray([h["embedding"] for h in hits], dtype=np.float32)
+    else:
+        if embed is None:
+            from .local import HashingEmbedder  # lexical stand-in for the server's vectors
+            embed = HashingEmbedder()
+        vecs = np.asarray(embed([str(h.get("content") or "") for h in hits]), dtype=np.float32)
+    norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vecs / norms
+
+
+def _epoch(value: Any) -> float:
+    if value is None:
+        return float("nan")
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        ts = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return float("nan")
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
@@ -0,0 +1,294 @@
+# persisto/ratelimit.py
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .errors import PersistoDeadlineExceeded, PersistoRateLimitError
+
+# Bucket state: (tat, rate, adjusted_at, decreased_at). `tat` is the GCRA
+# "theoretical arrival time" of the next request; timestamps are wall-clock
+# (time.time()) so processes sharing a state file agree on them.
+BucketState = Tuple[float, float, float, float]
+Transaction = Callable[[List[Optional[BucketState]]], Tuple[List[Optional[BucketState]], Any]]
+
+
+def rate_scope(api_key: str) -> str:
+    """Bucket prefix for an API key; a hash, so state files never hold the key itself."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+# =========================
+# Backends
+# =========================
+
+class RateLimitBackend:
+    """
+    Storage for RateLimiter buckets. transact() runs `fn` on the current
+    states of `keys` (None = never seen) and stores the states it returns
+    (None = leave unchanged), atomically across all the keys.
+    """
+
+    def transact(self, keys: Sequence[str], fn: Transaction) -> Any:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Per-process state: shared by every thread (and client) using the limiter."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._state: Dict[str, BucketState] = {}
+
+    def transact(self, keys: Sequence[str], fn: Transaction) -> Any:
+        with self._lock:
+            new, result = fn([self._state.get(k) for k in keys])
+            for key, state in zip(keys, new):
+                if state is not None:
+                    self._state[key] = state
+            return result
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """
+    Host-wide state in a SQLite file: every process pointing at the same
+    path draws from the same buckets. Each acquire is one short write
+    transaction (BEGIN IMMEDIATE), tens of microseconds next to a request.
+    The state is advisory, so it is never fsynced.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = 0
+
+    def transact(self, keys: Sequence[str], fn: Transaction) -> Any:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                states: List[Optional[BucketState]] = []
+                for key in keys:
+                    row = conn.execute(
+                        "SELECT tat, rate, adjusted_at, decreased_at FROM buckets WHERE key = ?", (key,)
+                    ).fetchone()
+                    states.append(tuple(row) if row is not None else None)  # type: ignore[arg-type]
+                new, result = fn(states)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO buckets (key, tat, rate, adjusted_at, decreased_at) VALUES (?, ?, ?, ?, ?)",
+                    [(key, *state) for key, state in zip(keys, new) if state is not None],
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return result
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connect(self):
+        # A SQLite connection must not cross fork(): reopen in the child
+        if self._conn is None or self._pid != os.getpid():
+            import sqlite3  # deferred: only cross-process limiters need it
+            conn = sqlite3.connect(self.path, timeout=10.0, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                " key TEXT PRIMARY KEY, tat REAL, rate REAL, adjusted_at REAL, decreased_at REAL)"
+            )
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+
+# =========================
+# Limiter
+# =========================
+
+class RateLimiter:
+    """
+    Client-side token bucket, per API key and optionally per endpoint.
+
+        limiter = RateLimiter(rate=20, endpoint_rates={"/memory/save_batch": 2})
+        c = Client(api_key="...", rate_limit=limiter)
+
+    Every request takes a token from its API key's bucket (`rate` per second,
+    bursts of `burst`) and, for endpoints listed in `endpoint_rates`, from
+    that endpoint's bucket too. Callers that find the bucket empty wait
+    locally, in arrival order, instead of collecting 429s. With `max_wait`,
+    a call that would wait longer raises PersistoRateLimitError at once.
+
+    Sharing: one limiter is shared by every thread and client using it. With
+    state_path, the buckets live in a SQLite file and every process on the
+    host using that path shares them.
+
+    Adaptive (default): a 429 halves the bucket's rate (at most once per
+    `decrease_cooldown` seconds, so one burst of 429s counts once, never
+    below `min_rate`) and a Retry-After holds the bucket's callers back for
+    that long. The rate then climbs back linearly, reaching the configured
+    rate again after `recovery_seconds` without further 429s.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        *,
+        endpoint_rates: Optional[Dict[str, float]] = None,
+        state_path: Optional[str] = None,
+        backend: Optional[RateLimitBackend] = None,
+        max_wait: Optional[float] = None,
+        adaptive: bool = True,
+        min_rate: Optional[float] = None,
+        decrease: float = 0.5,
+        decrease_cooldown: float = 1.0,
+        recovery_seconds: float = 60.0,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        if any(r <= 0 for r in (endpoint_rates or {}).values()):
+            raise ValueError("endpoint_rates must be > 0")
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be in (0, 1)")
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst if burst is not None else rate))
+        self.endpoint_rates = {path: float(r) for path, r in (endpoint_rates or {}).items()}
+        self.max_wait = max_wait
+        self.adaptive = adaptive
+        self.min_rate_fraction = (min_rate / self.rate) if min_rate is not None else 0.05
+        self.decrease = float(decrease)
+        self.decrease_cooldown = float(decrease_cooldown)
+        self.recovery_seconds = max(1e-6, float(recovery_seconds))
+        if backend is None:
+            backend = SQLiteRateLimitBackend(state_path) if state_path else MemoryRateLimitBackend()
+        self.backend = backend
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._delayed = 0
+        self._waited = 0.0
+        self._rejected = 0
+        self._rate_limited = 0
+        self._rates: Dict[str, float] = {}
+
+    def reserve(self, scope: str, endpoint: str, budget: Optional[float] = None) -> float:
+        """
+        Take a token for a request to `endpoint` and return how long to wait
+        before sending it. Raises PersistoRateLimitError (taking nothing)
+        when that exceeds max_wait, or PersistoDeadlineExceeded when it
+        exceeds `budget` (the caller's time left).
+        """
+        buckets = self._buckets(scope, endpoint)
+        now = time.time()
+        limit = min(self.max_wait if self.max_wait is not None else float("inf"),
+                    budget if budget is not None else float("inf"))
+
+        def take(states: List[Optional[BucketState]]) -> Tuple[List[Optional[BucketState]], Tuple[float, List[float]]]:
+            new: List[Optional[BucketState]] = []
+            wait = 0.0
+            rates = []
+            for (_, target, burst), state in zip(buckets, states):
+                tat, rate, adjusted, decreased = self._recover(state, target, now)
+                interval = 1.0 / rate
+                tolerance = (burst - 1.0) * interval
+                wait = max(wait, tat - tolerance - now)
+                new.append((max(tat, now) + interval, rate, adjusted, decreased))
+                rates.append(rate)
+            if wait > limit:
+                return [None] * len(states), (wait, rates)
+            return new, (wait, rates)
+
+        wait, rates = self.backend.transact([key for key, _, _ in buckets], take)
+        wait = max(0.0, wait)
+        with self._lock:
+            for (key, _, _), rate in zip(buckets, rates):
+                self._rates[key] = rate
+            if wait > limit:
+                self._rejected += 1
+                if self.max_wait is not None and wait > self.max_wait:
+                    raise PersistoRateLimitError(
+                        f"Client-side rate limit: would wait {wait:.2f}s (max_wait {self.max_wait:.2f}s)"
+                    )
+                raise PersistoDeadlineExceeded(
+                    f"Client-side rate limit: would wait {wait:.2f}s with {budget:.2f}s left before the deadline"
+                )
+            self._requests += 1
+            if wait > 0:
+                self._delayed += 1
+                self._waited += wait
+        return wait
+
+    def acquire(self, scope: str, endpoint: str) -> float:
+        """reserve(), then sleep for the wait; returns the seconds slept."""
+        wait = self.reserve(scope, endpoint)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def on_rate_limited(self, scope: str, endpoint: str, retry_after: Optional[str] = None) -> None:
+        """Feed back a 429: slow the endpoint's bucket (else the key's) and honour Retry-After."""
+        key, target, burst = self._buckets(scope, endpoint)[-1]
+        try:
+            hold = float(retry_after) if retry_after is not None else 0.0
+        except ValueError:
+            hold = 0.0
+        now = time.time()
+
+        def slow_down(states: List[Optional[BucketState]]) -> Tuple[List[Optional[BucketState]], float]:
+            tat, rate, adjusted, decreased = self._recover(states[0], target, now)
+            if self.adaptive and now - decreased >= self.decrease_cooldown:
+                rate = max(target * self.min_rate_fraction, rate * self.decrease)
+                adjusted = decreased = now
+            if hold > 0:
+                # Next token no earlier than now + hold, even for a full bucket
+                tat = max(tat, now + hold + (burst - 1.0) / rate)
+            return [(tat, rate, adjusted, decreased)], rate
+
+        rate = self.backend.transact([key], slow_down)
+        with self._lock:
+            self._rate_limited += 1
+            self._rates[key] = rate
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters for this process, and the last rate seen per bucket ("<scope>[ <endpoint>]")."""
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "delayed": self._delayed,
+                "wait_seconds": self._waited,
+                "rejected": self._rejected,
+                "rate_limited": self._rate_limited,
+                "rates": dict(self._rates),
+            }
+
+    def close(self) -> None:
+        self.backend.close()
+
+    def _buckets(self, scope: str, endpoint: str) -> List[Tuple[str, float, float]]:
+        """(key, configured rate, burst) for the buckets a request draws from, most specific last."""
+        buckets = [(scope, self.rate, self.burst)]
+        endpoint_rate = self.endpoint_rates.get(endpoint)
+        if endpoint_rate is not None:
+            buckets.append((f"{scope} {endpoint}", endpoint_rate, max(1.0, min(endpoint_rate, self.burst))))
+        return buckets
+
+    def _recover(self, state: Optional[BucketState], target: float, now: float) -> BucketState:
+        """Current state with the rate climbed back toward `target` since it was last adjusted."""
+        if state is None:
+            return (now, target, now, 0.0)
+        tat, rate, adjusted, decreased = state
+        if rate < target:
+            rate = min(target, rate + target * max(0.0, now - adjusted) / self.recovery_seconds)
+        return (tat, min(rate, target), now, decreased)
@@ -0,0 +1,237 @@
+# persisto/resilience.py
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+
+def full_jitter(backoff: float) -> float:
+    """AWS-style full jitter: uniform in [0, backoff], so workers never retry in lockstep."""
+    return random.uniform(0.0, backoff)
+
+
+# =========================
+# Retry budget
+# =========================
+
+class RetryBudget:
+    """
+    Caps retries at a fraction of recent requests.
+
+    Over a sliding `window_seconds`, retries are allowed while
+        retries < ratio * requests + min_per_second * window_seconds
+    The floor keeps low-traffic clients able to retry; the ratio stops a
+    brownout from turning every request into `retries + 1` requests.
+
+    Share one budget across clients (and threads) to cap the process as a
+    whole: RetryBudget.shared() returns a process-wide instance.
+    """
+
+    _shared: Optional["RetryBudget"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, window_seconds: int = 10):
+        if ratio < 0 or min_per_second < 0 or window_seconds < 1:
+            raise ValueError("ratio and min_per_second must be >= 0, window_seconds >= 1")
+        self.ratio = float(ratio)
+        self.min_per_second = float(min_per_second)
+        self.window_seconds = int(window_seconds)
+        self.rejected = 0
+        self._lock = threading.Lock()
+        # (second, requests, retries), oldest first
+        self._buckets: Deque[List[int]] = deque()
+
+    @classmethod
+    def shared(cls) -> "RetryBudget":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._bucket()[1] += 1
+
+    def try_acquire(self) -> bool:
+        """Spend one retry if the budget allows it."""
+        with self._lock:
+            bucket = self._bucket()
+            requests = sum(b[1] for b in self._buckets)
+            retries = sum(b[2] for b in self._buckets)
+            if retries < self.ratio * requests + self.min_per_second * self.window_seconds:
+                bucket[2] += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._bucket()
+            return {
+                "requests": sum(b[1] for b in self._buckets),
+                "retries": sum(b[2] for b in self._buckets),
+                "rejected": self.rejected,
+                "window_seconds": self.window_seconds,
+            }
+
+    def _bucket(self) -> List[int]:
+        now = int(time.monotonic())
+        buckets = self._buckets
+        while buckets and buckets[0][0] <= now - self.window_seconds:
+            buckets.popleft()
+        if not buckets or buckets[-1][0] != now:
+            buckets.append([now, 0, 0])
+        return buckets[-1]
+
+
+# =========================
+# Circuit breaker
+# =========================
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Per-backend circuit breaker.
+
+    closed     requests flow; `failure_threshold` consecutive failures
+               (network errors, 5xx) open the circuit
+    open       requests fail fast (PersistoCircuitOpenError) until
+               `recovery_timeout` seconds have passed
+    half_open  up to `half_open_max` probe requests go through; a success
+               closes the circuit, a failure re-opens it
+
+    Every transition is emitted to listeners registered with add_listener()
+    as {"name", "from", "to", "at", "failures"}.
+
+    CircuitBreaker.for_url(base_url) returns the process-wide breaker for a
+    backend, so every client talking to it shares one view of its health.
+    """
+
+    _registry: Dict[str, "CircuitBreaker"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(
+        self,
+        name: str = "persisto",
+        *,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max: int = 1,
+    ):
+        if failure_threshold < 1 or half_open_max < 1:
+            raise ValueError("failure_threshold and half_open_max must be >= 1")
+        self.name = name
+        self.failure_threshold = int(failure_threshold)
+        self.recovery_timeout = float(recovery_timeout)
+        self.half_open_max = int(half_open_max)
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_started = 0.0
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    @classmethod
+    def for_url(cls, base_url: str, **kwargs: Any) -> "CircuitBreaker":
+        with cls._registry_lock:
+            breaker = cls._registry.get(base_url)
+            if breaker is None:
+                breaker = cls._registry[base_url] = cls(base_url, **kwargs)
+            return breaker
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            event = self._maybe_half_open(time.monotonic())
+            state = self._state
+        self._emit(event)
+        return state
+
+    def add_listener(self, fn: Callable[[Dict[str, Any]], None]) -> None:
+        self._listeners.append(fn)
+
+    def allow(self) -> bool:
+        """May a request be sent now? Counts a probe slot when half-open."""
+        now = time.monotonic()
+        with self._lock:
+            event = self._maybe_half_open(now)
+            if self._state == CLOSED:
+                allowed = True
+            elif self._state == HALF_OPEN:
+                # A probe that never reported back must not wedge the breaker
+                if self._probes >= self.half_open_max and now - self._probe_started >= self.recovery_timeout:
+                    self._probes = 0
+                allowed = self._probes < self.half_open_max
+                if allowed:
+                    self._probes += 1
+                    self._probe_started = now
+            else:
+                allowed = False
+        self._emit(event)
+        return allowed
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit lets a probe through (0 if not open)."""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.recovery_timeout - time.monotonic())
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            event = self._transition(CLOSED) if self._state != CLOSED else None
+        self._emit(event)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            event = None
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                event = self._transition(OPEN)
+                self._opened_at = time.monotonic()
+        self._emit(event)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            event = self._maybe_half_open(time.monotonic())
+            snap = {
+                "name": self.name,
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "retry_in": max(0.0, self._opened_at + self.recovery_timeout - time.monotonic())
+                if self._state == OPEN else 0.0,
+            }
+        self._emit(event)
+        return snap
+
+    # ---------- Internal (caller holds self._lock) ----------
+
+    def _maybe_half_open(self, now: float) -> Optional[Dict[str, Any]]:
+        if self._state == OPEN and now - self._opened_at >= self.recovery_timeout:
+            return self._transition(HALF_OPEN)
+        return None
+
+    def _transition(self, new_state: str) -> Dict[str, Any]:
+        event = {"name": self.name, "from": self._state, "to": new_state, "at": time.time(), "failures": self._failures}
+        self._state = new_state
+        self._probes = 0
+        return event
+
+    def _emit(self, event: Optional[Dict[str, Any]]) -> None:
+        if event is None:
+            return
+        for fn in list(self._listeners):
+            try:
+                fn(event)
+            except Exception:
+                pass  # a broken listener must not break requests
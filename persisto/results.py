@@ -0,0 +1,183 @@
+# persisto/results.py
+"""
+Typed views over /memory/query responses.
+
+    res = client.query_hits(namespace="docs", query="refund policy", include_content=False)
+    for hit in res:
+        print(hit.id, hit.score)
+    res.ids()        # without building a QueryHit per row
+
+QueryResult and QueryHit wrap the decoded response in place: no hit is
+copied, and a QueryHit is only created when a row is actually accessed.
+Pair them with a field projection (`fields=` / `include_content=False`) so
+the server does not send, and the client does not parse, content or
+metadata the caller never reads.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union, overload
+
+# Keys a query hit may carry, in the order projections are sent
+HIT_FIELDS = ("id", "content", "metadata", "similarity", "score", "created_at", "expires_at")
+
+
+def projection(fields: Optional[Sequence[str]], include_content: bool = True) -> Optional[List[str]]:
+    """
+    The "fields" list sent with a query, or None for full hits. Unknown
+    names raise ValueError; the order is canonical so equal projections
+    share a query cache entry. "score" brings "similarity" along: servers
+    only send a score when they re-rank, and it falls back to similarity.
+    """
+    if fields is None:
+        if include_content:
+            return None
+        fields = HIT_FIELDS
+    elif isinstance(fields, str):
+        raise TypeError("fields must be a sequence of field names, not a string")
+    unknown = set(fields) - set(HIT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown hit fields: {sorted(unknown)} (expected some of {list(HIT_FIELDS)})")
+    wanted = set(fields)
+    if "score" in wanted:
+        wanted.add("similarity")
+    if not include_content:
+        wanted.discard("content")
+    return [name for name in HIT_FIELDS if name in wanted]
+
+
+def project_response(resp: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+    """
+    Drop hit keys outside `fields` from a query response, in place. Servers
+    that honour the projection already comply, which is checked on the
+    first hit so their responses cost nothing here.
+    """
+    results = resp.get("results")
+    if not isinstance(results, list) or not results or not isinstance(results[0], dict):
+        return resp
+    keep = frozenset(fields)
+    if keep.issuperset(results[0]):
+        return resp
+    resp["results"] = [{k: v for k, v in hit.items() if k in keep} for hit in results]
+    return resp
+
+
+class QueryHit:
+    """
+    One query result. Attributes read the underlying decoded hit; a field
+    that was projected away (or that the server did not send) is None.
+    Mapping-style access (`hit["content"]`, `hit.get(...)`) still works.
+    """
+
+    __slots__ = ("_hit",)
+
+    def __init__(self, hit: Dict[str, Any]):
+        self._hit = hit
+
+    @property
+    def id(self) -> Any:
+        return self._hit.get("id")
+
+    @property
+    def content(self) -> Optional[str]:
+        return self._hit.get("content")
+
+    @property
+    def metadata(self) -> Optional[Dict[str, Any]]:
+        return self._hit.get("metadata")
+
+    @property
+    def similarity(self) -> Optional[float]:
+        return self._hit.get("similarity")
+
+    @property
+    def score(self) -> Optional[float]:
+        """The ranking score: "score" when the server re-scored (e.g. recency), else the similarity."""
+        score = self._hit.get("score")
+        return self._hit.get("similarity") if score is None else score
+
+    @property
+    def created_at(self) -> Optional[str]:
+        return self._hit.get("created_at")
+
+    @property
+    def expires_at(self) -> Optional[str]:
+        return self._hit.get("expires_at")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._hit.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._hit[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._hit
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self._hit)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, QueryHit):
+            return self._hit == other._hit
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        content = self._hit.get("content")
+        if isinstance(content, str) and len(content) > 40:
+            content = content[:37] + "..."
+        shown = ", ".join(f"{k}={v!r}" for k, v in (("id", self.id), ("score", self.score), ("content", content))
+                          if v is not None)
+        return f"QueryHit({shown})"
+
+
+class QueryResult:
+    """
+    The hits of one query, best first. Behaves as a sequence of QueryHit,
+    created lazily per accessed row; ids(), scores() and similarities()
+    read the decoded response directly. `raw` is the response dict itself.
+    """
+
+    __slots__ = ("raw", "_rows")
+
+    def __init__(self, raw: Dict[str, Any]):
+        self.raw = raw
+        rows = raw.get("results")
+        self._rows: List[Dict[str, Any]] = rows if isinstance(rows, list) else []
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __bool__(self) -> bool:
+        return bool(self._rows)
+
+    def __iter__(self) -> Iterator[QueryHit]:
+        for row in self._rows:
+            yield QueryHit(row)
+
+    @overload
+    def __getitem__(self, index: int) -> QueryHit: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[QueryHit]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[QueryHit, List[QueryHit]]:
+        if isinstance(index, slice):
+            return [QueryHit(row) for row in self._rows[index]]
+        return QueryHit(self._rows[index])
+
+    def ids(self) -> List[Any]:
+        return [row.get("id") for row in self._rows]
+
+    def similarities(self) -> List[Optional[float]]:
+        return [row.get("similarity") for row in self._rows]
+
+    def scores(self) -> List[Optional[float]]:
+        """Per hit, "score" when present, else the similarity (as QueryHit.score)."""
+        return [row.get("similarity") if row.get("score") is None else row["score"] for row in self._rows]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return list(self._rows)
+
+    def __repr__(self) -> str:
+        return f"QueryResult({len(self._rows)} hits)"
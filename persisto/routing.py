@@ -0,0 +1,234 @@
+# persisto/routing.py
+from __future__ import annotations
+
+import math
+import random
+import threading
+import time
+from typing import Any, Collection, Dict, List, Optional, Sequence
+
+HEALTHY = "healthy"
+EJECTED = "ejected"
+PROBING = "probing"
+
+
+class Endpoint:
+    """One backend replica and its moving health estimates (guarded by the router's lock)."""
+
+    __slots__ = (
+        "url", "state", "latency", "error_rate", "inflight", "requests", "errors",
+        "consecutive_failures", "ejections", "ejected_until", "probe_started", "_sampled_at",
+        "_reported_at",
+    )
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.state = HEALTHY
+        self.latency: Optional[float] = None  # seconds, peak-sensitive EWMA
+        self.error_rate = 0.0                 # EWMA of failed attempts
+        self.inflight = 0
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.ejections = 0                    # back-to-back ejections (reset by a successful probe)
+        self.ejected_until = 0.0
+        self.probe_started = 0.0
+        self._sampled_at = 0.0
+        self._reported_at = 0.0
+
+
+class EndpointRouter:
+    """
+    Spreads requests over several replicas of the API.
+
+        router = EndpointRouter(["https://a.example", "https://b.example", "https://c.example"])
+        c = Client(api_key="...", endpoints=router)
+        router.stats()   # per-endpoint traffic, latency and health
+
+    Routing is power-of-two-choices: each attempt samples two healthy
+    endpoints and takes the cheaper, where cost is the endpoint's latency
+    estimate times (requests in flight + 1), inflated by its error rate. A
+    slow or busy replica sheds load at once without herding every client
+    onto the single fastest one. Retries avoid endpoints that already
+    failed for the same call.
+
+    Latency is an EWMA decaying over `decay_seconds`, raised immediately by
+    slower samples (peak EWMA), so a replica that turns slow is noticed on
+    the next response. The error rate is an EWMA over ~`error_window`
+    attempts; network errors and 5xx count as failures. While an endpoint
+    has nothing in flight, both estimates fade over `decay_seconds`, so a
+    replica that had one bad moment is tried again even by sequential
+    callers (and re-measured from scratch).
+
+    Ejection: `eject_after` consecutive failures, or an error rate above
+    `eject_error_rate` (once `error_window` attempts were seen), take an
+    endpoint out of rotation for `eject_seconds`, doubling on every
+    back-to-back ejection up to `max_eject_seconds`. It then gets a single
+    live probe request: success brings it back, failure ejects it again.
+    When every endpoint is ejected, requests still go to the one due back
+    first rather than failing outright.
+
+    One router is shared by every thread (and client) using it.
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        *,
+        decay_seconds: float = 10.0,
+        error_window: int = 20,
+        eject_after: int = 5,
+        eject_error_rate: float = 0.5,
+        eject_seconds: float = 5.0,
+        max_eject_seconds: float = 120.0,
+        seed: Optional[int] = None,
+    ):
+        endpoints = [Endpoint(u) for u in urls]
+        if not endpoints:
+            raise ValueError("EndpointRouter needs at least one URL")
+        if len({e.url for e in endpoints}) != len(endpoints):
+            raise ValueError("Duplicate endpoint URLs")
+        if eject_after < 1 or error_window < 1:
+            raise ValueError("eject_after and error_window must be >= 1")
+        if not 0 < eject_error_rate <= 1:
+            raise ValueError("eject_error_rate must be in (0, 1]")
+        self.endpoints = endpoints
+        self.decay_seconds = float(decay_seconds)
+        self.error_window = int(error_window)
+        self.eject_after = int(eject_after)
+        self.eject_error_rate = float(eject_error_rate)
+        self.eject_seconds = float(eject_seconds)
+        self.max_eject_seconds = float(max_eject_seconds)
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+
+    @property
+    def urls(self) -> List[str]:
+        return [e.url for e in self.endpoints]
+
+    def pick(self, avoid: Optional[Collection[Endpoint]] = None) -> Endpoint:
+        """
+        Choose the endpoint for the next attempt and count it in flight;
+        every pick must be followed by exactly one report(). `avoid` holds
+        endpoints that already failed this call (ignored if nothing else is left).
+        """
+        now = time.monotonic()
+        with self._lock:
+            chosen = self._due_probe(now, avoid)
+            if chosen is None:
+                healthy = [e for e in self.endpoints if e.state == HEALTHY]
+                if avoid:
+                    healthy = [e for e in healthy if e not in avoid] or healthy
+                if not healthy:
+                    # Everything is ejected: try the endpoint due back first
+                    chosen = min(self.endpoints, key=lambda e: (e.state == PROBING, e.ejected_until))
+                elif len(healthy) == 1:
+                    chosen = healthy[0]
+                else:
+                    a, b = self._rng.sample(healthy, 2)
+                    chosen = a if self._cost(a, now) <= self._cost(b, now) else b
+            chosen.inflight += 1
+            chosen.requests += 1
+            return chosen
+
+    def report(self, endpoint: Endpoint, seconds: Optional[float], ok: Optional[bool]) -> None:
+        """
+        Outcome of an attempt on `endpoint`: ok=True with its latency, False
+        for a failure, None when it ended without telling anything about
+        the endpoint's health (e.g. a local error).
+        """
+        now = time.monotonic()
+        with self._lock:
+            endpoint.inflight = max(0, endpoint.inflight - 1)
+            endpoint._reported_at = now
+            if ok is None:
+                if endpoint.state == PROBING:
+                    endpoint.probe_started = 0.0  # let another request probe
+                return
+            alpha = 1.0 / self.error_window
+            endpoint.error_rate += alpha * ((0.0 if ok else 1.0) - endpoint.error_rate)
+            if ok:
+                endpoint.consecutive_failures = 0
+                if seconds is not None:
+                    self._observe_latency(endpoint, seconds, now)
+                if endpoint.state != HEALTHY:
+                    endpoint.state = HEALTHY
+                    endpoint.ejections = 0
+                    endpoint.error_rate = min(endpoint.error_rate, self.eject_error_rate / 2)
+                return
+            endpoint.errors += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.state == PROBING or (
+                endpoint.state == HEALTHY
+                and (
+                    endpoint.consecutive_failures >= self.eject_after
+                    or (endpoint.requests >= self.error_window and endpoint.error_rate >= self.eject_error_rate)
+                )
+            ):
+                self._eject(endpoint, now)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per endpoint: state, requests (and share of all), errors, error_rate, latency_ms, inflight, ejections."""
+        now = time.monotonic()
+        with self._lock:
+            total = sum(e.requests for e in self.endpoints)
+            return [
+                {
+                    "url": e.url,
+                    "state": e.state,
+                    "requests": e.requests,
+                    "share": (e.requests / total) if total else 0.0,
+                    "errors": e.errors,
+                    "error_rate": e.error_rate,
+                    "latency_ms": e.latency * 1000.0 if e.latency is not None else None,
+                    "inflight": e.inflight,
+                    "ejections": e.ejections,
+                    "ejected_for": max(0.0, e.ejected_until - now) if e.state == EJECTED else 0.0,
+                }
+                for e in self.endpoints
+            ]
+
+    def _cost(self, e: Endpoint, now: float) -> float:
+        known = [x.latency for x in self.endpoints if x.latency is not None]
+        best = min(known) if known else 0.0
+        # Unmeasured: as good as the best known endpoint, so it gets traffic and a sample
+        latency = best if e.latency is None else e.latency
+        error_rate = e.error_rate
+        if e.inflight == 0 and self.decay_seconds > 0:
+            # No traffic means no new samples: let a stale estimate fade over decay_seconds,
+            # or one slow or failed attempt would keep sequential callers away for good
+            fade = math.exp(-(now - e._reported_at) / self.decay_seconds)
+            latency *= fade
+            error_rate *= fade
+        return (latency + 1e-4) * (e.inflight + 1) / max(0.05, 1.0 - error_rate)
+
+    def _observe_latency(self, e: Endpoint, seconds: float, now: float) -> None:
+        if e.latency is None or seconds > e.latency:
+            e.latency = seconds
+        else:
+            w = math.exp(-(now - e._sampled_at) / self.decay_seconds) if self.decay_seconds > 0 else 0.0
+            e.latency = w * e.latency + (1.0 - w) * seconds
+        e._sampled_at = now
+
+    def _due_probe(self, now: float, avoid: Optional[Collection[Endpoint]] = None) -> Optional[Endpoint]:
+        """
+        An ejected endpoint whose time is up, moved to PROBING; one probe in
+        flight at a time, and never a retry of a call that failed there.
+        """
+        for e in self.endpoints:
+            if e.state == EJECTED and now >= e.ejected_until:
+                e.state = PROBING
+            if e.state == PROBING and not (avoid and e in avoid):
+                # A probe that never reported back must not wedge the endpoint
+                if e.probe_started and now - e.probe_started < max(self.eject_seconds, 30.0):
+                    continue
+                e.probe_started = now
+                return e
+        return None
+
+    def _eject(self, e: Endpoint, now: float) -> None:
+        e.ejections += 1
+        e.state = EJECTED
+        e.ejected_until = now + min(self.max_eject_seconds, self.eject_seconds * 2 ** (e.ejections - 1))
+        e.probe_started = 0.0
+        e.consecutive_failures = 0
@@ -0,0 +1,156 @@
+# persisto/serialization.py
+from __future__ import annotations
+
+import gzip
+import json
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None  # type: ignore[assignment]
+
+
+# =========================
+# JSON
+# =========================
+
+class JSONSerializer:
+    """Stdlib JSON, compact separators."""
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class ORJSONSerializer(JSONSerializer):
+    """orjson: several times faster on large payloads; falls back for exotic types."""
+
+    name = "orjson"
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            return super().dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+def default_serializer() -> JSONSerializer:
+    """Fastest available serializer (orjson when installed, else stdlib)."""
+    return ORJSONSerializer() if orjson is not None else JSONSerializer()
+
+
+# =========================
+# Compression
+# =========================
+
+COMPRESSIONS = ("gzip", "zstd")
+
+
+def check_compression(compression: Optional[str]) -> Optional[str]:
+    if compression is None:
+        return None
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"compression must be one of {COMPRESSIONS} or None")
+    if compression == "zstd" and zstandard is None:
+        raise ImportError('zstd compression requires zstandard: pip install "persisto[fast]"')
+    return compression
+
+
+def compress(data: bytes, compression: str) -> bytes:
+    if compression == "gzip":
+        return gzip.compress(data, compresslevel=5)
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+def encode_body(
+    obj: Optional[Dict[str, Any]],
+    serializer: JSONSerializer,
+    compression: Optional[str],
+    min_bytes: int,
+) -> Tuple[Optional[bytes], Dict[str, str], int]:
+    """
+    Serialize (and maybe compress) a request body once per call.
+
+    Returns (wire bytes, extra headers, uncompressed size). Bodies smaller
+    than `min_bytes` are sent as-is: compressing them costs more CPU than it
+    saves on the wire.
+    """
+    if obj is None:
+        return None, {}, 0
+    raw = serializer.dumps(obj)
+    if compression is None or len(raw) < min_bytes:
+        return raw, {}, len(raw)
+    return compress(raw, compression), {"Content-Encoding": compression}, len(raw)
+
+
+def accept_encoding(transport: str = "requests") -> str:
+    """
+    Response encodings `transport` ("requests" or "aiohttp") can decode.
+    zstd is advertised only when the HTTP library decodes it itself: urllib3
+    2.x and aiohttp 3.12+ do with their own zstd backend, and the zstandard
+    package used for request bodies does not help them.
+    """
+    encodings = ["gzip", "deflate"]
+    if transport == "aiohttp":
+        from aiohttp import compression_utils
+
+        zstd = getattr(compression_utils, "HAS_ZSTD", False)
+    else:
+        from urllib3.util import request as urllib3_request
+
+        zstd = "zstd" in urllib3_request.ACCEPT_ENCODING.split(",")
+    if zstd:
+        encodings.append("zstd")
+    return ", ".join(encodings)
+
+
+# =========================
+# Counters
+# =========================
+
+class TransferStats:
+    """Bytes moved before (raw) and after (wire) compression, both directions."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.sent_raw = 0
+        self.sent_wire = 0
+        self.received_raw = 0
+        self.received_wire = 0
+
+    def record(self, sent_raw: int, sent_wire: int, received_raw: int, received_wire: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.sent_raw += sent_raw
+            self.sent_wire += sent_wire
+            self.received_raw += received_raw
+            self.received_wire += received_wire
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "sent_raw": self.sent_raw,
+                "sent_wire": self.sent_wire,
+                "received_raw": self.received_raw,
+                "received_wire": self.received_wire,
+                "send_ratio": (self.sent_wire / self.sent_raw) if self.sent_raw else 1.0,
+                "receive_ratio": (self.received_wire / self.received_raw) if self.received_raw else 1.0,
+            }
@@ -0,0 +1,102 @@
+# persisto/singleflight.py
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Type
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls.
+
+    The first caller for a key runs `fn`; callers arriving while it is in
+    flight wait and receive the same result (or the same error). Once the
+    call finishes the key is forgotten, so results are never served stale.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0   # calls that actually ran
+        self.coalesced = 0  # calls that piggy-backed on an in-flight one
+
+    def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Any],
+        timeout: Optional[float] = None,
+        private: Tuple[Type[BaseException], ...] = (),
+    ) -> Any:
+        """
+        Run `fn` once for concurrent callers of `key`. A caller that joins an
+        in-flight call waits at most `timeout` seconds, then raises TimeoutError
+        (the call itself carries on for the others).
+
+        Errors of a `private` type (e.g. the leader's own deadline ran out),
+        and BaseExceptions such as KeyboardInterrupt, belong to the leader
+        alone: its followers start over, one of them as the new leader.
+        Shared errors reach each follower as its own copy.
+        """
+        end = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                    self.executed += 1
+                else:
+                    self.coalesced += 1
+
+            if leader:
+                break
+            if not call.done.wait(None if end is None else max(0.0, end - time.monotonic())):
+                raise TimeoutError(f"Coalesced call still in flight after {timeout:.2f}s")
+            err = call.error
+            if err is None:
+                return call.result
+            if isinstance(err, private) or not isinstance(err, Exception):
+                continue
+            mine = _own_copy(err)
+            if mine is err:
+                raise err
+            raise mine from err
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.executed + self.coalesced
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "coalesce_rate": (self.coalesced / total) if total else 0.0,
+            "in_flight": len(self._calls),
+        }
+
+
+def _own_copy(err: BaseException) -> BaseException:
+    """A copy of `err` for one follower: threads re-raising one object would share its traceback."""
+    try:
+        return copy.copy(err)
+    except Exception:
+        return err
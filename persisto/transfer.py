@@ -0,0 +1,292 @@
+# persisto/transfer.py
+"""
+File formats and checkpoints for PersistoClient.export_namespace /
+import_namespace.
+
+One record per memory:
+    {"content": str, "metadata": dict, "created_at": ISO-8601,
+     "expires_at": ISO-8601 | None, "embedding": [float, ...]  (optional)}
+
+    ndjson   one JSON record per line (".ndjson", ".jsonl"; add ".gz" to gzip)
+    parquet  columnar, one row group per page; metadata is a JSON string
+             column. Needs pyarrow: pip install "persisto[parquet]"
+
+Writers and readers hold one page of records at a time. A writer fills
+"<path>.part" and renames it over `path` only on success, so an interrupted
+export never leaves a truncated file that looks complete.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .serialization import JSONSerializer, default_serializer
+
+FORMATS = ("ndjson", "parquet")
+
+
+def infer_format(path: str, format: Optional[str] = None) -> str:
+    """`format` if given, else "parquet" for *.parquet / *.pq and "ndjson" otherwise."""
+    if format is not None:
+        if format not in FORMATS:
+            raise ValueError(f"format must be one of {FORMATS}")
+        return format
+    return "parquet" if path.endswith((".parquet", ".pq")) else "ndjson"
+
+
+def expires_in(record: Dict[str, Any], now: float) -> Optional[float]:
+    """Seconds until the record's expires_at (<= 0: already expired); None if it never expires."""
+    expires_at = record.get("expires_at")
+    if not expires_at:
+        return None
+    if isinstance(expires_at, (int, float)):
+        return float(expires_at) - now
+    ts = datetime.fromisoformat(str(expires_at).replace("Z", "+00:00"))
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp() - now
+
+
+# =========================
+# Writers
+# =========================
+
+class RecordWriter:
+    """Append pages of records to `<path>.part`; commit() renames it to `path`."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp_path = path + ".part"
+        self.count = 0
+
+    def write_many(self, records: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    def _close(self) -> None:
+        raise NotImplementedError
+
+    def commit(self) -> None:
+        self._close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self) -> None:
+        try:
+            self._close()
+        finally:
+            try:
+                os.remove(self.tmp_path)
+            except OSError:
+                pass
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+
+class NDJSONWriter(RecordWriter):
+    def __init__(self, path: str, serializer: Optional[JSONSerializer] = None):
+        super().__init__(path)
+        self.serializer = serializer or default_serializer()
+        self._fh = gzip.open(self.tmp_path, "wb", compresslevel=5) if path.endswith(".gz") else open(self.tmp_path, "wb")
+
+    def write_many(self, records: List[Dict[str, Any]]) -> None:
+        dumps = self.serializer.dumps
+        self._fh.write(b"".join(dumps(r) + b"\n" for r in records))
+        self.count += len(records)
+
+    def _close(self) -> None:
+        if not self._fh.closed:
+            self._fh.close()
+
+
+class ParquetWriter(RecordWriter):
+    def __init__(self, path: str, include_embeddings: bool = False):
+        super().__init__(path)
+        pa, pq = _pyarrow()
+        self._pa = pa
+        fields = [
+            pa.field("content", pa.string()),
+            pa.field("metadata", pa.string()),
+            pa.field("created_at", pa.string()),
+            pa.field("expires_at", pa.string()),
+        ]
+        if include_embeddings:
+            fields.append(pa.field("embedding", pa.list_(pa.float32())))
+        self._schema = pa.schema(fields)
+        self._writer = pq.ParquetWriter(self.tmp_path, self._schema, compression="zstd")
+
+    def write_many(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        columns: Dict[str, List[Any]] = {name: [] for name in self._schema.names}
+        for r in records:
+            columns["content"].append(r["content"])
+            columns["metadata"].append(json.dumps(r.get("metadata") or {}, ensure_ascii=False, separators=(",", ":")))
+            columns["created_at"].append(r.get("created_at"))
+            columns["expires_at"].append(r.get("expires_at"))
+            if "embedding" in columns:
+                columns["embedding"].append(r.get("embedding"))
+        self._writer.write_table(self._pa.table(columns, schema=self._schema))
+        self.count += len(records)
+
+    def _close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def open_writer(
+    path: str,
+    format: str,
+    *,
+    include_embeddings: bool = False,
+    serializer: Optional[JSONSerializer] = None,
+) -> RecordWriter:
+    if format == "parquet":
+        return ParquetWriter(path, include_embeddings)
+    return NDJSONWriter(path, serializer)
+
+
+# =========================
+# Readers
+# =========================
+
+def iter_records(
+    path: str,
+    format: str,
+    *,
+    start: int = 0,
+    batch_rows: int = 1000,
+    serializer: Optional[JSONSerializer] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Stream records from `path`, skipping the first `start` (a resume position)."""
+    if format == "parquet":
+        yield from _iter_parquet(path, start, batch_rows)
+        return
+    loads = (serializer or default_serializer()).loads
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as fh:
+        position = 0
+        for line in fh:
+            if not line.strip():
+                continue
+            position += 1
+            if position > start:  # skipped lines are never parsed
+                yield loads(line)
+
+
+def _iter_parquet(path: str, start: int, batch_rows: int) -> Iterator[Dict[str, Any]]:
+    _, pq = _pyarrow()
+    pf = pq.ParquetFile(path)
+    # Whole row groups before the resume position are skipped without reading them
+    groups: List[int] = []
+    skip = start
+    for i in range(pf.num_row_groups):
+        rows = pf.metadata.row_group(i).num_rows
+        if skip >= rows:
+            skip -= rows
+            continue
+        groups.append(i)
+    if not groups:
+        return
+    for batch in pf.iter_batches(batch_size=batch_rows, row_groups=groups):
+        for record in batch.to_pylist():
+            if skip:
+                skip -= 1
+                continue
+            record["metadata"] = json.loads(record["metadata"]) if record.get("metadata") else {}
+            if record.get("embedding") is None:
+                record.pop("embedding", None)
+            yield record
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError('The parquet format requires pyarrow: pip install "persisto[parquet]"') from None
+    return pyarrow, pyarrow.parquet
+
+
+# =========================
+# Checkpoints
+# =========================
+
+class ImportCheckpoint:
+    """
+    Resume position of an import: every record before `position` has been
+    sent (saved, skipped or reported as failed). Rewritten atomically as
+    batches complete and removed once the import finishes.
+    """
+
+    def __init__(self, path: str, source: str, namespace: str):
+        self.path = path
+        self.source = os.path.abspath(source)
+        self.namespace = namespace
+
+    def load(self) -> int:
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, "r", encoding="utf-8") as fh:
+            state = json.load(fh)
+        if state.get("source") != self.source or state.get("namespace") != self.namespace:
+            raise ValueError(
+                f"Checkpoint {self.path} belongs to {state.get('source')!r} -> {state.get('namespace')!r}, "
+                f"not {self.source!r} -> {self.namespace!r}"
+            )
+        return int(state.get("position") or 0)
+
+    def save(self, position: int, counts: Dict[str, Any]) -> None:
+        state = {"source": self.source, "namespace": self.namespace, "position": position, **counts}
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(state, fh)
+        os.replace(tmp, self.path)
+
+    def remove(self) -> None:
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def export_record(memory: Dict[str, Any], include_embeddings: bool) -> Dict[str, Any]:
+    """Normalise one /memory/export item into a file record."""
+    record: Dict[str, Any] = {
+        "content": memory["content"],
+        "metadata": memory.get("metadata") or {},
+        "created_at": memory.get("created_at"),
+        "expires_at": memory.get("expires_at"),
+    }
+    if include_embeddings and memory.get("embedding") is not None:
+        record["embedding"] = memory["embedding"]
+    return record
+
+
+def import_items(
+    records: Iterable[Dict[str, Any]],
+    now: float,
+    include_embeddings: bool,
+    expired: Any,
+) -> Iterator[Any]:
+    """Turn file records into save_many items; expired records become the `expired` sentinel."""
+    for record in records:
+        item: Dict[str, Any] = {"content": record.get("content"), "metadata": record.get("metadata") or {}}
+        remaining = expires_in(record, now)
+        if remaining is not None:
+            if remaining <= 0:
+                yield expired
+                continue
+            item["ttl_seconds"] = max(1, int(remaining))
+        if include_embeddings and record.get("embedding") is not None:
+            item["embedding"] = record["embedding"]
+        yield item
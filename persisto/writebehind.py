@@ -0,0 +1,333 @@
+# persisto/writebehind.py
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+from .errors import PersistoAuthError, PersistoError
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from .client import PersistoClient
+
+
+class PersistoBackpressureError(PersistoError):
+    """Write-behind log is full and did not drain within the caller's timeout."""
+
+
+class WriteBehindBuffer:
+    """
+    Asynchronous save mode for PersistoClient, backed by an on-disk log.
+
+    `append()` writes the save payload to `<path>/wal.jsonl` and returns at
+    once; a background thread sends queued saves in batches through the
+    client's bulk path (so `_request` retry rules apply). Progress is
+    checkpointed in `<path>/wal.ack`, and anything unacknowledged is replayed
+    when a buffer is opened on the same directory again: delivery is
+    at-least-once across crashes.
+
+    Items the server rejects outright are moved to `<path>/rejected.jsonl`
+    instead of being retried forever. A 401/403 stops the flusher instead:
+    the saves stay in the log, `error` holds the auth error, and the next
+    append() or flush() raises it until a buffer with valid credentials is
+    opened on the directory.
+
+    One buffer owns a directory at a time: `<path>/wal.lock` is locked
+    exclusively on open, and a second buffer on the same directory raises
+    PersistoError.
+
+    When the log reaches `max_log_bytes`, `append()` blocks until the flusher
+    frees space (or raises PersistoBackpressureError after `block_timeout`).
+
+    Usually built by the client:
+        c = Client(api_key="...", write_behind="/var/lib/myagent/persisto-wal")
+        c.save(namespace="support-bot", content="...")   # returns {"status": "queued", ...}
+        c.flush()                                        # wait for the server to have it
+        c.close()                                        # flush, stop the flusher
+    """
+
+    def __init__(
+        self,
+        client: "PersistoClient",
+        path: str,
+        *,
+        max_log_bytes: int = 64 * 1024 * 1024,
+        batch_size: int = 100,
+        flush_interval: float = 0.25,
+        block_timeout: Optional[float] = None,
+        fsync: bool = False,
+    ):
+        if max_log_bytes < 1024:
+            raise ValueError("max_log_bytes must be >= 1024")
+        self.client = client
+        self.path = path
+        self.max_log_bytes = int(max_log_bytes)
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self.block_timeout = block_timeout
+        self.fsync = fsync
+
+        self.sent = 0
+        self.rejected = 0
+        self.failures = 0  # flush attempts that hit a transient error
+        self.error: Optional[PersistoAuthError] = None  # set when delivery stopped on a 401/403
+
+        self._cond = threading.Condition()
+        self._pending: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._entry_bytes: Dict[int, int] = {}  # log line size per pending seq
+        self._pending_bytes = 0                 # live part of the log; the rest is reclaimable
+        self._done_above: Set[int] = set()  # acked seqs above the low-watermark
+        self._last_seq = 0
+        self._closing = False
+
+        os.makedirs(path, exist_ok=True)
+        self._lock_fh = _lock_directory(path)
+        self._log_path = os.path.join(path, "wal.jsonl")
+        self._ack_path = os.path.join(path, "wal.ack")
+        self._rejected_path = os.path.join(path, "rejected.jsonl")
+        self._replay()
+        self._log = open(self._log_path, "ab")
+        self._log_bytes = self._log.tell()
+
+        self._thread = threading.Thread(target=self._run, name="persisto-write-behind", daemon=True)
+        self._thread.start()
+
+    # ---------- Public API ----------
+
+    def append(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Durably queue one /memory/save payload."""
+        line_body = json.dumps(payload, separators=(",", ":"))
+        deadline = None if self.block_timeout is None else time.monotonic() + self.block_timeout
+        with self._cond:
+            if self._closing:
+                raise PersistoError("Write-behind buffer is closed")
+            self._raise_if_stopped()
+            while self._log_bytes >= self.max_log_bytes:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise PersistoBackpressureError(
+                        f"Write-behind log is full ({self._log_bytes} bytes, {len(self._pending)} unsent)"
+                    )
+                self._cond.wait(remaining)
+            self._last_seq += 1
+            seq = self._last_seq
+            line = f'{{"seq":{seq},"p":{line_body}}}\n'.encode("utf-8")
+            self._log.write(line)
+            self._log.flush()
+            if self.fsync:
+                os.fsync(self._log.fileno())
+            self._log_bytes += len(line)
+            self._pending[seq] = payload
+            self._entry_bytes[seq] = len(line)
+            self._pending_bytes += len(line)
+            self._cond.notify_all()
+        return {"status": "queued", "seq": seq}
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every queued save has been sent. Returns False on
+        timeout; raises PersistoAuthError if delivery stopped on a 401/403.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._pending:
+                self._raise_if_stopped()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining if remaining is not None else self.flush_interval)
+            return True
+
+    def close(self, timeout: Optional[float] = 30.0) -> bool:
+        """
+        Stop accepting saves, try to drain for up to `timeout` seconds, then
+        stop the flusher. Unsent saves stay in the log for the next start.
+        """
+        with self._cond:
+            if self._closing:
+                return not self._pending
+            stopped = self.error is not None
+        drained = not self._pending if stopped else self.flush(timeout)
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join(timeout=max(1.0, self.flush_interval * 4))
+        with self._cond:
+            self._log.close()
+            self._lock_fh.close()  # releases the directory lock
+        return drained
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "log_bytes": self._log_bytes,
+                "sent": self.sent,
+                "rejected": self.rejected,
+                "failures": self.failures,
+                "error": None if self.error is None else str(self.error),
+            }
+
+    # ---------- Flusher ----------
+
+    def _run(self) -> None:
+        backoff = 0.5
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait(self.flush_interval)
+                if self._closing:
+                    return
+                namespace, batch = self._next_batch()
+
+            try:
+                saved, errors = self.client._save_batch(namespace, batch)
+            except PersistoAuthError as e:
+                # Retrying cannot fix credentials: keep the saves in the log and stop
+                with self._cond:
+                    self.error = e
+                    self._cond.notify_all()
+                return
+            except Exception as e:  # e.g. network errors: keep everything queued and retry
+                status = getattr(e, "status", None)
+                errors = [{"index": seq, "error": str(e), "status": status, "retryable": True} for seq, _ in batch]
+                saved = 0
+            finally:
+                self.client._invalidate_cache(namespace)
+
+            retry = {e["index"] for e in errors if e.get("retryable")}
+            rejected = [e for e in errors if not e.get("retryable")]
+            with self._cond:
+                for seq, _ in batch:
+                    if seq not in retry and self._pending.pop(seq, None) is not None:
+                        self._pending_bytes -= self._entry_bytes.pop(seq)
+                        self._done_above.add(seq)
+                self.sent += saved
+                self.rejected += len(rejected)
+                self._record_rejections(rejected, dict(batch))
+                self._checkpoint()
+                self._cond.notify_all()
+
+                if retry:
+                    self.failures += 1
+                    self._cond.wait(backoff)
+                    backoff = min(backoff * 2, 8.0)
+                else:
+                    backoff = 0.5
+
+    def _next_batch(self) -> Tuple[str, List[Tuple[int, Dict[str, Any]]]]:
+        """Oldest pending saves sharing the head entry's namespace, in log order."""
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        namespace = None
+        for seq, payload in self._pending.items():
+            if namespace is None:
+                namespace = payload["namespace"]
+            elif payload["namespace"] != namespace:
+                break
+            batch.append((seq, payload))
+            if len(batch) >= self.batch_size:
+                break
+        return namespace, batch
+
+    def _raise_if_stopped(self) -> None:
+        if self.error is not None:
+            raise PersistoAuthError(
+                f"Write-behind delivery stopped: {self.error}", status=self.error.status, body=self.error.body
+            )
+
+    # ---------- Log maintenance (caller holds self._cond) ----------
+
+    def _checkpoint(self) -> None:
+        watermark = next(iter(self._pending)) - 1 if self._pending else self._last_seq
+        self._done_above = {seq for seq in self._done_above if seq > watermark}
+        tmp = self._ack_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"upto": watermark, "done": sorted(self._done_above)}, fh)
+        os.replace(tmp, self._ack_path)
+
+        if not self._pending:
+            # Everything acknowledged: start a fresh log
+            self._log.truncate(0)
+            self._log.seek(0)
+            self._log_bytes = 0
+        elif self._log_bytes >= self.max_log_bytes // 4 and self._pending_bytes * 2 <= self._log_bytes:
+            # At least half the log is delivered entries: rewriting costs only the live half
+            self._rewrite()
+
+    def _rewrite(self) -> None:
+        """Compact the log down to the still-pending entries."""
+        tmp = self._log_path + ".tmp"
+        with open(tmp, "wb") as fh:
+            for seq, payload in self._pending.items():
+                line = json.dumps({"seq": seq, "p": payload}, separators=(",", ":")).encode("utf-8") + b"\n"
+                fh.write(line)
+                self._entry_bytes[seq] = len(line)
+            fh.flush()
+            os.fsync(fh.fileno())
+        self._log.close()
+        os.replace(tmp, self._log_path)
+        self._log = open(self._log_path, "ab")
+        self._log_bytes = self._log.tell()
+        self._pending_bytes = self._log_bytes
+
+    def _record_rejections(self, rejected: List[Dict[str, Any]], payloads: Dict[int, Dict[str, Any]]) -> None:
+        if not rejected:
+            return
+        with open(self._rejected_path, "a", encoding="utf-8") as fh:
+            for err in rejected:
+                fh.write(json.dumps({"seq": err["index"], "error": err["error"], "p": payloads[err["index"]]}) + "\n")
+
+    def _replay(self) -> None:
+        upto, done = 0, set()
+        if os.path.exists(self._ack_path):
+            with open(self._ack_path, "r", encoding="utf-8") as fh:
+                ack = json.load(fh)
+            upto, done = int(ack.get("upto", 0)), set(ack.get("done", []))
+        self._last_seq = upto
+        if not os.path.exists(self._log_path):
+            return
+        good = 0
+        with open(self._log_path, "rb") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # torn final write from a crash
+                good += len(line)
+                seq = int(entry["seq"])
+                self._last_seq = max(self._last_seq, seq)
+                if seq > upto and seq not in done:
+                    self._pending[seq] = entry["p"]
+                    self._entry_bytes[seq] = len(line)
+                    self._pending_bytes += len(line)
+        if good < os.path.getsize(self._log_path):
+            # Drop the torn tail so new appends start on a clean line
+            with open(self._log_path, "r+b") as fh:
+                fh.truncate(good)
+        self._done_above = {seq for seq in done if seq > upto}
+
+
+def _lock_directory(path: str):
+    """Open and exclusively lock `<path>/wal.lock`; the lock lasts until the file is closed."""
+    fh = open(os.path.join(path, "wal.lock"), "a+b")
+    try:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:  # pragma: no cover - Windows
+            import msvcrt
+
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        fh.close()
+        raise PersistoError(f"Write-behind directory {path} is in use by another buffer") from None
+    return fh
@@ -0,0 +1,5 @@
+# conftest.py
+# test_sdk.py and test_profiles.py are scripts against a live backend
+# (PERSISTO_API_KEY in .env); run them directly. Everything else here runs
+# offline against benchmarks.server.StandInServer or the embedded engine.
+collect_ignore = ["test_sdk.py", "test_profiles.py"]
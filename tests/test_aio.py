@@ -0,0 +1,101 @@
+# test_aio.py
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from benchmarks.server import StandInServer
+from persisto import AsyncClient, HedgePolicy, PersistoDeadlineExceeded, PersistoError
+
+
+class _FailsFirst(StandInServer):
+    """The first `failures` requests answer 503."""
+
+    def __init__(self, failures: int, **config):
+        super().__init__(**config)
+        self.failures = failures
+        self.attempts = 0
+
+    def dispatch(self, method, path, body, query):
+        self.attempts += 1
+        if self.failures > 0:
+            self.failures -= 1
+            return 503, {"detail": "warming up"}, {}
+        return super().dispatch(method, path, body, query)
+
+
+class _FirstQueryStalls(StandInServer):
+    def __init__(self, stall: float, **config):
+        super().__init__(**config)
+        self.stall = stall
+        self.stalled = False
+
+    def dispatch(self, method, path, body, query):
+        if path == "/memory/query" and not self.stalled:
+            self.stalled = True
+            time.sleep(self.stall)
+        return super().dispatch(method, path, body, query)
+
+
+def _run(srv, fn, **options):
+    async def main():
+        async with AsyncClient(api_key="test", base_url=srv.url, **options) as c:
+            return await fn(c)
+    return asyncio.run(main())
+
+
+def test_server_errors_are_retried():
+    with _FailsFirst(2) as srv:
+        resp = _run(srv, lambda c: c.query(namespace="ns", query="q"), retries=2)
+        assert resp["results"]
+        assert srv.attempts == 3
+
+
+def test_retries_give_up_with_the_last_error():
+    with _FailsFirst(10) as srv:
+        with pytest.raises(PersistoError) as err:
+            _run(srv, lambda c: c.query(namespace="ns", query="q"), retries=1)
+        assert err.value.status == 503
+        assert srv.attempts == 2
+
+
+def test_hedge_answers_for_a_stalled_primary():
+    policy = HedgePolicy(initial_delay=0.05, max_extra_load=1.0)
+    with _FirstQueryStalls(stall=2.0) as srv:
+        t0 = time.perf_counter()
+        resp = _run(srv, lambda c: c.query(namespace="ns", query="q"), hedge=policy)
+        assert time.perf_counter() - t0 < 1.0
+        assert resp["results"]
+        assert policy.stats()["hedges_won"] == 1
+
+
+def test_deadline_bounds_the_call():
+    with StandInServer(latency=0.5) as srv:
+        t0 = time.perf_counter()
+        with pytest.raises(PersistoDeadlineExceeded):
+            _run(srv, lambda c: c.query(namespace="ns", query="q", deadline=0.1))
+        assert time.perf_counter() - t0 < 0.4
+
+
+def test_query_many_keeps_input_order():
+    specs = [{"namespace": "ns", "query": f"q{i}", "k": i % 5 + 1} for i in range(12)]
+    expected = [i % 5 + 1 for i in range(12)]
+    with StandInServer() as srv:
+        out = _run(srv, lambda c: c.query_many(specs, batch_size=5))
+        assert [len(resp["results"]) for resp in out] == expected
+        assert srv.counters["/memory/query_batch"] == 3
+    with StandInServer(batch_endpoints=False) as srv:
+        out = _run(srv, lambda c: c.query_many(specs, batch_size=5, max_workers=3))
+        assert [len(resp["results"]) for resp in out] == expected
+        assert srv.counters["/memory/query"] == 12
+
+
+@pytest.mark.parametrize("options", [
+    {"query_cache": object()}, {"coalesce": True}, {"dedup_index": "dedup.db"}, {"write_behind": "wb"},
+    {"base_url": "local://"},
+])
+def test_sync_only_options_are_rejected(options):
+    with pytest.raises(ValueError):
+        AsyncClient(api_key="test", **options)
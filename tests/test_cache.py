@@ -0,0 +1,65 @@
+# test_cache.py
+import threading
+
+from benchmarks.server import StandInServer
+from persisto import Client, QueryCache, SQLiteCacheBackend
+
+
+def test_query_cache_hit_and_invalidation():
+    with StandInServer() as srv, Client(api_key="test", base_url=srv.url, query_cache=QueryCache()) as c:
+        first = c.query(namespace="ns", query="q")
+        assert c.query(namespace="ns", query="q") is first
+        c.save(namespace="ns", content="new fact")
+        assert c.query(namespace="ns", query="q") is not first
+        stats = c.query_cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_invalidation_during_read_is_not_cached():
+    with StandInServer() as srv, Client(api_key="test", base_url=srv.url, query_cache=QueryCache()) as c:
+        read = c._read
+
+        def racing_read(*args, **kwargs):
+            resp = read(*args, **kwargs)
+            c._invalidate_cache("ns")  # a save() landing between the read and the cache write
+            return resp
+
+        c._read = racing_read
+        c.query(namespace="ns", query="q")
+        assert len(c.query_cache.backend) == 0
+
+
+def test_error_bodies_are_not_cached():
+    cache = QueryCache()
+    with StandInServer() as srv, Client(api_key="test", base_url=srv.url, query_cache=cache) as c:
+        c._read = lambda *args, **kwargs: {"error": "index warming up"}
+        c.query(namespace="ns", query="q")
+        assert len(cache.backend) == 0
+
+
+def test_stats_are_exact_under_threads():
+    cache = QueryCache()
+    cache.set("k", "ns", {"results": []})
+
+    def lookups():
+        for _ in range(2000):
+            cache.get("k")
+            cache.get("missing")
+
+    threads = [threading.Thread(target=lookups) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert (cache.hits, cache.misses) == (16000, 16000)
+
+
+def test_sqlite_backend_bounds_entries(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.db"), max_entries=50)
+    for i in range(200):
+        backend.set(f"k{i}", "ns", {"i": i}, 60)
+    assert len(backend) <= 50
+    assert backend.get("k199") == {"i": 199}
+    backend.invalidate("ns")
+    assert len(backend) == 0
+    backend.close()
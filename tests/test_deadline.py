@@ -0,0 +1,73 @@
+# test_deadline.py
+import socket
+import threading
+import time
+
+import pytest
+
+from benchmarks.server import StandInServer
+from persisto import Client, Deadline, PersistoDeadlineExceeded, PersistoError, deadline_scope
+
+
+@pytest.fixture
+def blackhole():
+    """A port whose accept queue is full: connects hang until they time out."""
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(0)
+    port = server.getsockname()[1]
+    fillers = []
+    for _ in range(3):
+        s = socket.socket()
+        s.setblocking(False)
+        try:
+            s.connect(("127.0.0.1", port))
+        except BlockingIOError:
+            pass
+        fillers.append(s)
+    time.sleep(0.1)
+    yield f"http://127.0.0.1:{port}"
+    for s in fillers + [server]:
+        s.close()
+
+
+def test_slow_server_hits_the_deadline_not_the_retries():
+    with StandInServer(latency=1.0) as srv, Client(api_key="test", base_url=srv.url, retries=5) as c:
+        t0 = time.perf_counter()
+        with pytest.raises(PersistoDeadlineExceeded):
+            c.query(namespace="ns", query="q", deadline=0.3)
+        assert time.perf_counter() - t0 < 0.8
+
+
+def test_retries_on_5xx_stop_at_the_deadline():
+    with StandInServer(error_rate=1.0) as srv, Client(api_key="test", base_url=srv.url, retries=10) as c:
+        t0 = time.perf_counter()
+        with pytest.raises(PersistoDeadlineExceeded):
+            c.query(namespace="ns", query="q", deadline=1.0)
+        assert time.perf_counter() - t0 < 1.3
+        assert 1 <= srv.counters["requests"] < 10
+
+
+def test_cancel_stops_a_call_in_backoff():
+    with StandInServer(error_rate=1.0) as srv, Client(api_key="test", base_url=srv.url, retries=10) as c:
+        turn = Deadline(30)
+        threading.Timer(0.2, turn.cancel).start()
+        t0 = time.perf_counter()
+        with deadline_scope(turn), pytest.raises(PersistoDeadlineExceeded, match="cancelled"):
+            c.query(namespace="ns", query="q")
+        assert time.perf_counter() - t0 < 1.0
+
+
+def test_connect_timeout_is_separate_from_read_timeout(blackhole):
+    with Client(api_key="test", base_url=blackhole, connect_timeout=0.2, timeout=5, retries=0) as c:
+        t0 = time.perf_counter()
+        with pytest.raises(PersistoError, match="connect timeout"):
+            c.query(namespace="ns", query="q")
+        assert time.perf_counter() - t0 < 1.0
+
+    with StandInServer(latency=1.0) as srv:
+        with Client(api_key="test", base_url=srv.url, connect_timeout=0.05, timeout=0.3, retries=0) as c:
+            t0 = time.perf_counter()
+            with pytest.raises(PersistoError, match="Read timed out"):
+                c.query(namespace="ns", query="q")
+            assert time.perf_counter() - t0 < 0.8
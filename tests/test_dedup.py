@@ -0,0 +1,66 @@
+# test_dedup.py
+from benchmarks.server import StandInServer
+from persisto import Client, DedupIndex
+
+
+class _RejectsContent(StandInServer):
+    """save_batch answers an item error for any content starting with "bad"."""
+
+    def _save_batch(self, body, query):
+        items = body.get("items") or []
+        good = [item for item in items if not item["content"].startswith("bad")]
+        self._store(body["namespace"], good)
+        results = [{"error": "rejected"} if item["content"].startswith("bad") else {"status": "ok"} for item in items]
+        return 200, {"results": results}, {}
+
+
+def test_repeated_save_is_skipped_without_a_request():
+    with StandInServer() as srv, Client(api_key="test", base_url=srv.url, dedup_index=":memory:") as c:
+        assert c.save(namespace="ns", content="fact")["status"] == "ok"
+        assert c.save(namespace="ns", content="fact")["status"] == "duplicate"
+        assert srv.counters["/memory/save"] == 1
+        report = c.save_many(namespace="ns", items=["fact", "other", "other"])
+        assert (report["saved"], report["skipped"]) == (1, 2)
+
+
+def test_write_behind_records_only_delivered_saves(tmp_path):
+    with _RejectsContent() as srv:
+        with Client(api_key="test", base_url=srv.url, dedup_index=":memory:", write_behind=str(tmp_path)) as c:
+            assert c.save(namespace="ns", content="good fact")["status"] == "queued"
+            assert c.save(namespace="ns", content="bad fact")["status"] == "queued"
+            assert c.flush(timeout=10)
+            assert c.write_behind.stats()["rejected"] == 1
+            assert c.save(namespace="ns", content="good fact")["status"] == "duplicate"
+            # Rejected, so never recorded: a corrected retry is not swallowed as a duplicate
+            assert c.save(namespace="ns", content="bad fact")["status"] == "queued"
+
+
+def test_delete_forgets_saved_content():
+    with StandInServer() as srv, Client(api_key="test", base_url=srv.url, dedup_index=":memory:") as c:
+        c.save(namespace="ns", content="fact")
+        c.delete(namespace="ns", content="fact")
+        assert c.save(namespace="ns", content="fact")["status"] == "ok"
+        assert srv.counters["/memory/save"] == 2
+
+
+def test_ttl_is_part_of_the_key():
+    with StandInServer() as srv, Client(api_key="test", base_url=srv.url, dedup_index=":memory:") as c:
+        assert c.save(namespace="ns", content="fact", ttl_seconds=60)["status"] == "ok"
+        assert c.save(namespace="ns", content="fact", ttl_seconds=60)["status"] == "duplicate"
+        assert c.save(namespace="ns", content="fact", ttl_seconds=3600)["status"] == "ok"
+        assert c.save(namespace="ns", content="fact")["status"] == "ok"
+        assert srv.counters["/memory/save"] == 3
+
+
+def test_entry_count_grows_only_for_new_keys():
+    index = DedupIndex()
+    index.add_many([("k1", "ns", "a", None), ("k2", "ns", "b", None)])
+    index.add_many([("k1", "ns", "a", 60), ("k3", "ns", "c", None)])
+    assert index.stats()["entries"] == len(index) == 3
+
+
+def test_save_many_does_not_resend_keys_already_in_the_index():
+    with StandInServer() as srv, Client(api_key="test", base_url=srv.url, dedup_index=":memory:") as c:
+        c.save_many(namespace="ns", items=[f"fact {i}" for i in range(10)], batch_size=4, max_workers=1)
+        report = c.save_many(namespace="ns", items=[f"fact {i % 10}" for i in range(30)], batch_size=4)
+        assert (report["saved"], report["skipped"]) == (0, 30)
@@ -0,0 +1,125 @@
+# test_hedging.py
+import threading
+import time
+
+from benchmarks.server import StandInServer
+from persisto import Client, HedgePolicy, RequestHook
+
+
+class _FirstQueryStalls(StandInServer):
+    """The first /memory/query (for `text`, if given) hangs for `stall` seconds; later requests do not."""
+
+    def __init__(self, stall: float, text=None, **config):
+        super().__init__(**config)
+        self.stall = stall
+        self.text = text
+        self._stalled = threading.Event()
+        self.arrivals = []
+
+    def dispatch(self, method, path, body, query):
+        self.arrivals.append(path)
+        wanted = self.text is None or body.get("query") == self.text
+        if path == "/memory/query" and wanted and not self._stalled.is_set():
+            self._stalled.set()
+            time.sleep(self.stall)
+        return super().dispatch(method, path, body, query)
+
+
+class _AttemptThreads(RequestHook):
+    def __init__(self):
+        self.names = []
+
+    def on_attempt(self, info):
+        self.names.append(threading.current_thread().name)
+
+
+def test_hedge_answers_for_a_stalled_primary():
+    hook = _AttemptThreads()
+    policy = HedgePolicy(initial_delay=0.05, max_extra_load=1.0)
+    with _FirstQueryStalls(stall=3.0) as srv:
+        with Client(api_key="test", base_url=srv.url, hedge=policy, hooks=[hook]) as c:
+            t0 = time.perf_counter()
+            assert c.query(namespace="ns", query="q")["results"]
+            elapsed = time.perf_counter() - t0
+            assert elapsed < 1.0  # the stalled primary was cut, not waited for
+            stats = policy.stats()
+            assert (stats["requests"], stats["hedges_sent"], stats["hedges_won"]) == (1, 1, 1)
+            # The primary ran on the calling thread, only the hedge on the pool
+            assert hook.names[0] == threading.current_thread().name
+            assert hook.names[1].startswith("persisto-hedge")
+            # The aborted primary was not retried
+            time.sleep(0.2)
+            assert srv.arrivals == ["/memory/query", "/memory/query"]
+
+
+def test_fast_reads_send_no_hedges():
+    policy = HedgePolicy(initial_delay=0.5)
+    with StandInServer() as srv:
+        with Client(api_key="test", base_url=srv.url, hedge=policy) as c:
+            for i in range(20):
+                c.query(namespace="ns", query=f"q{i}")
+            assert policy.stats()["hedges_sent"] == 0
+            assert srv.counters["requests"] == 20
+
+
+def test_concurrent_callers_do_not_queue_behind_the_hedge_pool():
+    policy = HedgePolicy(max_extra_load=0.0)
+    with StandInServer(latency=0.2) as srv:
+        # Two hedge workers; sixteen callers must still overlap
+        with Client(api_key="test", base_url=srv.url, hedge=policy, pool_size=1) as c:
+            threads = [threading.Thread(target=c.query, kwargs={"namespace": "ns", "query": "q"}) for _ in range(16)]
+            t0 = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            assert time.perf_counter() - t0 < 1.0
+            assert policy.stats()["requests"] == 16
+
+
+def test_hedge_fires_on_time_under_steady_concurrent_reads():
+    # 30 callers keep reads answering inside the delay in flight; they must not tie up
+    # the two hedge workers, or the one read that stalls is hedged late or never
+    policy = HedgePolicy(initial_delay=0.1, min_samples=10**6, max_extra_load=1.0)
+    with _FirstQueryStalls(stall=3.0, text="stalled", latency=0.04) as srv:
+        with Client(api_key="test", base_url=srv.url, hedge=policy, pool_size=1) as c:
+            executor = c._hedge_scheduler().executor
+            submitted, submit = [], executor.submit
+            executor.submit = lambda fn: submitted.append(1) or submit(fn)
+            stop = threading.Event()
+
+            def steady(i):
+                while not stop.is_set():
+                    c.query(namespace="ns", query=f"q{i}")
+
+            others = [threading.Thread(target=steady, args=(i,)) for i in range(30)]
+            for t in others:
+                t.start()
+            time.sleep(0.3)
+            t0 = time.perf_counter()
+            c.query(namespace="ns", query="stalled")
+            elapsed = time.perf_counter() - t0
+            stop.set()
+            for t in others:
+                t.join()
+            assert elapsed < 0.6
+            stats = policy.stats()
+            assert stats["requests"] > 100
+            assert len(submitted) < stats["requests"] / 2  # reads answered inside the delay never reach a worker
+
+
+def test_hedge_scheduler_is_created_once():
+    with Client(api_key="test", base_url="http://127.0.0.1:9", hedge=True) as c:
+        barrier = threading.Barrier(8)
+        pools = []
+
+        def first_call():
+            barrier.wait()
+            pools.append(c._hedge_scheduler())
+
+        threads = [threading.Thread(target=first_call) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len({id(p) for p in pools}) == 1
@@ -0,0 +1,105 @@
+# test_history.py
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmarks.server import StandInServer
+from persisto import Client
+from persisto.history import QueryHistoryStats, TopK, date_windows
+
+
+class _History(StandInServer):
+    """/queries/list over a fixed history, with date bounds and limit/cursor paging."""
+
+    def __init__(self, records, **config):
+        super().__init__(**config)
+        self.records = records
+        self.asked = []
+
+    def _list_queries(self, body, query):
+        args = {key: values[0] if isinstance(values, list) else values for key, values in query.items()}
+        self.asked.append(args)
+        rows = [
+            r for r in self.records
+            if r["created_at"] >= args.get("start_date", "")
+            and r["created_at"][:len(args.get("end_date", ""))] <= args.get("end_date", "~")
+        ]
+        start = int(args.get("cursor", 0))
+        end = start + int(args.get("limit", len(rows)))
+        resp = {"queries": rows[start:end]}
+        if end < len(rows):
+            resp["next_cursor"] = str(end)
+        return 200, resp, {}
+
+
+def _records(days=10, per_day=7):
+    first = datetime(2024, 1, 1, 9, 30)
+    return [
+        {"namespace": f"ns{i % 2}", "query": f"Query {i % 3}", "created_at": (first + timedelta(days=d)).isoformat()}
+        for d in range(days) for i in range(per_day)
+    ]
+
+
+def test_plain_dates_give_plain_date_windows():
+    assert list(date_windows("2024-01-01", "2024-01-10", 3)) == [
+        ("2024-01-01", "2024-01-03"), ("2024-01-04", "2024-01-06"),
+        ("2024-01-07", "2024-01-09"), ("2024-01-10", "2024-01-10"),
+    ]
+    assert list(date_windows("2024-02-28", "2024-03-01", 7)) == [("2024-02-28", "2024-03-01")]
+
+
+def test_datetime_windows_tile_the_range():
+    windows = list(date_windows("2024-01-01T12:00:00", "2024-01-03", 1))
+    assert windows[0][0] == "2024-01-01T12:00:00"
+    assert windows[-1][1] == "2024-01-03T23:59:59.999999"
+    for (_, hi), (lo, _) in zip(windows, windows[1:]):
+        assert datetime.fromisoformat(lo) - datetime.fromisoformat(hi) == timedelta(microseconds=1)
+    with pytest.raises(ValueError):
+        list(date_windows("2024-01-01", "2024-01-03", 0))
+
+
+def test_iter_queries_follows_cursors():
+    records = _records()
+    with _History(records) as srv, Client(api_key="test", base_url=srv.url) as c:
+        assert list(c.iter_queries(page_size=8)) == records
+        assert len(srv.asked) == 9 and all(args["limit"] == "8" for args in srv.asked)
+
+
+def test_iter_queries_splits_date_windows():
+    records = _records()
+    with _History(records) as srv, Client(api_key="test", base_url=srv.url) as c:
+        got = list(c.iter_queries(start_date="2024-01-02", end_date="2024-01-08", window_days=3, page_size=10))
+        assert got == [r for r in records if "2024-01-02" <= r["created_at"][:10] <= "2024-01-08"]
+        windows = [(args["start_date"], args["end_date"]) for args in srv.asked if "cursor" not in args]
+        assert windows == [("2024-01-02", "2024-01-04"), ("2024-01-05", "2024-01-07"), ("2024-01-08", "2024-01-08")]
+        with pytest.raises(ValueError):
+            list(c.iter_queries(start_date="2024-01-02", window_days=3))
+
+
+def test_summary_counts_namespaces_days_and_queries():
+    stats = QueryHistoryStats().update(_records(days=3, per_day=6))
+    summary = stats.summary(top_n=2)
+    assert summary["total"] == 18
+    assert summary["by_namespace"] == {"ns0": 9, "ns1": 9}
+    assert summary["by_day"] == {"2024-01-01": 6, "2024-01-02": 6, "2024-01-03": 6}
+    assert summary["top_queries"] == [{"query": "query 0", "count": 6}, {"query": "query 1", "count": 6}]
+
+
+def test_top_k_stays_within_the_space_saving_bound():
+    rng = random.Random(7)
+    stream = [f"q{min(int(rng.paretovariate(1.2)), 500)}" for _ in range(20000)]
+    truth = Counter(stream)
+    top = TopK(capacity=50)
+    for key in stream:
+        top.add(key)
+    tracked = dict(top.most_common(50))
+    assert len(tracked) == 50
+    floor = min(tracked.values())
+    assert floor <= len(stream) / 50
+    for key, estimate in tracked.items():
+        assert truth[key] <= estimate <= truth[key] + floor
+    # every key above N/capacity is guaranteed to be tracked
+    assert {key for key, n in truth.items() if n > len(stream) / 50} <= set(tracked)
+    assert [key for key, _ in top.most_common(3)] == [key for key, _ in truth.most_common(3)]
@@ -0,0 +1,58 @@
+# test_imports.py
+import json
+import subprocess
+import sys
+from importlib import import_module
+
+import pytest
+
+import persisto
+from benchmarks.server import StandInServer
+
+_HEAVY = ("requests", "urllib3", "numpy", "aiohttp", "orjson")
+
+
+def _loaded_after(code):
+    script = f"import json, sys\n{code}\nprint(json.dumps(sorted(m for m in {_HEAVY!r} if m in sys.modules)))"
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def test_import_loads_no_heavy_dependency():
+    assert _loaded_after("import persisto") == []
+    assert _loaded_after("from persisto import PersistoError, HedgePolicy, Deadline") == []
+
+
+def test_client_does_not_load_numpy_or_aiohttp():
+    loaded = _loaded_after("import persisto; persisto.Client")
+    assert "requests" in loaded and not {"numpy", "aiohttp"} & set(loaded)
+
+
+@pytest.mark.parametrize("name", sorted(persisto._LAZY))
+def test_lazy_names_resolve_to_their_target(name):
+    module, attr = persisto._LAZY[name]
+    assert getattr(persisto, name) is getattr(import_module(module, "persisto"), attr)
+    assert name in vars(persisto)  # cached: later lookups skip __getattr__
+
+
+def test_unknown_names_and_dir():
+    with pytest.raises(AttributeError):
+        persisto.NoSuchThing
+    assert dir(persisto) == sorted(persisto.__all__)
+    assert {"Client", "AsyncClient", "PersistoError"} <= set(persisto.__all__)
+
+
+def test_warmup_opens_connections_without_a_request():
+    with StandInServer() as srv, persisto.Client(api_key="test", base_url=srv.url) as c:
+        assert c.warmup(connections=2) == 2
+        assert c.pool_stats()["connections_opened"] == 2
+        assert "requests" not in srv.counters
+        c.query(namespace="ns", query="q")
+        assert c.pool_stats()["connections_opened"] == 2
+
+
+def test_warmup_never_raises():
+    with persisto.Client(api_key="test", base_url="http://127.0.0.1:9") as c:
+        assert c.warmup(connections=2, timeout=0.5) == 0
+    with persisto.Client(api_key="local", base_url="local://") as c:
+        assert c.warmup() == 0
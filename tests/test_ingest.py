@@ -0,0 +1,101 @@
+# test_ingest.py
+import json
+import os
+
+import pytest
+
+from benchmarks.server import StandInServer
+from persisto.cli import main
+from persisto.ingest import iter_chunks
+
+
+class _AuthExpires(StandInServer):
+    """save_batch answers 401 once `allowed` batches have been accepted."""
+
+    def __init__(self, allowed: int, **config):
+        super().__init__(**config)
+        self.allowed = allowed
+
+    def _save_batch(self, body, query):
+        if self.allowed <= 0:
+            return 401, {"detail": "invalid API key"}, {}
+        self.allowed -= 1
+        return super()._save_batch(body, query)
+
+
+def _run(argv):
+    with pytest.raises(SystemExit) as exit_info:
+        main(argv)
+    return exit_info.value.code
+
+
+def _write_docs(root, files=3, paragraphs=40):
+    os.makedirs(root)
+    for f in range(files):
+        with open(os.path.join(root, f"doc{f}.md"), "w", encoding="utf-8") as fh:
+            fh.write("\n\n".join(f"Paragraph {p} of file {f} says something worth keeping." for p in range(paragraphs)))
+
+
+def test_chunks_carry_offsets_and_overlap():
+    text = " ".join(f"word{i}" for i in range(2000))
+    blocks = [text[i:i + 997] for i in range(0, len(text), 997)]  # chunks straddle block edges
+    chunks = list(iter_chunks(blocks, chunk_chars=300, overlap=50))
+    assert len(chunks) > 1
+    for offset, chunk in chunks:
+        assert len(chunk) <= 300
+        assert text[offset:offset + len(chunk)] == chunk
+    for (prev_offset, prev), (offset, _) in zip(chunks, chunks[1:]):
+        prev_end = prev_offset + len(prev)
+        assert prev_offset < offset < prev_end  # neighbours overlap, and always move forward
+        assert prev_end - offset <= 50
+    assert chunks[-1][1].endswith("word1999")
+
+
+def test_chunking_rejects_bad_sizes():
+    with pytest.raises(ValueError):
+        list(iter_chunks(["text"], chunk_chars=100, overlap=100))
+
+
+def test_ingest_uploads_every_chunk(tmp_path, capsys):
+    docs = str(tmp_path / "docs")
+    _write_docs(docs)
+    with StandInServer() as srv:
+        code = _run(["ingest", "-n", "kb", docs, "--api-key", "k", "--base-url", srv.url,
+                     "--chunk-chars", "500", "--overlap", "50", "--meta", "team=docs", "--json", "-q"])
+        report = json.loads(capsys.readouterr().out)
+        assert code == 0
+        assert report["files"] == 3 and report["saved"] == report["chunks"] > 3
+        stored = [item for items in srv._records.values() for item in items]
+        assert len(stored) == report["chunks"]
+        assert {item["metadata"]["team"] for item in stored} == {"docs"}
+        assert {item["metadata"]["source"] for item in stored} == {"doc0.md", "doc1.md", "doc2.md"}
+
+
+def test_interrupted_ingest_resumes_from_checkpoint(tmp_path, capsys):
+    docs = str(tmp_path / "docs")
+    ckpt = str(tmp_path / "ingest.ckpt")
+    _write_docs(docs)
+    argv = ["ingest", "-n", "kb", docs, "--api-key", "k", "--chunk-chars", "300", "--overlap", "0",
+            "--batch-size", "5", "--workers", "1", "--checkpoint", ckpt, "--json", "-q"]
+
+    with _AuthExpires(allowed=2) as srv:
+        assert _run(argv + ["--base-url", srv.url]) == 1
+        assert capsys.readouterr().err.startswith("persisto: ")
+        with open(ckpt, encoding="utf-8") as fh:
+            assert json.load(fh)["position"] == 10
+
+        srv.allowed = 1000
+        assert _run(argv + ["--base-url", srv.url]) == 0
+        report = json.loads(capsys.readouterr().out)
+        assert report["resumed_from"] == 10 and report["failed"] == 0
+        assert not os.path.exists(ckpt)
+        assert sum(len(items) for items in srv._records.values()) == 10 + report["saved"]
+
+
+def test_auth_failure_is_a_one_line_error(tmp_path, capsys):
+    docs = str(tmp_path / "docs")
+    _write_docs(docs, files=1)
+    with _AuthExpires(allowed=0) as srv:
+        assert _run(["ingest", "-n", "kb", docs, "--api-key", "bad", "--base-url", srv.url, "-q"]) == 1
+    err = capsys.readouterr().err
+    assert err.startswith("persisto: ") and "Traceback" not in err
@@ -0,0 +1,147 @@
+# test_instrumentation.py
+import statistics
+
+import pytest
+
+from benchmarks.server import StandInServer
+from persisto import Client, LatencyHistogram, PersistoNotFoundError, RequestHook, TracingHook
+from persisto.instrumentation import HookSet, RequestInfo
+
+
+class _Recorder(RequestHook):
+    def __init__(self, name, log):
+        self.name = name
+        self.log = log
+
+    def on_request_start(self, info):
+        self.log.append((self.name, "start"))
+
+    def on_attempt(self, info):
+        self.log.append((self.name, f"attempt {info.attempt}"))
+
+    def on_retry(self, info, reason, delay):
+        self.log.append((self.name, f"retry {reason}"))
+
+    def on_response(self, info):
+        self.log.append((self.name, f"response {info.status}"))
+
+    def on_error(self, info, error):
+        self.log.append((self.name, f"error {type(error).__name__}"))
+
+
+class _Broken(RequestHook):
+    def on_request_start(self, info):
+        raise RuntimeError("hook bug")
+
+    def on_response(self, info):
+        raise KeyError("hook bug")
+
+
+class _FailsFirst(StandInServer):
+    def __init__(self, **config):
+        super().__init__(**config)
+        self.failed = False
+
+    def _query(self, body, query):
+        if not self.failed:
+            self.failed = True
+            return 503, {"detail": "warming up"}, {}
+        return super()._query(body, query)
+
+
+class _Span:
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = dict(attributes)
+        self.events = []
+        self.ended = False
+        self.exceptions = []
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def add_event(self, name, attributes):
+        self.events.append((name, attributes))
+
+    def record_exception(self, error):
+        self.exceptions.append(error)
+
+    def end(self):
+        self.ended = True
+
+
+class _Tracer:
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name, attributes):
+        span = _Span(name, attributes)
+        self.spans.append(span)
+        return span
+
+
+def test_hooks_run_in_registration_order_and_events_in_lifecycle_order():
+    log = []
+    with _FailsFirst() as srv:
+        hooks = [_Recorder("a", log), _Broken(), _Recorder("b", log)]
+        with Client(api_key="test", base_url=srv.url, hooks=hooks) as c:
+            c.query(namespace="ns", query="q")
+    events = ["start", "attempt 0", "retry server_error", "attempt 1", "response 200"]
+    assert log == [(name, event) for event in events for name in ("a", "b")]
+
+
+def test_broken_hooks_do_not_break_calls_or_other_hooks():
+    log = []
+    hooks = HookSet([_Broken(), _Recorder("ok", log)])
+    info = RequestInfo("post", "/memory/query", {"namespace": "ns"})
+    hooks.emit("on_request_start", info)
+    hooks.emit("on_response", info)
+    assert log == [("ok", "start"), ("ok", "response None")]
+    assert info.endpoint == "POST /memory/query" and info.namespace == "ns"
+
+
+def _info(seconds, namespace="ns", retries=0):
+    info = RequestInfo("POST", "/memory/query", {"namespace": namespace})
+    info.duration = seconds
+    info.retries = retries
+    return info
+
+
+def test_histogram_percentiles_match_known_samples():
+    hist = LatencyHistogram()
+    samples = [i / 1000.0 for i in range(1, 1001)]  # 1 ms .. 1 s, uniform
+    for s in samples:
+        hist.on_response(_info(s))
+    quantiles = statistics.quantiles(samples, n=100)
+    for q in (50, 95, 99):
+        assert hist.percentile("POST /memory/query", q, "ns") == pytest.approx(quantiles[q - 1], rel=0.02)
+    assert 0.98 <= hist.percentile("POST /memory/query", 100, "ns") <= 1.0  # never above the true max
+    assert hist.percentile("POST /memory/query", 50, "other") == 0.0
+
+
+def test_histogram_summary_per_endpoint_and_namespace():
+    hist = LatencyHistogram()
+    hist.on_response(_info(0.010, "a"))
+    hist.on_response(_info(0.030, "a", retries=2))
+    hist.on_error(_info(0.500, "b"), RuntimeError("boom"))
+    rows = {row["namespace"]: row for row in hist.summary()}
+    assert (rows["a"]["count"], rows["a"]["errors"], rows["a"]["retries"]) == (2, 0, 2)
+    assert rows["a"]["mean"] == pytest.approx(0.020) and rows["a"]["max"] == 0.030
+    assert (rows["b"]["count"], rows["b"]["errors"]) == (1, 1)
+    hist.reset()
+    assert hist.summary() == []
+
+
+def test_tracing_hook_makes_one_span_per_call():
+    tracer = _Tracer()
+    with _FailsFirst() as srv, Client(api_key="test", base_url=srv.url, hooks=[TracingHook(tracer)]) as c:
+        c.query(namespace="ns", query="q")
+        with pytest.raises(PersistoNotFoundError):
+            c._request("GET", "/no/such/route")
+    ok, failed = tracer.spans
+    assert ok.name == "persisto POST /memory/query" and ok.attributes["persisto.namespace"] == "ns"
+    assert ok.attributes["http.response.status_code"] == 200 and ok.attributes["persisto.retries"] == 1
+    assert [name for name, _ in ok.events] == ["retry"] and ok.events[0][1]["reason"] == "server_error"
+    assert "persisto.server_ms" in ok.attributes and ok.ended
+    assert failed.attributes["http.response.status_code"] == 404 and failed.ended
+    assert isinstance(failed.exceptions[0], PersistoNotFoundError)
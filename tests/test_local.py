@@ -0,0 +1,86 @@
+# test_local.py
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from persisto import Client, PersistoError, PersistoNotFoundError  # noqa: E402
+
+
+def test_save_query_delete(tmp_path):
+    with Client(api_key="local", base_url=f"local://{tmp_path}") as c:
+        c.save(namespace="prefs", content="The user prefers dark mode", metadata={"topic": "ui"})
+        c.save(namespace="prefs", content="Quarterly revenue grew 24%", metadata={"topic": "finance"})
+        hits = c.query(namespace="prefs", query="dark mode preference")["results"]
+        assert hits[0]["content"] == "The user prefers dark mode"
+        finance = c.query(namespace="prefs", query="x", filters={"topic": "finance"})["results"]
+        assert [h["metadata"]["topic"] for h in finance] == ["finance"]
+        assert c.delete(namespace="prefs", metadata={"topic": "ui"})["deleted"] == 1
+        assert all(h["metadata"]["topic"] != "ui" for h in c.query(namespace="prefs", query="dark mode")["results"])
+
+
+def test_data_survives_reopen(tmp_path):
+    with Client(api_key="local", base_url=f"local://{tmp_path}") as c:
+        c.save_many(namespace="docs", items=[f"fact number {i}" for i in range(50)])
+    with Client(api_key="local", base_url=f"local://{tmp_path}") as c:
+        assert c.list_namespaces() == ["docs"]
+        assert c.query(namespace="docs", query="fact number 7", k=1)["results"][0]["content"] == "fact number 7"
+
+
+def test_unknown_namespace_raises_not_found():
+    with Client(api_key="local", base_url="local://") as c:
+        with pytest.raises(PersistoNotFoundError):
+            c.query(namespace="missing", query="anything")
+
+
+def test_ttl_expired_memories_are_hidden(tmp_path, monkeypatch):
+    with Client(api_key="local", base_url=f"local://{tmp_path}") as c:
+        c.save(namespace="ns", content="short lived", ttl_seconds=5)
+        c.save(namespace="ns", content="long lived")
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now + 10)
+        assert [h["content"] for h in c.query(namespace="ns", query="lived")["results"]] == ["long lived"]
+
+
+def test_bad_request_bodies_are_a_422():
+    with Client(api_key="local", base_url="local://") as c:
+        engine = c._engine
+        for route, body in [
+            ("/memory/save", {"namespace": "ns", "content": "x", "tags": ["a"]}),
+            ("/memory/save", {"namespace": "ns"}),
+            ("/memory/save_batch", {"namespace": "ns", "items": [{"content": "x", "ttl": 5}]}),
+            ("/memory/query_batch", {"queries": [{"namespace": "ns"}]}),
+        ]:
+            with pytest.raises(PersistoError) as err:
+                engine.handle("POST", route, json=body)
+            assert err.value.status == 422
+
+
+def test_queries_on_unknown_namespaces_are_not_logged():
+    with Client(api_key="local", base_url="local://") as c:
+        c.save(namespace="ns", content="fact")
+        c.query(namespace="ns", query="fact")
+        with pytest.raises(PersistoNotFoundError):
+            c.query(namespace="missing", query="anything")
+        assert [q["namespace"] for q in c.list_queries()] == ["ns"]
+
+
+def test_namespaces_with_only_expired_memories_are_not_listed(monkeypatch):
+    with Client(api_key="local", base_url="local://") as c:
+        c.save(namespace="brief", content="short lived", ttl_seconds=5)
+        c.save(namespace="kept", content="long lived")
+        assert c.list_namespaces() == ["brief", "kept"]
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now + 10)
+        assert c.list_namespaces() == ["kept"]
+
+
+def test_hits_do_not_share_stored_metadata():
+    with Client(api_key="local", base_url="local://") as c:
+        metadata = {"topic": "ui"}
+        c.save(namespace="ns", content="dark mode", metadata=metadata)
+        metadata["topic"] = "changed by the caller"
+        hit = c.query(namespace="ns", query="dark mode")["results"][0]
+        hit["metadata"]["topic"] = "changed by a reader"
+        assert c.query(namespace="ns", query="x", filters={"topic": "ui"})["results"][0]["metadata"] == {"topic": "ui"}
@@ -0,0 +1,131 @@
+# test_pool.py
+import os
+import threading
+import time
+
+import pytest
+import requests
+
+from benchmarks.server import StandInServer
+from persisto.pool import ConnectionPool
+
+
+def _pool(**options):
+    return ConnectionPool({"Authorization": "Bearer test"}, **options)
+
+
+def _on_thread(fn):
+    out = []
+    t = threading.Thread(target=lambda: out.append(fn()))
+    t.start()
+    t.join()
+    return out[0]
+
+
+def test_each_thread_gets_its_own_session_over_one_adapter():
+    pool = _pool()
+    mine = pool.session()
+    theirs = _on_thread(pool.session)
+    assert pool.session() is mine and theirs is not mine
+    assert mine.get_adapter("http://x") is theirs.get_adapter("http://x")
+    assert mine.headers["Authorization"] == "Bearer test"
+    pool.close()
+    assert pool.session() is not mine  # close() retires every thread's session
+
+
+def test_threads_reuse_each_others_connections():
+    with StandInServer() as srv:
+        pool = _pool()
+        for _ in range(5):
+            _on_thread(lambda: pool.session().get(f"{srv.url}/memory/namespaces").status_code)
+        stats = pool.stats()
+        assert (stats["requests"], stats["connections_opened"]) == (5, 1)
+
+
+def test_fork_drops_inherited_connections(monkeypatch):
+    with StandInServer() as srv:
+        pool = _pool()
+        parent_session = pool.session()
+        parent_session.get(f"{srv.url}/memory/namespaces")
+        parent_adapter = pool._adapter
+
+        child_pid = pool._pid + 1
+        monkeypatch.setattr(os, "getpid", lambda: child_pid)  # as seen from a forked child
+        child_session = pool.session()
+        assert child_session is not parent_session and pool.forks == 1
+        assert pool._adapter is not parent_adapter
+        assert parent_adapter in pool._orphaned  # referenced, never closed from the child
+        assert pool.stats()["requests"] == 0
+
+        child_session.get(f"{srv.url}/memory/namespaces")
+        assert pool.stats()["connections_opened"] == 1  # a fresh socket, not the parent's
+        assert pool.session() is child_session and pool.forks == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_forked_child_makes_its_own_connections():
+    with StandInServer() as srv:
+        pool = _pool()
+        pool.session().get(f"{srv.url}/memory/namespaces")
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # child: report and leave without running the parent's cleanup
+            try:
+                ok = pool.session().get(f"{srv.url}/memory/namespaces").status_code == 200
+                os.write(write_fd, f"{int(ok)} {pool.forks} {pool.stats()['connections_opened']}".encode())
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        os.waitpid(pid, 0)
+        with os.fdopen(read_fd) as fh:
+            assert fh.read() == "1 1 1"
+        # The parent's pooled connection still works after the child exited
+        assert pool.session().get(f"{srv.url}/memory/namespaces").status_code == 200
+        assert pool.stats()["connections_opened"] == 1
+
+
+def test_abort_cuts_another_threads_request():
+    with StandInServer(latency=3.0) as srv:
+        pool = _pool()
+        errors = []
+
+        def slow():
+            try:
+                pool.session().get(f"{srv.url}/memory/namespaces", timeout=10)
+            except requests.RequestException as e:
+                errors.append(e)
+
+        t = threading.Thread(target=slow)
+        t0 = time.perf_counter()
+        t.start()
+        while not pool.abort(t.ident):
+            time.sleep(0.01)
+        t.join()
+        assert time.perf_counter() - t0 < 1.5 and errors
+        assert pool.abort(threading.get_ident()) is False  # nothing of ours in flight
+
+
+def test_finished_requests_leave_nothing_tracked():
+    with StandInServer() as srv:
+        pool = _pool()
+        for _ in range(3):
+            _on_thread(lambda: pool.session().get(f"{srv.url}/memory/namespaces").status_code)
+        assert pool._inflight._conns == {}  # no connection kept alive for threads that are gone
+
+
+def test_warmup_opens_connections_without_requests():
+    with StandInServer() as srv:
+        pool = _pool(pool_size=4)
+        assert pool.warmup(srv.url, connections=3, timeout=2) == 3
+        assert pool.stats()["connections_opened"] == 3
+        assert "requests" not in srv.counters
+        for _ in range(3):
+            pool.session().get(f"{srv.url}/memory/namespaces")
+        assert pool.stats()["connections_opened"] == 3
+
+
+def test_warmup_without_pool_internals_warms_nothing(monkeypatch):
+    with StandInServer() as srv:
+        pool = _pool()
+        monkeypatch.setattr(pool, "_pool_for", lambda url, session: object())
+        assert pool.warmup(srv.url, connections=2) == 0
@@ -0,0 +1,71 @@
+# test_profile_selection.py
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from benchmarks.server import StandInServer  # noqa: E402
+from persisto import Client  # noqa: E402
+from persisto.profiles import UNFILTERED_PROFILE, apply_profiles, mmr_select  # noqa: E402
+
+
+class _RecordsQueries(StandInServer):
+    def __init__(self, **config):
+        super().__init__(**config)
+        self.bodies = []
+
+    def _query(self, body, query):
+        self.bodies.append(body)
+        return super()._query(body, query)
+
+
+def _unit(*rows):
+    vecs = np.array(rows, dtype=np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+def test_mmr_skips_near_duplicates():
+    scores = np.array([1.0, 0.99, 0.6, 0.5])
+    vectors = _unit([1, 0, 0], [1, 0.01, 0], [0, 1, 0], [0, 0, 1])
+    assert mmr_select(scores, vectors, 3, lam=1.0) == [0, 1, 2]  # pure relevance
+    assert mmr_select(scores, vectors, 3, lam=0.5) == [0, 2, 3]  # the copy of 0 goes last
+    assert mmr_select(scores, vectors, 10, lam=0.5) == [0, 2, 3, 1]
+    assert mmr_select(scores, vectors, 0, lam=0.5) == []
+
+
+def _hits(now):
+    return [
+        {"id": 0, "content": "old strong", "similarity": 0.9, "created_at": now - 30 * 86400, "embedding": [1, 0]},
+        {"id": 1, "content": "old copy", "similarity": 0.88, "created_at": now - 30 * 86400, "embedding": [1, 0.02]},
+        {"id": 2, "content": "fresh", "similarity": 0.5, "created_at": now - 60, "embedding": [0, 1]},
+        {"id": 3, "content": "weak", "similarity": 0.2, "created_at": now - 60, "embedding": [0.7, 0.7]},
+    ]
+
+
+def test_apply_profiles_thresholds_rescores_and_diversifies():
+    now = time.time()
+    hits = _hits(now)
+    specs = {
+        "strict": {"mode": "strict"},
+        "fuzzy": {"mode": "fuzzy", "k": 2},
+        "recency": {"mode": "recency"},
+        "diverse": {"mode": "fuzzy", "mmr_lambda": 0.5, "k": 2},
+    }
+    out = apply_profiles(hits, specs, k=3, now=now)
+    ids = {name: [h["id"] for h in res["results"]] for name, res in out.items()}
+    assert ids["strict"] == [0, 1]
+    assert ids["fuzzy"] == [0, 1]
+    assert ids["recency"][0] == 2  # freshness lifts a weaker match to the top
+    assert all("score" in h for h in out["recency"]["results"])
+    assert "score" not in out["strict"]["results"][0]
+    assert ids["diverse"] == [0, 2]
+    assert "score" not in hits[2]  # the candidate list is not modified
+
+
+def test_query_profiles_makes_one_unfiltered_over_fetch():
+    with _RecordsQueries(result_count=50) as srv, Client(api_key="test", base_url=srv.url) as c:
+        out = c.query_profiles(namespace="ns", query="q", profiles=("strict", "fuzzy"), k=5)
+        assert len(srv.bodies) == 1
+        assert srv.bodies[0]["profile"] == UNFILTERED_PROFILE and srv.bodies[0]["k"] == 20
+        assert [len(res["results"]) for res in out.values()] == [5, 5]
@@ -0,0 +1,49 @@
+# test_query_many.py
+from benchmarks.server import StandInServer
+from persisto import Client
+
+
+class _BatchFails(StandInServer):
+    def _query_batch(self, body, query):
+        return 500, {"detail": "batch backend down"}, {}
+
+
+class _BatchGarbled(StandInServer):
+    def _query_batch(self, body, query):
+        return 200, {"results": []}, {}
+
+
+def _specs(n):
+    return [{"namespace": "ns", "query": f"q{i}", "k": i % 5 + 1} for i in range(n)]
+
+
+def test_answers_come_back_in_input_order():
+    with StandInServer() as srv, Client(api_key="test", base_url=srv.url) as c:
+        out = c.query_many(_specs(23), batch_size=10)
+        assert [len(resp["results"]) for resp in out] == [i % 5 + 1 for i in range(23)]
+        assert srv.counters["/memory/query_batch"] == 3
+        assert "/memory/query" not in srv.counters
+
+
+def test_failed_batch_gives_one_error_slot_per_query():
+    with _BatchFails() as srv, Client(api_key="test", base_url=srv.url, retries=0) as c:
+        out = c.query_many(_specs(3))
+        assert [slot["status"] for slot in out] == [500, 500, 500]
+        out[0]["handled"] = True  # slots are separate dicts
+        assert "handled" not in out[1] and "handled" not in out[2]
+
+
+def test_falls_back_to_single_queries_without_batch_endpoint():
+    with StandInServer(batch_endpoints=False) as srv, Client(api_key="test", base_url=srv.url) as c:
+        out = c.query_many(_specs(12), batch_size=5, max_workers=3)
+        assert [len(resp["results"]) for resp in out] == [i % 5 + 1 for i in range(12)]
+        assert srv.counters["/memory/query"] == 12
+        assert c._bulk_query is False
+
+
+def test_falls_back_to_single_queries_on_a_malformed_batch_answer():
+    with _BatchGarbled() as srv, Client(api_key="test", base_url=srv.url) as c:
+        out = c.query_many(_specs(4))
+        assert [len(resp["results"]) for resp in out] == [1, 2, 3, 4]
+        assert srv.counters["/memory/query"] == 4
+        assert c._bulk_query is not False  # the endpoint exists: try it again next time
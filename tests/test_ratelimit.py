@@ -0,0 +1,63 @@
+# test_ratelimit.py
+import time
+
+import pytest
+
+from benchmarks.server import StandInServer
+from persisto import Client, PersistoRateLimitError, RateLimiter
+
+
+def test_burst_then_paced():
+    limiter = RateLimiter(rate=10, burst=5)
+    waits = [limiter.reserve("key", "/memory/query") for _ in range(7)]
+    assert waits[:5] == [0.0] * 5
+    assert 0.05 < waits[5] <= 0.1
+    assert 0.15 < waits[6] <= 0.2
+    assert limiter.snapshot()["delayed"] == 2
+
+
+def test_endpoint_bucket_is_drawn_from_as_well():
+    limiter = RateLimiter(rate=100, endpoint_rates={"/memory/save_batch": 1})
+    assert limiter.reserve("key", "/memory/save_batch") == 0.0
+    assert limiter.reserve("key", "/memory/save_batch") > 0.9
+    assert limiter.reserve("key", "/memory/query") == 0.0
+
+
+def test_max_wait_refuses_without_taking_a_token():
+    limiter = RateLimiter(rate=1, max_wait=0.5)
+    limiter.reserve("key", "/memory/query")
+    with pytest.raises(PersistoRateLimitError):
+        limiter.reserve("key", "/memory/query")
+    time.sleep(0.6)
+    assert limiter.reserve("key", "/memory/query") < 0.5  # the refused call did not push the next slot out
+    assert limiter.snapshot()["rejected"] == 1
+
+
+def test_429_halves_the_rate_once_per_cooldown_and_honours_retry_after():
+    limiter = RateLimiter(rate=10, decrease_cooldown=60)
+    limiter.on_rate_limited("key", "/memory/query", "2")
+    limiter.on_rate_limited("key", "/memory/query", "2")
+    assert limiter.snapshot()["rates"]["key"] == pytest.approx(5.0, abs=0.01)
+    assert limiter.reserve("key", "/memory/query") > 1.9
+
+
+def test_processes_sharing_a_state_file_share_the_bucket(tmp_path):
+    path = str(tmp_path / "limits.db")
+    first, second = RateLimiter(rate=10, burst=1, state_path=path), RateLimiter(rate=10, burst=1, state_path=path)
+    try:
+        assert first.reserve("key", "/memory/query") == 0.0
+        assert second.reserve("key", "/memory/query") > 0.05
+    finally:
+        first.close()
+        second.close()
+
+
+def test_client_stays_under_the_server_limit():
+    with StandInServer(rps_limit=20) as srv:
+        time.sleep(0.5)  # let the server's bucket fill
+        with Client(api_key="test", base_url=srv.url, rate_limit=RateLimiter(rate=10, burst=1)) as c:
+            t0 = time.perf_counter()
+            for i in range(10):
+                c.query(namespace="ns", query=f"q{i}")
+            assert time.perf_counter() - t0 >= 0.85
+        assert "limited_429" not in srv.counters
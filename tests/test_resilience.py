@@ -0,0 +1,40 @@
+# test_resilience.py
+import pytest
+
+from benchmarks.server import StandInServer
+from persisto import CircuitBreaker, Client, PersistoCircuitOpenError, PersistoError
+
+
+def test_breaker_opens_and_fails_fast():
+    with StandInServer(error_rate=1.0) as srv:
+        with Client(api_key="test", base_url=srv.url, retries=0, circuit_breaker=True) as c:
+            for _ in range(c.circuit_breaker.failure_threshold):
+                with pytest.raises(PersistoError):
+                    c.query(namespace="ns", query="q")
+            sent = srv.counters["requests"]
+            with pytest.raises(PersistoCircuitOpenError):
+                c.query(namespace="ns", query="q")
+            assert srv.counters["requests"] == sent
+
+
+def test_breakers_are_per_endpoint_when_routing():
+    with StandInServer() as good, StandInServer(error_rate=1.0) as bad:
+        CircuitBreaker.for_url(bad.url, failure_threshold=1)  # the process-wide breaker the client picks up
+        with Client(api_key="test", endpoints=[good.url, bad.url], circuit_breaker=True, retries=2) as c:
+            for i in range(40):
+                assert c.query(namespace="ns", query=f"q{i}")["results"]
+            circuits = {row["url"]: row["circuit"] for row in c.endpoint_stats()}
+        assert circuits == {good.url: "closed", bad.url: "open"}
+
+
+def test_all_circuits_open_fails_fast():
+    with StandInServer(error_rate=1.0) as a, StandInServer(error_rate=1.0) as b:
+        with Client(api_key="test", endpoints=[a.url, b.url], circuit_breaker=True, retries=0) as c:
+            errors = []
+            for _ in range(20):
+                with pytest.raises(PersistoError) as exc:
+                    c.query(namespace="ns", query="q")
+                errors.append(exc.type)
+            sent = a.counters["requests"] + b.counters["requests"]
+        assert errors[-1] is PersistoCircuitOpenError
+        assert sent == 10  # five failures per endpoint, then fail fast
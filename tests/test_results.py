@@ -0,0 +1,43 @@
+# test_results.py
+import pytest
+
+from benchmarks.server import StandInServer
+from persisto import Client
+from persisto.results import projection
+
+
+class _IgnoresFields(StandInServer):
+    """An older server: always answers full hits."""
+
+    def _query(self, body, query):
+        return super()._query({k: v for k, v in body.items() if k != "fields"}, query)
+
+
+def test_projection_is_canonical_and_checked():
+    assert projection(None) is None
+    assert projection(("score", "id")) == ["id", "similarity", "score"]
+    assert projection(None, include_content=False) == ["id", "metadata", "similarity", "score", "created_at",
+                                                       "expires_at"]
+    with pytest.raises(ValueError):
+        projection(["id", "body"])
+    with pytest.raises(TypeError):
+        projection("id")
+
+
+@pytest.mark.parametrize("server", [StandInServer, _IgnoresFields])
+def test_ids_and_scores_projection(server):
+    with server(result_count=5, result_bytes=1000) as srv, Client(api_key="test", base_url=srv.url) as c:
+        res = c.query_hits(namespace="ns", query="q", fields=("id", "score"))
+        assert res.ids() == [0, 1, 2, 3, 4]
+        assert res.scores() == [1.0, 0.99, 0.98, 0.97, 0.96]
+        assert res[0].score == 1.0
+        assert all(set(row) == {"id", "similarity"} for row in res.to_dicts())
+
+
+def test_projection_on_the_local_engine(tmp_path):
+    pytest.importorskip("numpy")
+    with Client(api_key="local", base_url=f"local://{tmp_path}") as c:
+        c.save_many(namespace="docs", items=["refund policy: 30 days", "shipping takes a week"])
+        res = c.query_hits(namespace="docs", query="refund policy", fields=("id", "score"))
+        assert len(res) == 2 and None not in res.scores()
+        assert res[0].content is None and res[0].metadata is None
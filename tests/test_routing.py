@@ -0,0 +1,58 @@
+# test_routing.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.server import StandInServer
+from persisto import Client, EndpointRouter
+
+
+def _by_url(client):
+    return {row["url"]: row for row in client.endpoint_stats()}
+
+
+def _query_concurrently(client, n, tag="q"):
+    with ThreadPoolExecutor(8) as pool:
+        for resp in pool.map(lambda i: client.query(namespace="ns", query=f"{tag} {i}"), range(n)):
+            assert resp["results"]
+
+
+def test_equal_replicas_share_concurrent_traffic():
+    with StandInServer(latency=0.005) as a, StandInServer(latency=0.005) as b:
+        with Client(api_key="test", endpoints=[a.url, b.url]) as c:
+            _query_concurrently(c, 200)
+            assert 0.35 < _by_url(c)[a.url]["share"] < 0.65
+        assert a.counters["requests"] + b.counters["requests"] == 200
+
+
+def test_idle_replica_is_tried_again_by_sequential_callers():
+    # One slow first sample (e.g. the connect) must not starve a replica for good
+    with StandInServer() as a, StandInServer() as b:
+        with Client(api_key="test", endpoints=EndpointRouter([a.url, b.url], decay_seconds=0.05)) as c:
+            for i in range(200):
+                c.query(namespace="ns", query=f"q{i}")
+            shares = [row["share"] for row in c.endpoint_stats()]
+        assert min(shares) > 0.1
+
+
+def test_slow_replica_sheds_load():
+    with StandInServer() as fast, StandInServer(latency=0.05) as slow:
+        with Client(api_key="test", endpoints=[fast.url, slow.url]) as c:
+            for i in range(100):
+                c.query(namespace="ns", query=f"q{i}")
+            assert _by_url(c)[fast.url]["share"] > 0.7
+
+
+def test_failing_replica_is_ejected_and_probed_back():
+    with StandInServer(latency=0.005) as good, StandInServer(error_rate=1.0) as bad:
+        router = EndpointRouter([good.url, bad.url], eject_after=2, eject_seconds=0.3)
+        with Client(api_key="test", endpoints=router, retries=2) as c:
+            _query_concurrently(c, 100)  # every call succeeds: retries go to the good replica
+            stats = _by_url(c)
+            assert stats[bad.url]["ejections"] >= 1 and stats[bad.url]["state"] != "healthy"
+            assert stats[bad.url]["requests"] <= 10
+
+            bad.configure(error_rate=0.0)
+            time.sleep(0.35)
+            _query_concurrently(c, 100, tag="again")
+            assert _by_url(c)[bad.url]["state"] == "healthy"
+            assert bad.counters.get("/memory/query", 0) > 0
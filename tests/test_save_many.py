@@ -0,0 +1,28 @@
+# test_save_many.py
+from benchmarks.server import StandInServer
+from persisto import Client
+
+
+def test_batches_go_to_save_batch():
+    with StandInServer() as srv, Client(api_key="test", base_url=srv.url) as c:
+        report = c.save_many(namespace="ns", items=(f"fact {i}" for i in range(250)), batch_size=100)
+        assert (report["total"], report["saved"], report["failed"]) == (250, 250, 0)
+        assert srv.counters.get("/memory/save_batch") == 3
+        assert "/memory/save" not in srv.counters
+
+
+def test_falls_back_to_single_saves_without_bulk_endpoint():
+    with StandInServer(batch_endpoints=False) as srv, Client(api_key="test", base_url=srv.url) as c:
+        report = c.save_many(namespace="ns", items=[f"fact {i}" for i in range(30)], batch_size=10, max_workers=2)
+        assert (report["saved"], report["failed"]) == (30, 0)
+        assert srv.counters["/memory/save"] == 30
+        assert c._bulk_save is False
+
+
+def test_bad_items_are_reported_by_index():
+    with StandInServer() as srv, Client(api_key="test", base_url=srv.url) as c:
+        report = c.save_many(namespace="ns", items=["ok", {"metadata": {}}, "also ok", 42])
+        assert (report["saved"], report["failed"]) == (2, 2)
+        assert sorted(e["index"] for e in report["errors"]) == [1, 3]
+        assert not any(e["retryable"] for e in report["errors"])
+
@@ -0,0 +1,75 @@
+# test_serialization.py
+import gzip
+
+import pytest
+
+from benchmarks.server import StandInServer
+from persisto import Client, serialization
+from persisto.serialization import JSONSerializer, ORJSONSerializer, accept_encoding, check_compression, encode_body
+
+_DOC = {"namespace": "ns", "content": "naïve café ☕", "metadata": {"n": 3, "ok": True, "tags": ["a", "b"]}}
+
+
+@pytest.mark.parametrize("serializer", [JSONSerializer, ORJSONSerializer])
+def test_serializers_round_trip(serializer):
+    if serializer is ORJSONSerializer:
+        pytest.importorskip("orjson")
+    s = serializer()
+    assert s.loads(s.dumps(_DOC)) == _DOC
+    assert JSONSerializer().loads(s.dumps(_DOC)) == _DOC  # same wire format either way
+
+
+def test_small_bodies_are_not_compressed():
+    body, headers, raw = encode_body(_DOC, JSONSerializer(), "gzip", min_bytes=1024)
+    assert headers == {} and len(body) == raw
+
+
+def test_gzip_request_body():
+    doc = {"namespace": "ns", "content": "repeat " * 500}
+    body, headers, raw = encode_body(doc, JSONSerializer(), "gzip", min_bytes=1024)
+    assert headers == {"Content-Encoding": "gzip"} and len(body) < raw
+    assert JSONSerializer().loads(gzip.decompress(body)) == doc
+
+
+def test_zstd_request_body():
+    zstandard = pytest.importorskip("zstandard")
+    doc = {"namespace": "ns", "content": "repeat " * 500}
+    body, headers, raw = encode_body(doc, JSONSerializer(), "zstd", min_bytes=1024)
+    assert headers == {"Content-Encoding": "zstd"} and len(body) < raw
+    assert JSONSerializer().loads(zstandard.ZstdDecompressor().decompress(body, max_output_size=raw)) == doc
+
+
+def test_unknown_compression_is_rejected():
+    with pytest.raises(ValueError):
+        check_compression("brotli")
+
+
+def test_compressed_saves_reach_the_server():
+    with StandInServer() as srv, Client(api_key="test", base_url=srv.url, compression="gzip") as c:
+        c.save(namespace="ns", content="repeat " * 500)
+        assert srv._records["ns"][0]["content"] == "repeat " * 500
+        assert c.transfer_stats.snapshot()["sent_wire"] < c.transfer_stats.snapshot()["sent_raw"]
+
+
+def test_zstd_is_advertised_only_when_the_transport_decodes_it(monkeypatch):
+    from urllib3.util import request as urllib3_request
+
+    monkeypatch.setattr(urllib3_request, "ACCEPT_ENCODING", "gzip,deflate")
+    monkeypatch.setattr(serialization, "zstandard", object())  # installed, but urllib3 cannot use it
+    assert accept_encoding() == "gzip, deflate"
+    monkeypatch.setattr(urllib3_request, "ACCEPT_ENCODING", "gzip,deflate,zstd")
+    assert accept_encoding() == "gzip, deflate, zstd"
+
+    compression_utils = pytest.importorskip("aiohttp.compression_utils")
+    monkeypatch.setattr(compression_utils, "HAS_ZSTD", False, raising=False)
+    assert accept_encoding("aiohttp") == "gzip, deflate"
+    monkeypatch.setattr(compression_utils, "HAS_ZSTD", True, raising=False)
+    assert accept_encoding("aiohttp") == "gzip, deflate, zstd"
+
+
+def test_large_responses_come_back_compressed():
+    with StandInServer(result_count=20, result_bytes=2000) as srv, Client(api_key="test", base_url=srv.url) as c:
+        resp = c.query(namespace="ns", query="q", k=20)
+        assert len(resp["results"]) == 20
+        stats = c.transfer_stats.snapshot()
+        assert stats["received_wire"] < stats["received_raw"]
@@ -0,0 +1,105 @@
+# test_singleflight.py
+import threading
+import time
+
+import pytest
+
+from benchmarks.server import StandInServer
+from persisto import Client, PersistoDeadlineExceeded
+from persisto.singleflight import SingleFlight
+
+
+def _together(n, fn):
+    """Run fn(i) on n threads released at once; returns results (or exceptions) by index."""
+    barrier = threading.Barrier(n)
+    out = [None] * n
+
+    def run(i):
+        barrier.wait()
+        try:
+            out[i] = fn(i)
+        except BaseException as e:
+            out[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return out
+
+
+def _slow(result, seconds=0.2, calls=None):
+    def fn():
+        if calls is not None:
+            calls.append(1)
+        time.sleep(seconds)
+        return result
+    return fn
+
+
+def test_followers_get_the_leaders_result():
+    flight, calls = SingleFlight(), []
+    out = _together(8, lambda i: flight.do("k", _slow({"answer": 42}, calls=calls)))
+    assert calls == [1]
+    assert all(r == {"answer": 42} for r in out)
+    assert flight.stats()["executed"] == 1 and flight.stats()["coalesced"] == 7
+
+
+def test_follower_timeout_leaves_the_call_running():
+    flight = SingleFlight()
+    leader = threading.Thread(target=flight.do, args=("k", _slow("done", 0.3)))
+    leader.start()
+    time.sleep(0.05)
+    with pytest.raises(TimeoutError):
+        flight.do("k", _slow("never"), timeout=0.05)
+    assert flight.stats()["in_flight"] == 1
+    leader.join()
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_shared_errors_are_copies_and_private_errors_are_not_shared():
+    flight = SingleFlight()
+
+    def failing():
+        time.sleep(0.2)
+        raise ValueError("backend said no")
+
+    out = _together(4, lambda i: flight.do("k", failing))
+    assert all(isinstance(e, ValueError) for e in out)
+    assert len({id(e) for e in out}) == 4
+
+    attempts = []
+
+    def leader_only(i):
+        def fn():
+            attempts.append(i)
+            time.sleep(0.2)
+            if len(attempts) == 1:
+                raise TimeoutError("the first leader's own budget")
+            return "ok"
+        return flight.do("k", fn, private=(TimeoutError,))
+
+    out = _together(4, leader_only)
+    assert sum(isinstance(r, TimeoutError) for r in out) == 1
+    assert out.count("ok") == 3 and len(attempts) == 2
+
+
+def test_concurrent_identical_reads_make_one_request():
+    with StandInServer(latency=0.2) as srv, Client(api_key="test", base_url=srv.url, coalesce=True) as c:
+        out = _together(10, lambda i: c.query(namespace="ns", query="same"))
+        assert srv.counters["/memory/query"] == 1
+        assert all(r == out[0] for r in out)
+
+
+def test_leader_deadline_is_not_passed_to_followers():
+    with StandInServer(latency=0.3) as srv, Client(api_key="test", base_url=srv.url, coalesce=True) as c:
+        def read(i):
+            if i:
+                time.sleep(0.05)  # join the leader's flight
+            return c.query(namespace="ns", query="same", deadline=0.1 if i == 0 else 5.0)
+
+        out = _together(3, read)
+        assert isinstance(out[0], PersistoDeadlineExceeded)
+        assert out[1]["results"] and out[1] == out[2]
+        assert srv.counters["/memory/query"] == 2  # one follower took over as the new leader
@@ -0,0 +1,69 @@
+# test_transfer.py
+import gzip
+import json
+import os
+
+import pytest
+
+from benchmarks.server import StandInServer
+from persisto import Client, PersistoAuthError
+from persisto.transfer import ImportCheckpoint
+
+
+class _AuthExpires(StandInServer):
+    """save_batch answers 401 once `allowed` batches have been accepted."""
+
+    def __init__(self, allowed: int, **config):
+        super().__init__(**config)
+        self.allowed = allowed
+
+    def _save_batch(self, body, query):
+        if self.allowed <= 0:
+            return 401, {"detail": "token expired"}, {}
+        self.allowed -= 1
+        return super()._save_batch(body, query)
+
+
+def _contents(client, namespace):
+    return sorted(m["content"] for m in client.iter_memories(namespace=namespace))
+
+
+def test_export_import_round_trip(tmp_path):
+    path = str(tmp_path / "ns.ndjson.gz")
+    with StandInServer() as srv, Client(api_key="test", base_url=srv.url) as c:
+        c.save_many(namespace="src", items=[{"content": f"fact {i}", "metadata": {"i": i}} for i in range(250)])
+        result = c.export_namespace(namespace="src", path=path, page_size=100)
+        assert (result["format"], result["exported"]) == ("ndjson", 250)
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            records = [json.loads(line) for line in fh]
+        assert sorted(r["metadata"]["i"] for r in records) == list(range(250))
+
+        report = c.import_namespace(namespace="dst", path=path, batch_size=100)
+        assert (report["total"], report["saved"], report["failed"], report["resumed_from"]) == (250, 250, 0, 0)
+        assert _contents(c, "dst") == _contents(c, "src")
+
+
+def test_interrupted_import_resumes_from_checkpoint(tmp_path):
+    path = str(tmp_path / "ns.ndjson")
+    ckpt = str(tmp_path / "import.ckpt")
+    with StandInServer() as srv, Client(api_key="test", base_url=srv.url) as c:
+        c.save_many(namespace="src", items=[f"fact {i}" for i in range(500)])
+        c.export_namespace(namespace="src", path=path)
+
+    with _AuthExpires(allowed=2) as srv, Client(api_key="test", base_url=srv.url) as c:
+        with pytest.raises(PersistoAuthError):
+            c.import_namespace(namespace="dst", path=path, batch_size=100, max_workers=1, checkpoint=ckpt)
+        assert ImportCheckpoint(ckpt, path, "dst").load() == 200
+
+        srv.allowed = 10
+        report = c.import_namespace(namespace="dst", path=path, batch_size=100, max_workers=1, checkpoint=ckpt)
+        assert (report["resumed_from"], report["saved"], report["failed"]) == (200, 300, 0)
+        assert not os.path.exists(ckpt)
+        assert len(_contents(c, "dst")) == 500
+
+
+def test_checkpoint_of_another_import_is_refused(tmp_path):
+    ckpt = str(tmp_path / "import.ckpt")
+    ImportCheckpoint(ckpt, str(tmp_path / "a.ndjson"), "dst").save(10, {})
+    with pytest.raises(ValueError):
+        ImportCheckpoint(ckpt, str(tmp_path / "b.ndjson"), "dst").load()
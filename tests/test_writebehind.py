@@ -0,0 +1,109 @@
+# test_writebehind.py
+import os
+
+import pytest
+
+from benchmarks.server import StandInServer
+from persisto import Client, PersistoAuthError, PersistoError
+from persisto.writebehind import WriteBehindBuffer
+
+DOWN = "http://127.0.0.1:9"  # nothing listens on the discard port
+
+
+def test_unsent_saves_replay_after_restart(tmp_path):
+    wal = str(tmp_path / "wal")
+    c = Client(api_key="test", base_url=DOWN, write_behind=wal, retries=0)
+    for i in range(20):
+        assert c.save(namespace="ns", content=f"fact {i}")["status"] == "queued"
+    assert c.write_behind.close(timeout=0.5) is False  # backend unreachable: stays in the log
+    c.close()
+
+    with StandInServer() as srv:
+        c = Client(api_key="test", base_url=srv.url, write_behind=wal)
+        assert c.flush(timeout=10)
+        stats = c.write_behind.stats()
+        c.close()
+        assert srv.counters["/memory/save_batch"] >= 1
+    assert (stats["sent"], stats["pending"], stats["failures"]) == (20, 0, 0)
+    assert os.path.getsize(os.path.join(wal, "wal.jsonl")) == 0
+
+
+def test_replay_skips_acknowledged_saves(tmp_path):
+    wal = str(tmp_path / "wal")
+    with StandInServer() as srv:
+        with Client(api_key="test", base_url=srv.url, write_behind=wal) as c:
+            c.save(namespace="ns", content="delivered")
+            assert c.flush(timeout=10)
+        with Client(api_key="test", base_url=srv.url, write_behind=wal) as c:
+            assert c.write_behind.stats()["pending"] == 0
+        assert srv.counters["/memory/save_batch"] == 1
+
+
+class _RejectsKey(StandInServer):
+    def _save_batch(self, body, query):
+        return 401, {"detail": "invalid API key"}, {}
+
+
+def test_auth_failure_stops_delivery_and_keeps_the_saves(tmp_path):
+    wal = str(tmp_path / "wal")
+    with _RejectsKey() as srv:
+        c = Client(api_key="revoked", base_url=srv.url, write_behind=wal)
+        c.save(namespace="ns", content="fact 1")
+        with pytest.raises(PersistoAuthError):
+            c.flush(timeout=10)
+        with pytest.raises(PersistoAuthError):
+            c.save(namespace="ns", content="fact 2")
+        stats = c.write_behind.stats()
+        assert (stats["pending"], stats["rejected"], stats["failures"]) == (1, 0, 0) and stats["error"]
+        assert srv.counters["requests"] == 1  # no retry loop against a bad key
+        c.close()
+    assert not os.path.exists(os.path.join(wal, "rejected.jsonl"))
+
+    with StandInServer() as srv, Client(api_key="test", base_url=srv.url, write_behind=wal) as c:
+        assert c.flush(timeout=10)
+        assert [item["content"] for item in srv._records["ns"]] == ["fact 1"]
+
+
+def test_one_buffer_per_directory(tmp_path):
+    wal = str(tmp_path / "wal")
+    c = Client(api_key="test", base_url=DOWN, write_behind=wal, retries=0)
+    with pytest.raises(PersistoError, match="in use"):
+        Client(api_key="test", base_url=DOWN, write_behind=wal)
+    c.close()
+    Client(api_key="test", base_url=DOWN, write_behind=wal).close()  # released on close
+
+
+class _Producer:
+    """Stand-in client whose every delivery races a new append, so the log is never fully drained."""
+
+    def __init__(self, total):
+        self.total = total
+        self.appended = 0
+        self.buffer = None
+        self.max_log_seen = 0
+
+    def _save_batch(self, namespace, batch):
+        if self.appended < self.total:
+            self.append()
+        self.max_log_seen = max(self.max_log_seen, os.path.getsize(self.buffer._log_path))
+        return len(batch), []
+
+    def append(self):
+        self.appended += 1
+        self.buffer.append({"namespace": "ns", "content": f"memory {self.appended:05d} " + "x" * 100})
+
+    def _invalidate_cache(self, namespace):
+        pass
+
+
+def test_log_compacts_under_steady_writes(tmp_path):
+    producer = _Producer(total=600)
+    buf = WriteBehindBuffer(producer, str(tmp_path / "wal"), max_log_bytes=16 * 1024, batch_size=1,
+                            flush_interval=0.01, block_timeout=5)
+    producer.buffer = buf
+    producer.append()
+    assert buf.flush(timeout=30)
+    buf.close()
+    assert buf.stats()["sent"] == 600
+    # ~80 KB went through a 16 KB log without blocking appends
+    assert producer.max_log_seen < 16 * 1024